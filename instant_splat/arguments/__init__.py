@@ -59,7 +59,8 @@ class ModelParams(ParamGroup):
         self._images = "images"
         self._resolution = -1
         self._white_background = False
-        self.data_device = "cuda"
+        self.data_device = ""  # empty: same device as the model
+        self.uint8_images = False  # keep ground-truth images as bytes
         self.eval = False
         super().__init__(parser, "Loading Parameters", sentinel)
 
@@ -73,6 +74,7 @@ class PipelineParams(ParamGroup):
     def __init__(self, parser):
         self.convert_SHs_python = False
         self.compute_cov3D_python = False
+        self.frustum_culling = False
         self.debug = False
         super().__init__(parser, "Pipeline Parameters")
 
@@ -95,6 +97,8 @@ class OptimizationParams(ParamGroup):
         self.densify_from_iter = 500
         self.densify_until_iter = 15_000
         self.densify_grad_threshold = 0.0002
+        # Sort the Gaussians by Morton code every this many iterations (0 disables)
+        self.morton_reorder_interval = 1000
         self.random_background = False
         super().__init__(parser, "Optimization Parameters")
 
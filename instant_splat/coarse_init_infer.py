@@ -16,6 +16,8 @@ from instant_splat.utils.dust3r_utils import (
     save_colmap_cameras,
     save_colmap_images,
 )
+from instant_splat.utils.chunked_alignment import chunked_global_alignment
+from instant_splat.utils.point_cloud_utils import voxel_fuse
 
 
 def coarse_infer(
@@ -29,12 +31,26 @@ def coarse_infer(
     img_base_path,
     focal_avg,
     confidence: float = 2.0,
+    window_size: int = 0,
+    window_overlap: int = 4,
+    voxel_size: float = 0.0,
+    max_points: int = 0,
 ) -> None:
+    """
+    Estimate camera poses and an initial point cloud with DUSt3R and write them to
+    `<img_base_path>/sparse/0`.
+
+    When `window_size` is positive and smaller than `n_views`, the sequence is aligned
+    in overlapping windows of `window_size` frames (sharing `window_overlap` frames) that
+    are stitched with a Sim(3) pose graph, bounding peak memory by the window size.
+
+    `voxel_size` and/or `max_points` enable confidence-weighted voxel fusion of the
+    initial point cloud (see `voxel_fuse`) before it is written to `points3D.ply`.
+    """
     img_folder_path = os.path.join(img_base_path, "images")
     os.makedirs(img_folder_path, exist_ok=True)
 
     assert os.path.exists(model_path), f"Model path {model_path} does not exist"
-    model = AsymmetricCroCo3DStereo.from_pretrained(model_path).to(device)
     ##########################################################################################################################################################################################
 
     train_img_list = sorted(os.listdir(img_folder_path))
@@ -47,31 +63,53 @@ def coarse_infer(
 
     start_time = time.time()
     ##########################################################################################################################################################################################
-    pairs = make_pairs(images, scene_graph="complete", prefilter=None, symmetrize=True)
-    output = inference(pairs, model, device, batch_size=batch_size)
     output_colmap_path = img_folder_path.replace("images", "sparse/0")
     os.makedirs(output_colmap_path, exist_ok=True)
 
-    scene = global_aligner(
-        output, device=device, mode=GlobalAlignerMode.PointCloudOptimizer
-    )
-    loss = compute_global_alignment(
-        scene=scene,
-        init="mst",
-        niter=niter,
-        schedule=schedule,
-        lr=lr,
-        focal_avg=focal_avg,
-    )
-    scene = scene.clean_pointcloud()
+    if 0 < window_size < n_views:
+        imgs, focals, poses, pts3d, confs, confidence_masks, intrinsics = (
+            chunked_global_alignment(
+                images,
+                model_path=model_path,
+                device=device,
+                batch_size=batch_size,
+                schedule=schedule,
+                lr=lr,
+                niter=niter,
+                focal_avg=focal_avg,
+                confidence=confidence,
+                window_size=window_size,
+                window_overlap=window_overlap,
+            )
+        )
+    else:
+        model = AsymmetricCroCo3DStereo.from_pretrained(model_path).to(device)
+        pairs = make_pairs(
+            images, scene_graph="complete", prefilter=None, symmetrize=True
+        )
+        output = inference(pairs, model, device, batch_size=batch_size)
+
+        scene = global_aligner(
+            output, device=device, mode=GlobalAlignerMode.PointCloudOptimizer
+        )
+        loss = compute_global_alignment(
+            scene=scene,
+            init="mst",
+            niter=niter,
+            schedule=schedule,
+            lr=lr,
+            focal_avg=focal_avg,
+        )
+        scene = scene.clean_pointcloud()
 
-    imgs = to_numpy(scene.imgs)
-    focals = scene.get_focals()
-    poses = to_numpy(scene.get_im_poses())
-    pts3d = to_numpy(scene.get_pts3d())
-    scene.min_conf_thr = float(scene.conf_trf(torch.tensor(confidence)))
-    confidence_masks = to_numpy(scene.get_masks())
-    intrinsics = to_numpy(scene.get_intrinsics())
+        imgs = to_numpy(scene.imgs)
+        focals = to_numpy(scene.get_focals())
+        poses = to_numpy(scene.get_im_poses())
+        pts3d = to_numpy(scene.get_pts3d())
+        scene.min_conf_thr = float(scene.conf_trf(torch.tensor(confidence)))
+        confs = to_numpy(scene.im_conf)
+        confidence_masks = to_numpy(scene.get_masks())
+        intrinsics = to_numpy(scene.get_intrinsics())
     ##########################################################################################################################################################################################
     end_time = time.time()
     print(f"Time taken for {n_views} views: {end_time-start_time} seconds")
@@ -86,8 +124,16 @@ def coarse_infer(
 
     pts_4_3dgs = np.concatenate([p[m] for p, m in zip(pts3d, confidence_masks)])
     color_4_3dgs = np.concatenate([p[m] for p, m in zip(imgs, confidence_masks)])
+    conf_4_3dgs = np.concatenate([c[m] for c, m in zip(confs, confidence_masks)])
+    pts_4_3dgs, color_4_3dgs, _ = voxel_fuse(
+        pts_4_3dgs,
+        color_4_3dgs,
+        conf_4_3dgs,
+        voxel_size=voxel_size,
+        max_points=max_points,
+    )
     color_4_3dgs = (color_4_3dgs * 255.0).astype(np.uint8)
     storePly(os.path.join(output_colmap_path, "points3D.ply"), pts_4_3dgs, color_4_3dgs)
     pts_4_3dgs_all = np.array(pts3d).reshape(-1, 3)
     np.save(output_colmap_path + "/pts_4_3dgs_all.npy", pts_4_3dgs_all)
-    np.save(output_colmap_path + "/focal.npy", np.array(focals.cpu()))
+    np.save(output_colmap_path + "/focal.npy", np.array(focals))
@@ -11,36 +11,76 @@
 
 import torch
 import math
-from diff_gaussian_rasterization import (
-    GaussianRasterizationSettings,
-    GaussianRasterizer,
-)
+from instant_splat.gaussian_renderer import torch_rasterizer
+from instant_splat.gaussian_renderer.culling import visible_gaussians
 from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.scene.gaussian_lod import GaussianLOD
 from instant_splat.utils.sh_utils import eval_sh
-from instant_splat.utils.pose_utils import get_camera_from_tensor, quadmultiply
+from instant_splat.utils.pose_utils import (
+    get_camera_from_tensor,
+    quadmultiply_left,
+    transform_points,
+)
 
+try:
+    import diff_gaussian_rasterization
+except ImportError:
+    diff_gaussian_rasterization = None
 
-def render(
+
+def rasterizer_backend(device):
+    """
+    The CUDA rasterizer for CUDA tensors when it is installed, the pure-PyTorch
+    reference rasterizer otherwise.
+    """
+    if device.type == "cuda" and diff_gaussian_rasterization is not None:
+        return diff_gaussian_rasterization
+    return torch_rasterizer
+
+
+def _view_independent_inputs(pc: GaussianModel, pipe, scaling_modifier, override_color):
+    """
+    Rasterizer inputs that do not depend on the camera, computed once and shared by
+    every view of a batch.
+    """
+    inputs = {"opacities": pc.get_opacity}
+
+    # If precomputed 3d covariance is provided, use it. If not, then it will be computed from
+    # scaling / rotation by the rasterizer.
+    if pipe.compute_cov3D_python:
+        inputs["cov3D_precomp"] = pc.get_covariance(scaling_modifier)
+    else:
+        inputs["scales"] = pc.get_scaling
+
+    # If precomputed colors are provided, use them. If SHs are converted in Python, the
+    # view-dependent evaluation happens per view from the features gathered here.
+    if override_color is not None:
+        inputs["colors_precomp"] = override_color
+    elif pc.adaptive_sh is not None:
+        # Per-Gaussian SH degrees; colors are evaluated per view, bucket by bucket
+        inputs["features_dc"] = pc._features_dc
+        inputs["adaptive_sh"] = pc.adaptive_sh
+    elif pipe.convert_SHs_python:
+        inputs["shs_view"] = pc.get_features.transpose(1, 2).view(
+            -1, 3, (pc.max_sh_degree + 1) ** 2
+        )
+    else:
+        inputs["shs"] = pc.get_features
+    return inputs
+
+
+def _render_view(
     viewpoint_camera,
     pc: GaussianModel,
     pipe,
     bg_color: torch.Tensor,
-    scaling_modifier=1.0,
-    override_color=None,
-    camera_pose=None,
+    camera_pose,
+    shared,
+    scaling_modifier,
 ):
-    """
-    Render the scene.
-
-    Background tensor (bg_color) must be on GPU!
-    """
-
     # Create zero tensor. We will use it to make pytorch return gradients of the 2D (screen-space) means
     screenspace_points = (
-        torch.zeros_like(
-            pc.get_xyz, dtype=pc.get_xyz.dtype, requires_grad=True, device="cuda"
-        )
-        + 0
+        torch.zeros_like(pc.get_xyz, dtype=pc.get_xyz.dtype, requires_grad=True) + 0
     )
     try:
         screenspace_points.retain_grad()
@@ -52,12 +92,13 @@ def render(
     tanfovy = math.tan(viewpoint_camera.FoVy * 0.5)
 
     # Set camera pose as identity. Then, we will transform the Gaussians around camera_pose
-    w2c = torch.eye(4).cuda()
+    w2c = torch.eye(4, device=pc.get_xyz.device)
     projmatrix = (
         w2c.unsqueeze(0).bmm(viewpoint_camera.projection_matrix.unsqueeze(0))
     ).squeeze(0)
     camera_pos = w2c.inverse()[3, :3]
-    raster_settings = GaussianRasterizationSettings(
+    backend = rasterizer_backend(pc.get_xyz.device)
+    raster_settings = backend.GaussianRasterizationSettings(
         image_height=int(viewpoint_camera.image_height),
         image_width=int(viewpoint_camera.image_width),
         tanfovx=tanfovx,
@@ -75,64 +116,59 @@ def render(
         debug=pipe.debug,
     )
 
-    rasterizer = GaussianRasterizer(raster_settings=raster_settings)
+    rasterizer = backend.GaussianRasterizer(raster_settings=raster_settings)
 
     # means3D = pc.get_xyz
     rel_w2c = get_camera_from_tensor(camera_pose)
-    # Transform mean and rot of Gaussians to camera frame
-    gaussians_xyz = pc._xyz.clone()
-    gaussians_rot = pc._rotation.clone()
-
-    xyz_ones = torch.ones(gaussians_xyz.shape[0], 1).cuda().float()
-    xyz_homo = torch.cat((gaussians_xyz, xyz_ones), dim=1)
-    gaussians_xyz_trans = (rel_w2c @ xyz_homo.T).T[:, :3]
-    gaussians_rot_trans = quadmultiply(camera_pose[:4], gaussians_rot)
-    means3D = gaussians_xyz_trans
-    means2D = screenspace_points
-    opacity = pc.get_opacity
 
-    # If precomputed 3d covariance is provided, use it. If not, then it will be computed from
-    # scaling / rotation by the rasterizer.
-    scales = None
-    rotations = None
-    cov3D_precomp = None
-    if pipe.compute_cov3D_python:
-        cov3D_precomp = pc.get_covariance(scaling_modifier)
-    else:
-        scales = pc.get_scaling
-        rotations = gaussians_rot_trans  # pc.get_rotation
-
-    # If precomputed colors are provided, use them. Otherwise, if it is desired to precompute colors
-    # from SHs in Python, do it. If not, then SH -> RGB conversion will be done by rasterizer.
-    shs = None
-    colors_precomp = None
-    if override_color is None:
-        if pipe.convert_SHs_python:
-            shs_view = pc.get_features.transpose(1, 2).view(
-                -1, 3, (pc.max_sh_degree + 1) ** 2
-            )
-            dir_pp = pc.get_xyz - viewpoint_camera.camera_center.repeat(
-                pc.get_features.shape[0], 1
-            )
-            dir_pp_normalized = dir_pp / dir_pp.norm(dim=1, keepdim=True)
-            sh2rgb = eval_sh(pc.active_sh_degree, shs_view, dir_pp_normalized)
-            colors_precomp = torch.clamp_min(sh2rgb + 0.5, 0.0)
-        else:
-            shs = pc.get_features
-    else:
-        colors_precomp = override_color
+    # Optionally hand the rasterizer only the Gaussians that can show up in this view;
+    # indexing is differentiable, so gradients scatter back to the full tensors
+    visible = None
+    if pipe.frustum_culling:
+        visible = visible_gaussians(
+            pc.get_spatial_index,
+            pc._xyz,
+            pc.get_scaling,
+            rel_w2c,
+            tanfovx,
+            tanfovy,
+            raster_settings.image_width,
+            raster_settings.image_height,
+            scaling_modifier,
+        )
 
-    # Rasterize visible Gaussians to image, obtain their radii (on screen).
+    def select(tensor):
+        return tensor if visible is None else tensor[visible]
+
+    # Transform mean and rot of Gaussians to camera frame; each is a single matmul
+    # writing one new (N, 3) / (N, 4) tensor
+    means3D = transform_points(rel_w2c, select(pc._xyz))
+    inputs = {name: select(value) for name, value in shared.items()}
+    if "scales" in inputs:
+        inputs["rotations"] = quadmultiply_left(
+            camera_pose[:4], select(pc._rotation).float()
+        )
+    if "shs_view" in inputs or "adaptive_sh" in inputs:
+        dir_pp = select(pc.get_xyz) - viewpoint_camera.camera_center
+        dir_pp_normalized = dir_pp / dir_pp.norm(dim=1, keepdim=True)
+    if "shs_view" in inputs:
+        sh2rgb = eval_sh(pc.active_sh_degree, inputs.pop("shs_view"), dir_pp_normalized)
+        inputs["colors_precomp"] = torch.clamp_min(sh2rgb + 0.5, 0.0)
+    if "adaptive_sh" in inputs:
+        inputs["colors_precomp"] = inputs.pop("adaptive_sh").colors(
+            inputs.pop("features_dc"), dir_pp_normalized, pc.active_sh_degree
+        )
+
+    # Rasterize visible Gaussians to image, obtain their radii (on screen). Models
+    # loaded for inference may hold half-precision attributes; the rasterizers take
+    # float32, which `.float()` returns as is.
     rendered_image, radii = rasterizer(
         means3D=means3D,
-        means2D=means2D,
-        shs=shs,
-        colors_precomp=colors_precomp,
-        opacities=opacity,
-        scales=scales,
-        rotations=rotations,
-        cov3D_precomp=cov3D_precomp,
+        means2D=select(screenspace_points),
+        **{name: value.float() for name, value in inputs.items()},
     )
+    if visible is not None:
+        radii = radii.new_zeros(len(screenspace_points)).index_copy_(0, visible, radii)
 
     # Those Gaussians that were frustum culled or had a radius of 0 were not visible.
     # They will be excluded from value updates used in the splitting criteria.
@@ -142,3 +178,84 @@ def render(
         "visibility_filter": radii > 0,
         "radii": radii,
     }
+
+
+def render(
+    viewpoint_camera,
+    pc: GaussianModel,
+    pipe,
+    bg_color: torch.Tensor,
+    scaling_modifier=1.0,
+    override_color=None,
+    camera_pose=None,
+):
+    """
+    Render the scene.
+
+    Background tensor (bg_color) must be on the same device as the model!
+    """
+    shared = _view_independent_inputs(pc, pipe, scaling_modifier, override_color)
+    return _render_view(
+        viewpoint_camera, pc, pipe, bg_color, camera_pose, shared, scaling_modifier
+    )
+
+
+def render_batch(
+    viewpoint_cameras,
+    pc: GaussianModel,
+    pipe,
+    bg_color: torch.Tensor,
+    camera_poses,
+    scaling_modifier=1.0,
+    override_color=None,
+):
+    """
+    Render K views of the scene, one camera pose (quaternion + translation) per view.
+
+    The per-Gaussian activations (opacity, scaling or covariance, SH features) are
+    computed once and shared by all views. All views must have the same resolution.
+    Returns "render" (K, 3, H, W), "radii" and "visibility_filter" (K, N) and the K
+    "viewspace_points" tensors.
+    """
+    assert len(viewpoint_cameras) == len(camera_poses)
+    shared = _view_independent_inputs(pc, pipe, scaling_modifier, override_color)
+    packages = [
+        _render_view(cam, pc, pipe, bg_color, pose, shared, scaling_modifier)
+        for cam, pose in zip(viewpoint_cameras, camera_poses)
+    ]
+    return {
+        "render": torch.stack([pkg["render"] for pkg in packages]),
+        "viewspace_points": [pkg["viewspace_points"] for pkg in packages],
+        "visibility_filter": torch.stack(
+            [pkg["visibility_filter"] for pkg in packages]
+        ),
+        "radii": torch.stack([pkg["radii"] for pkg in packages]),
+    }
+
+
+def render_lod(
+    viewpoint_camera,
+    lod: GaussianLOD,
+    pipe,
+    bg_color: torch.Tensor,
+    camera_pose,
+    pixel_error=1.0,
+    scaling_modifier=1.0,
+    override_color=None,
+):
+    """
+    Render the level-of-detail cut of `lod` for this camera: distant parts of the
+    scene are drawn with merged Gaussians no larger than `pixel_error` pixels.
+    """
+    pc = lod.cut_for_view(
+        viewpoint_camera, get_camera_from_tensor(camera_pose), pixel_error
+    )
+    return render(
+        viewpoint_camera,
+        pc,
+        pipe,
+        bg_color,
+        scaling_modifier=scaling_modifier,
+        override_color=override_color,
+        camera_pose=camera_pose,
+    )
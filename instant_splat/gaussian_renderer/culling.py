@@ -0,0 +1,80 @@
+import math
+
+import torch
+
+from instant_splat.gaussian_renderer.torch_rasterizer import BLOCK_SIZE
+from instant_splat.utils.spatial_index import MortonIndex
+
+# The rasterizer drops Gaussians whose view-space depth is not above 0.2; a hair
+# less allows for rounding
+NEAR = 0.2 - 1e-6
+# Headroom for rounding differences with the rasterizer's own projection
+SLACK_PX = 1.0
+# The rasterizer's screen radius is ceil(3 * sqrt(lambda1)) with lambda1, the largest
+# eigenvalue of the dilated 2D covariance, at most its trace + sqrt(0.1): the trace
+# gains 0.6 from the 0.3 px² dilation, so this many pixels, one of them for the
+# rounding up, bound everything that is not 3 * sqrt(trace of the projected covariance)
+CONST_PX = 3.0 * math.sqrt(0.6 + math.sqrt(0.1)) + 1.0 + SLACK_PX
+
+
+@torch.no_grad()
+def visible_gaussians(
+    index: MortonIndex,
+    xyz,
+    scaling,
+    w2c,
+    tanfovx,
+    tanfovy,
+    image_width,
+    image_height,
+    scaling_modifier=1.0,
+):
+    """
+    Indices of the Gaussians the rasterizer can draw for one camera: a superset of
+    those it gives a radius above 0, so culling changes neither the image nor the
+    radii.
+
+    The rasterizer draws a Gaussian in front of its near plane whose 3-sigma pixel
+    rectangle touches a tile of the image. Its radius is bounded from the Jacobian of
+    the projection, which it clamps to 1.3 times the field of view: the trace of the
+    projected covariance is at most |J|_F² times the largest variance. The spatial
+    index first skips the cells that miss the frustum widened by that bound at any
+    depth; the remaining Gaussians are projected and tested with their own |J|_F.
+    """
+    focal_x = image_width / (2.0 * tanfovx)
+    focal_y = image_height / (2.0 * tanfovy)
+    limx, limy = 1.3 * tanfovx, 1.3 * tanfovy
+    sigma = scaling_modifier * scaling.float().max(dim=1).values
+
+    # |J|_F <= jacobian / depth for every Gaussian
+    jacobian = math.sqrt(
+        focal_x * focal_x * (1.0 + limx * limx)
+        + focal_y * focal_y * (1.0 + limy * limy)
+    )
+    candidates = index.frustum(
+        xyz,
+        w2c,
+        tanfovx + (BLOCK_SIZE + CONST_PX) / focal_x,
+        tanfovy + (BLOCK_SIZE + CONST_PX) / focal_y,
+        NEAR,
+        3.0 * jacobian / min(focal_x, focal_y) * sigma,
+    )
+
+    x, y, z = (xyz[candidates] @ w2c[:3, :3].T + w2c[:3, 3]).unbind(-1)
+    in_front = z > NEAR
+    z = torch.where(in_front, z, 1.0)
+    u, v = x / z, y / z
+    jacobian_sq = (
+        focal_x * focal_x * (1.0 + u.clamp(-limx, limx).square())
+        + focal_y * focal_y * (1.0 + v.clamp(-limy, limy).square())
+    ) / (z * z)
+    radii = 3.0 * (jacobian_sq * sigma[candidates].square()).sqrt() + CONST_PX
+
+    # The pixel rectangle touches a tile if it overlaps the tile grid, which covers
+    # the image rounded up to whole tiles
+    keep = in_front
+    for coord, focal, size in ((u, focal_x, image_width), (v, focal_y, image_height)):
+        center = focal * coord + 0.5 * (size - 1)
+        grid = math.ceil(size / BLOCK_SIZE) * BLOCK_SIZE
+        keep &= (center + radii > 0) & (center - radii < grid)
+    return candidates[keep]
@@ -0,0 +1,345 @@
+import math
+from typing import NamedTuple
+
+import torch
+from torch import nn
+
+from instant_splat.utils.sh_utils import eval_sh
+
+BLOCK_SIZE = 16
+
+
+class GaussianRasterizationSettings(NamedTuple):
+    """Same fields as `diff_gaussian_rasterization.GaussianRasterizationSettings`."""
+
+    image_height: int
+    image_width: int
+    tanfovx: float
+    tanfovy: float
+    bg: torch.Tensor
+    scale_modifier: float
+    viewmatrix: torch.Tensor
+    projmatrix: torch.Tensor
+    sh_degree: int
+    campos: torch.Tensor
+    prefiltered: bool
+    debug: bool
+
+
+def _cov3d_from_scaling_rotation(scales, rotations, scale_modifier):
+    q = torch.nn.functional.normalize(rotations, dim=-1)
+    r, x, y, z = q.unbind(-1)
+    R = torch.stack(
+        [
+            1 - 2 * (y * y + z * z),
+            2 * (x * y - r * z),
+            2 * (x * z + r * y),
+            2 * (x * y + r * z),
+            1 - 2 * (x * x + z * z),
+            2 * (y * z - r * x),
+            2 * (x * z - r * y),
+            2 * (y * z + r * x),
+            1 - 2 * (x * x + y * y),
+        ],
+        dim=-1,
+    ).reshape(-1, 3, 3)
+    M = R * (scale_modifier * scales)[:, None, :]
+    return M @ M.transpose(1, 2)
+
+
+def _cov3d_from_precomp(cov3D_precomp):
+    a, b, c, d, e, f = cov3D_precomp.unbind(-1)
+    return torch.stack([a, b, c, b, d, e, c, e, f], dim=-1).reshape(-1, 3, 3)
+
+
+def preprocess(means3D, cov3D, settings: GaussianRasterizationSettings):
+    """
+    Project Gaussians to the image plane like the CUDA `preprocessCUDA`.
+
+    Returns (xy, depth, conic, radii) with pixel-space means, view-space depth,
+    inverse 2D covariance (a, b, c) and integer screen radii (0 for culled Gaussians).
+    """
+    V = settings.viewmatrix
+    P = settings.projmatrix
+    width, height = settings.image_width, settings.image_height
+
+    p_view = means3D @ V[:3, :3] + V[3, :3]
+    p_hom = means3D @ P[:3] + P[3]
+    p_proj = p_hom[:, :3] / (p_hom[:, 3:] + 1e-7)
+
+    focal_x = width / (2.0 * settings.tanfovx)
+    focal_y = height / (2.0 * settings.tanfovy)
+    limx, limy = 1.3 * settings.tanfovx, 1.3 * settings.tanfovy
+    tz = p_view[:, 2]
+    tx = (p_view[:, 0] / tz).clamp(-limx, limx) * tz
+    ty = (p_view[:, 1] / tz).clamp(-limy, limy) * tz
+    zeros = torch.zeros_like(tz)
+    J = torch.stack(
+        [
+            focal_x / tz,
+            zeros,
+            -(focal_x * tx) / (tz * tz),
+            zeros,
+            focal_y / tz,
+            -(focal_y * ty) / (tz * tz),
+        ],
+        dim=-1,
+    ).reshape(-1, 2, 3)
+    T = J @ V[:3, :3].T
+    cov2D = T @ cov3D @ T.transpose(1, 2)
+    a = cov2D[:, 0, 0] + 0.3
+    b = cov2D[:, 0, 1]
+    c = cov2D[:, 1, 1] + 0.3
+
+    det = a * c - b * b
+    valid = (tz > 0.2) & (det != 0)
+    det_inv = torch.where(valid, 1.0 / torch.where(valid, det, 1.0), 0.0)
+    conic = torch.stack([c * det_inv, -b * det_inv, a * det_inv], dim=-1)
+
+    with torch.no_grad():
+        mid = 0.5 * (a + c)
+        lambda1 = mid + torch.sqrt(torch.clamp(mid * mid - det, min=0.1))
+        radii = torch.ceil(3.0 * torch.sqrt(lambda1)).int()
+        radii = torch.where(valid, radii, 0)
+
+    xy = torch.stack(
+        [
+            ((p_proj[:, 0] + 1.0) * width - 1.0) * 0.5,
+            ((p_proj[:, 1] + 1.0) * height - 1.0) * 0.5,
+        ],
+        dim=-1,
+    )
+    return xy, tz, conic, radii
+
+
+@torch.no_grad()
+def bin_gaussians(xy, depth, radii, grid):
+    """
+    Duplicate every Gaussian once per tile its 3-sigma rectangle touches and sort the
+    copies by (tile, depth).
+
+    Returns (gaussian_ids, tile_ranges, tiles_touched): the sorted Gaussian indices,
+    (n_tiles, 2) start/end offsets into them and per-Gaussian tile counts.
+    """
+    grid_x, grid_y = grid
+    r = radii.float()
+    rect_min_x = ((xy[:, 0] - r) / BLOCK_SIZE).int().clamp(0, grid_x)
+    rect_min_y = ((xy[:, 1] - r) / BLOCK_SIZE).int().clamp(0, grid_y)
+    rect_max_x = ((xy[:, 0] + r + BLOCK_SIZE - 1) / BLOCK_SIZE).int().clamp(0, grid_x)
+    rect_max_y = ((xy[:, 1] + r + BLOCK_SIZE - 1) / BLOCK_SIZE).int().clamp(0, grid_y)
+    rect_w = rect_max_x - rect_min_x
+    tiles_touched = rect_w * (rect_max_y - rect_min_y) * (radii > 0)
+
+    counts = tiles_touched.long()
+    gaussian_ids = torch.repeat_interleave(
+        torch.arange(len(xy), device=xy.device), counts
+    )
+    local = torch.arange(len(gaussian_ids), device=xy.device) - torch.repeat_interleave(
+        torch.cumsum(counts, 0) - counts, counts
+    )
+    w = rect_w[gaussian_ids].long()
+    tile_x = rect_min_x[gaussian_ids].long() + local % w
+    tile_y = rect_min_y[gaussian_ids].long() + local // w
+    tile_ids = tile_y * grid_x + tile_x
+
+    depth_rank = torch.empty_like(counts)
+    depth_rank[torch.argsort(depth)] = torch.arange(len(depth), device=xy.device)
+    order = torch.argsort(tile_ids * len(depth) + depth_rank[gaussian_ids])
+    gaussian_ids = gaussian_ids[order]
+
+    n_tiles = grid_x * grid_y
+    ends = torch.cumsum(torch.bincount(tile_ids, minlength=n_tiles), 0)
+    tile_ranges = torch.stack(
+        [ends - torch.bincount(tile_ids, minlength=n_tiles), ends], 1
+    )
+    return gaussian_ids, tile_ranges, tiles_touched
+
+
+def _composite(pixels, xy, conic, opacity, color, valid):
+    """
+    Front-to-back alpha blending of depth-sorted Gaussians over a batch of tiles.
+
+    `pixels` is (B, P, 2), the per-Gaussian tensors are (B, K, ...) and `valid` masks
+    padding. Returns blended colors (B, P, C) and remaining transmittance (B, P).
+    """
+    d = xy[:, None, :, :] - pixels[:, :, None, :]
+    dx, dy = d[..., 0], d[..., 1]
+    A, B, C = (conic[:, None, :, i] for i in range(3))
+    power = -0.5 * (A * dx * dx + C * dy * dy) - B * dx * dy
+    alpha = torch.clamp(opacity[:, None, :] * torch.exp(power), max=0.99)
+    alpha = torch.where(
+        (power <= 0) & (alpha >= 1.0 / 255.0) & valid[:, None, :], alpha, 0.0
+    )
+    # A pixel stops at the first Gaussian that would bring its transmittance below
+    # 1e-4, which is always a prefix of the sorted list
+    one_minus = 1.0 - alpha
+    alpha = torch.where(torch.cumprod(one_minus, dim=-1) >= 1e-4, alpha, 0.0)
+    one_minus = 1.0 - alpha
+    transmittance = torch.cumprod(one_minus, dim=-1)
+    T_before = torch.cat(
+        [torch.ones_like(transmittance[..., :1]), transmittance[..., :-1]], -1
+    )
+    return (alpha * T_before) @ color, transmittance[..., -1]
+
+
+def rasterize(
+    xy,
+    conic,
+    opacity,
+    color,
+    gaussian_ids,
+    tile_ranges,
+    grid,
+    bg,
+    strategy="batched",
+    max_elements=2**24,
+):
+    """
+    Blend every tile and assemble the padded (C, grid_y * 16, grid_x * 16) image.
+
+    "per_tile" runs one vectorized (pixels x Gaussians) pass per non-empty tile;
+    "batched" sorts tiles by their Gaussian count and blends groups of similar tiles
+    together, padding each group to its longest list and capping each pass at
+    `max_elements` pixel-Gaussian pairs.
+    """
+    grid_x, grid_y = grid
+    device = xy.device
+    n_channels = color.shape[1]
+    local = torch.arange(BLOCK_SIZE, device=device, dtype=xy.dtype)
+    offsets = torch.stack(torch.meshgrid(local, local, indexing="xy"), -1).reshape(
+        -1, 2
+    )
+    n_pixels = len(offsets)
+
+    counts = tile_ranges[:, 1] - tile_ranges[:, 0]
+    tiles = torch.nonzero(counts).squeeze(1)
+    if strategy == "per_tile":
+        batches = [tiles[i : i + 1] for i in range(len(tiles))]
+    elif strategy == "batched":
+        tiles = tiles[torch.argsort(counts[tiles], descending=True)]
+        batches, start = [], 0
+        tile_counts = counts[tiles].tolist()
+        while start < len(tiles):
+            size = max(1, max_elements // (n_pixels * tile_counts[start]))
+            batches.append(tiles[start : start + size])
+            start += size
+    else:
+        raise ValueError(f"unknown rasterization strategy {strategy}")
+
+    blended, pixel_index = [], []
+    for batch in batches:
+        k = int(counts[batch].max())
+        slots = torch.arange(k, device=device)
+        valid = slots < counts[batch, None]
+        ids = gaussian_ids[torch.where(valid, tile_ranges[batch, :1] + slots, 0)]
+
+        origin = torch.stack([batch % grid_x, batch // grid_x], -1).to(xy.dtype)
+        pixels = origin[:, None, :] * BLOCK_SIZE + offsets
+        rgb, T = _composite(
+            pixels, xy[ids], conic[ids], opacity[ids], color[ids], valid
+        )
+        blended.append((rgb + T[..., None] * bg).reshape(-1, n_channels))
+        pixel_index.append(
+            (batch[:, None] * n_pixels + torch.arange(n_pixels, device=device)).reshape(
+                -1
+            )
+        )
+
+    image = bg.expand(grid_x * grid_y * n_pixels, n_channels)
+    if blended:
+        image = image.index_put((torch.cat(pixel_index),), torch.cat(blended))
+    image = image.reshape(grid_y, grid_x, BLOCK_SIZE, BLOCK_SIZE, n_channels)
+    return image.permute(4, 0, 2, 1, 3).reshape(
+        n_channels, grid_y * BLOCK_SIZE, grid_x * BLOCK_SIZE
+    )
+
+
+class GaussianRasterizer(nn.Module):
+    """
+    Drop-in, pure-PyTorch counterpart of `diff_gaussian_rasterization.GaussianRasterizer`.
+
+    Follows the CUDA pipeline (projection, 2D covariance with the 0.3 px low-pass,
+    16x16 tile binning, per-tile depth sort and front-to-back blending with the same
+    alpha thresholds) using differentiable tensor ops, so gradients reach every input
+    including the screen-space `means2D`. Meant for previews, thumbnails and
+    regression images on machines without CUDA.
+    """
+
+    def __init__(self, raster_settings, strategy="batched", max_elements=2**24):
+        super().__init__()
+        self.raster_settings = raster_settings
+        self.strategy = strategy
+        self.max_elements = max_elements
+
+    def markVisible(self, positions):
+        with torch.no_grad():
+            settings = self.raster_settings
+            p_view = (
+                positions @ settings.viewmatrix[:3, :3] + settings.viewmatrix[3, :3]
+            )
+            return p_view[:, 2] > 0.2
+
+    def forward(
+        self,
+        means3D,
+        means2D,
+        opacities,
+        shs=None,
+        colors_precomp=None,
+        scales=None,
+        rotations=None,
+        cov3D_precomp=None,
+    ):
+        settings = self.raster_settings
+        if (shs is None) == (colors_precomp is None):
+            raise Exception(
+                "Please provide excatly one of either SHs or precomputed colors!"
+            )
+        if ((scales is None or rotations is None) and cov3D_precomp is None) or (
+            (scales is not None or rotations is not None) and cov3D_precomp is not None
+        ):
+            raise Exception(
+                "Please provide exactly one of either scale/rotation pair or precomputed 3D covariance!"
+            )
+
+        if cov3D_precomp is not None:
+            cov3D = _cov3d_from_precomp(cov3D_precomp)
+        else:
+            cov3D = _cov3d_from_scaling_rotation(
+                scales, rotations, settings.scale_modifier
+            )
+        xy, depth, conic, radii = preprocess(means3D, cov3D, settings)
+        # means2D holds zeros; adding it in NDC units routes the screen-space gradient
+        # to it with the same scaling as the CUDA rasterizer
+        xy = xy + means2D[:, :2] * torch.tensor(
+            [0.5 * settings.image_width, 0.5 * settings.image_height],
+            dtype=xy.dtype,
+            device=xy.device,
+        )
+
+        if colors_precomp is None:
+            dirs = torch.nn.functional.normalize(means3D - settings.campos, dim=-1)
+            colors_precomp = torch.clamp_min(
+                eval_sh(settings.sh_degree, shs.transpose(1, 2), dirs) + 0.5, 0.0
+            )
+
+        grid = (
+            math.ceil(settings.image_width / BLOCK_SIZE),
+            math.ceil(settings.image_height / BLOCK_SIZE),
+        )
+        gaussian_ids, tile_ranges, tiles_touched = bin_gaussians(xy, depth, radii, grid)
+        # Like the CUDA rasterizer, Gaussians that touch no tile report a zero radius
+        radii = torch.where(tiles_touched > 0, radii, 0)
+        image = rasterize(
+            xy,
+            conic,
+            opacities[:, 0],
+            colors_precomp,
+            gaussian_ids,
+            tile_ranges,
+            grid,
+            settings.bg,
+            strategy=self.strategy,
+            max_elements=self.max_elements,
+        )
+        return image[:, : settings.image_height, : settings.image_width], radii
@@ -25,8 +25,9 @@ from typing import Generator
 
 from instant_splat.coarse_init_infer import coarse_infer
 import os
-from random import randint
 from instant_splat.scene.cameras import Camera
+from instant_splat.scene.view_loader import TrainViewLoader
+from instant_splat.utils.checkpoint_utils import CheckpointWriter
 from instant_splat.utils.loss_utils import l1_loss, ssim
 from instant_splat.gaussian_renderer import render
 from instant_splat.utils.sh_utils import SH2RGB
@@ -47,7 +48,6 @@ from typing import Any
 
 from time import perf_counter
 
-
 zero = torch.Tensor([0]).cuda()
 print(zero.device)  # <-- 'cpu' 🤔
 
@@ -103,7 +103,7 @@ def log_cameras(
         fy = cam.image_height / (2 * np.tan(FoVy / 2))
         principal_point = (cam.image_width / 2, cam.image_height / 2)
 
-        img_gt_viz: Float32[Tensor, "3 h w"] = cam.original_image * 255
+        img_gt_viz: Float32[Tensor, "3 h w"] = cam.get_gt_image() * 255
         img_gt_viz: UInt8[np.ndarray, "h w 3"] = (
             img_gt_viz.permute(1, 2, 0).numpy(force=True).astype(np.uint8)
         )
@@ -246,7 +246,7 @@ def training_report(
                         1.0,
                     )
                     gt_image = torch.clamp(
-                        viewpoint.original_image.to("cuda"), 0.0, 1.0
+                        viewpoint.get_gt_image("cuda"), 0.0, 1.0
                     )
                     l1_test += l1_loss(image, gt_image).mean().double()
                     psnr_test += psnr(image, gt_image).mean().double()
@@ -371,11 +371,9 @@ def _train_splat_fn(
         bg_color, dtype=torch.float32, device="cuda"
     )
 
-    iter_start = torch.cuda.Event(enable_timing=True)
-    iter_end = torch.cuda.Event(enable_timing=True)
-
-    viewpoint_stack = None
+    train_views = TrainViewLoader(scene.getTrainCameras(), gaussians.device)
     ema_loss_for_log = 0.0
+    checkpoint_writer = CheckpointWriter()
     progress_bar = tqdm(range(first_iter, opt.iterations), desc="Training progress")
     first_iter += 1
 
@@ -394,7 +392,6 @@ def _train_splat_fn(
     yield stream.read(), None, None
 
     for iteration in range(first_iter, opt.iterations + 1):
-        iter_start.record()
         rr.set_time_sequence("iteration", iteration)
 
         gaussians.update_learning_rate(iteration)
@@ -406,13 +403,10 @@ def _train_splat_fn(
         if iteration % 1000 == 0:
             gaussians.oneupSHdegree()
 
-        # Pick a random Camera
-        if not viewpoint_stack:
-            viewpoint_stack: list[Camera] = scene.getTrainCameras().copy()
-
-        viewpoint_cam: Camera = viewpoint_stack.pop(
-            randint(0, len(viewpoint_stack) - 1)
-        )
+        # Pick a random Camera; its ground truth is already on the way to the GPU
+        viewpoint_cam: Camera
+        gt_image: Float32[Tensor, "c h w"]
+        viewpoint_cam, gt_image = next(train_views)
         pose: Float32[Tensor, "7"] = gaussians.get_RT(viewpoint_cam.uid)
 
         # Render
@@ -428,7 +422,6 @@ def _train_splat_fn(
         )
         image: Float32[Tensor, "c h w"] = render_pkg["render"]
         # Loss
-        gt_image: Float32[Tensor, "c h w"] = viewpoint_cam.original_image.cuda()
 
         Ll1 = l1_loss(image, gt_image)
         loss = (1.0 - opt.lambda_dssim) * Ll1 + opt.lambda_dssim * (
@@ -436,8 +429,6 @@ def _train_splat_fn(
         )
         loss.backward()
 
-        iter_end.record()
-
         with torch.no_grad():
             # Progress bar
             ema_loss_for_log = 0.4 * loss.item() + 0.6 * ema_loss_for_log
@@ -479,9 +470,9 @@ def _train_splat_fn(
 
             if iteration in checkpoint_iterations:
                 print("\n[ITER {}] Saving Checkpoint".format(iteration))
-                torch.save(
+                checkpoint_writer.save(
+                    scene.model_path + "/chkpnt" + str(iteration) + ".ckpt",
                     (gaussians.capture(), iteration),
-                    scene.model_path + "/chkpnt" + str(iteration) + ".pth",
                 )
 
         end = perf_counter()
@@ -494,6 +485,8 @@ def _train_splat_fn(
         else:
             yield stream.read(), None, None
 
+    checkpoint_writer.wait()
+
 
 if IN_SPACES:
     train_splat_fn = spaces.GPU(train_splat_fn, duration=90)
@@ -1,9 +1,24 @@
+import threading
+from contextlib import nullcontext
 from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import numpy as np
 import rerun as rr
 import rerun.blueprint as rrb
+import torch
 from jaxtyping import Float32
 from torch import Tensor
 
+from instant_splat.arguments import PipelineParams
+from instant_splat.gaussian_renderer import render
+from instant_splat.scene.cameras import Camera
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.pose_utils import get_camera_from_tensor
+from instant_splat.utils.sh_utils import SH2RGB
+
+
 def log_3d_splats(parent_log_path: Path, gaussians: GaussianModel) -> None:
     initial_gaussians: Float32[Tensor, "num_gaussians 3"] = gaussians.get_xyz
     colors: Float32[Tensor, "num_gaussians 3"] = SH2RGB(gaussians.get_features)[:, 0, :]
@@ -52,7 +67,7 @@ def log_cameras(
         fy = cam.image_height / (2 * np.tan(FoVy / 2))
         principal_point = (cam.image_width / 2, cam.image_height / 2)
 
-        img_gt_viz: Float32[Tensor, "3 h w"] = cam.original_image * 255
+        img_gt_viz: Float32[Tensor, "3 h w"] = cam.get_gt_image() * 255
         img_gt_viz: Float32[np.ndarray, "h w 3"] = (
             img_gt_viz.permute(1, 2, 0).numpy(force=True).astype(np.uint8)
         )
@@ -134,4 +149,213 @@ def create_blueprint(parent_log_path: Path) -> rrb.Blueprint:
             column_shares=[2, 1],
         )
     )
-    return blueprint
\ No newline at end of file
+    return blueprint
+
+
+class AsyncTrainingLogger:
+    """
+    Log training progress to rerun from a background thread.
+
+    The `log_*` calls only take a device-side snapshot of what they log and hand it
+    to a worker thread, which renders and copies to the host (on its own CUDA
+    stream) while training continues. Each kind of job has one waiting slot; a job
+    submitted while the previous one of its kind still waits is dropped, so a slow
+    viewer or a large scene lowers the logging rate instead of slowing training.
+    A camera job renders the views of `image_cameras` in turn until `budget`
+    seconds have passed (at least one view per job) and leaves the rest for the
+    next job.
+
+    `main_thread_seconds` is the time the training thread spent in the logger.
+    """
+
+    def __init__(
+        self,
+        parent_log_path: Path,
+        cameras: list[Camera],
+        pipe,
+        bg: Float32[Tensor, "3"],
+        image_cameras: list[int],
+        budget: float,
+    ) -> None:
+        self.parent_log_path = parent_log_path
+        self.cameras = cameras
+        self.pipe = pipe
+        self.bg = bg
+        self.image_cameras = [
+            cameras[idx] for idx in image_cameras if idx < len(cameras)
+        ]
+        self.budget = budget
+        self.next_image = 0
+        # rerun recordings and timelines are thread local
+        self.recording = rr.get_data_recording()
+        self.stream = torch.cuda.Stream() if bg.is_cuda else None
+        # At most one waiting job per log_fn, in submission order; None stops
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.error = None
+        self.main_thread_seconds = 0.0
+        self.worker_seconds = 0.0
+        self.submitted = 0
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._submit(self._log_static, lambda: ())
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                log_fn = next(iter(self.pending))
+                if log_fn is None:
+                    return
+                copied, snapshot = self.pending.pop(log_fn)
+            start = perf_counter()
+            try:
+                if self.stream is None:
+                    stream = nullcontext()
+                else:
+                    stream = torch.cuda.stream(self.stream)
+                    self.stream.wait_event(copied)
+                with torch.no_grad(), stream:
+                    log_fn(*snapshot)
+            except Exception as error:
+                self.error = error
+            self.worker_seconds += perf_counter() - start
+
+    def _submit(self, log_fn, snapshot_fn) -> None:
+        """
+        Run `log_fn(*snapshot_fn())` in the worker, unless a job of `log_fn` is still
+        waiting for it, in which case this one is dropped.
+        """
+        start = perf_counter()
+        if self.error is not None:
+            raise RuntimeError("rerun logging failed") from self.error
+        self.submitted += 1
+        # The worker only removes jobs, so at worst this drops one it just started
+        if log_fn in self.pending:
+            self.dropped += 1
+        else:
+            with torch.no_grad():
+                snapshot = snapshot_fn()
+            copied = None
+            if self.stream is not None:
+                copied = torch.cuda.Event()
+                copied.record()
+            with self.condition:
+                self.pending[log_fn] = (copied, snapshot)
+                self.condition.notify()
+        self.main_thread_seconds += perf_counter() - start
+
+    def _set_time(self, iteration: int) -> None:
+        rr.set_time_sequence("iteration", iteration, recording=self.recording)
+
+    def _log_static(self) -> None:
+        for cam in self.cameras:
+            fx = cam.image_width / (2 * np.tan(cam.FoVx / 2))
+            fy = cam.image_height / (2 * np.tan(cam.FoVy / 2))
+            rr.log(
+                f"{self.parent_log_path / f'camera_{cam.uid}'}/pinhole",
+                rr.Pinhole(
+                    width=cam.image_width,
+                    height=cam.image_height,
+                    focal_length=(fx, fy),
+                    principal_point=(cam.image_width / 2, cam.image_height / 2),
+                    camera_xyz=rr.ViewCoordinates.RDF,
+                    image_plane_distance=0.01,
+                ),
+                static=True,
+                recording=self.recording,
+            )
+        # The ground truth does not change; log it outside of the camera to avoid
+        # cluttering the view
+        for cam in self.image_cameras:
+            rr.log(
+                f"{self.parent_log_path}/gt_image_{cam.uid}",
+                rr.Image(_to_uint8_hwc(cam.get_gt_image())),
+                static=True,
+                recording=self.recording,
+            )
+
+    def log_cameras(self, iteration: int, gaussians: GaussianModel) -> None:
+        """
+        Log the camera poses and render the next of `image_cameras`. Only the poses
+        are copied, plus the Gaussians if there is a view to render.
+        """
+        self._submit(
+            self._log_cameras,
+            lambda: (
+                iteration,
+                gaussians.P.detach().clone(),
+                gaussians.snapshot() if self.image_cameras else None,
+            ),
+        )
+
+    def _log_cameras(
+        self, iteration: int, poses: Tensor, gaussians: GaussianModel | None
+    ) -> None:
+        self._set_time(iteration)
+        deadline = perf_counter() + self.budget
+        w2cs = torch.stack(
+            [get_camera_from_tensor(poses[cam.uid]) for cam in self.cameras]
+        ).cpu()
+        for cam, cam_T_world in zip(self.cameras, w2cs.numpy()):
+            rr.log(
+                f"{self.parent_log_path / f'camera_{cam.uid}'}",
+                rr.Transform3D(
+                    translation=cam_T_world[:3, 3],
+                    mat3x3=cam_T_world[:3, :3],
+                    from_parent=True,
+                    axis_length=0.01,
+                ),
+                recording=self.recording,
+            )
+
+        for n_rendered in range(len(self.image_cameras)):
+            if n_rendered and perf_counter() > deadline:
+                break
+            cam = self.image_cameras[self.next_image]
+            self.next_image = (self.next_image + 1) % len(self.image_cameras)
+            image = render(
+                cam,
+                gaussians,
+                self.pipe,
+                self.bg,
+                camera_pose=poses[cam.uid],
+            )["render"]
+            rr.log(
+                f"{self.parent_log_path / f'camera_{cam.uid}'}/pinhole/image",
+                rr.Image(_to_uint8_hwc(image)),
+                recording=self.recording,
+            )
+
+    def log_3d_splats(self, iteration: int, gaussians: GaussianModel) -> None:
+        self._submit(
+            self._log_3d_splats,
+            lambda: (
+                iteration,
+                gaussians.get_xyz.detach().clone(),
+                SH2RGB(gaussians._features_dc[:, 0]),
+            ),
+        )
+
+    def _log_3d_splats(self, iteration: int, xyz, colors) -> None:
+        self._set_time(iteration)
+        rr.log(
+            f"{self.parent_log_path}/gaussian_points",
+            rr.Points3D(positions=xyz.cpu().numpy(), colors=colors.cpu().numpy()),
+            recording=self.recording,
+        )
+
+    def close(self) -> None:
+        """Wait for the logged jobs to finish and stop the worker."""
+        with self.condition:
+            self.pending[None] = None
+            self.condition.notify()
+        self.thread.join()
+        if self.error is not None:
+            raise RuntimeError("rerun logging failed") from self.error
+
+
+def _to_uint8_hwc(image: Float32[Tensor, "3 h w"]) -> np.ndarray:
+    """Convert on the device, so only a quarter of the bytes go to the host."""
+    return (image.clamp(0, 1) * 255).to(torch.uint8).permute(1, 2, 0).cpu().numpy()
@@ -92,12 +92,18 @@ class Scene:
         for resolution_scale in resolution_scales:
             print("Loading Training Cameras")
             self.train_cameras[resolution_scale] = cameraList_from_camInfos(
-                scene_info.train_cameras, resolution_scale, args
+                scene_info.train_cameras,
+                resolution_scale,
+                args,
+                device=self.gaussians.device,
             )
             print("train_camera_num: ", len(self.train_cameras[resolution_scale]))
             print("Loading Test Cameras")
             self.test_cameras[resolution_scale] = cameraList_from_camInfos(
-                scene_info.test_cameras, resolution_scale, args
+                scene_info.test_cameras,
+                resolution_scale,
+                args,
+                device=self.gaussians.device,
             )
             print("test_camera_num: ", len(self.test_cameras[resolution_scale]))
 
@@ -114,11 +120,19 @@ class Scene:
             self.gaussians.create_from_pcd(scene_info.point_cloud, self.cameras_extent)
             self.gaussians.init_RT_seq(self.train_cameras)
 
-    def save(self, iteration):
+    def save(self, iteration, compressed=False, streamable=False):
         point_cloud_path = os.path.join(
             self.model_path, "point_cloud/iteration_{}".format(iteration)
         )
         self.gaussians.save_ply(os.path.join(point_cloud_path, "point_cloud.ply"))
+        if compressed:
+            self.gaussians.save_compressed_ply(
+                os.path.join(point_cloud_path, "point_cloud_compressed.ply")
+            )
+        if streamable:
+            self.gaussians.save_streamable_splat(
+                os.path.join(point_cloud_path, "point_cloud.splatstream")
+            )
 
     def getTrainCameras(self, scale=1.0):
         return self.train_cameras[scale]
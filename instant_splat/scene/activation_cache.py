@@ -0,0 +1,48 @@
+import weakref
+
+import torch
+
+
+class ActivationCache:
+    """
+    Activations of GaussianModel parameters, computed at most once per parameter
+    version.
+
+    An entry is keyed on the identity and autograd version counter of its source
+    tensors, so it is invalidated when a parameter is replaced (densification, pruning,
+    loading) or modified in place (optimizer step, opacity reset). Values computed with
+    gradients disabled are never handed out while gradients are enabled, and a value's
+    graph is only reused until a backward pass has gone through it.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, name, activation, *sources):
+        grad_enabled = torch.is_grad_enabled()
+        versions = tuple(source._version for source in sources)
+        entry = self.entries.get(name)
+        if (
+            entry is not None
+            and entry["versions"] == versions
+            and (not grad_enabled or (entry["grad_enabled"] and not entry["consumed"]))
+            and all(ref() is source for ref, source in zip(entry["sources"], sources))
+        ):
+            return entry["value"]
+
+        value = activation(*sources)
+        entry = {
+            "sources": tuple(weakref.ref(source) for source in sources),
+            "versions": versions,
+            "grad_enabled": grad_enabled,
+            "consumed": False,
+            "value": value,
+        }
+        if isinstance(value, torch.Tensor) and value.requires_grad:
+            # The saved tensors of the graph are freed by backward
+            value.register_hook(lambda grad: entry.update(consumed=True))
+        self.entries[name] = entry
+        return value
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,94 @@
+import torch
+
+from instant_splat.utils.sh_utils import eval_sh, sh_truncation_error
+
+
+class AdaptiveSH:
+    """
+    View-dependent colour with a per-Gaussian SH degree.
+
+    Gaussians are bucketed by degree: `coefficients[d]` holds the band 1..d
+    coefficients, (n_d, (d + 1) ** 2 - 1, 3), of the Gaussians with degree d in their
+    order, so a Gaussian without noticeable view dependence costs one byte (its
+    degree) instead of 45 floats. Indexing with a mask or an index tensor selects
+    Gaussians like indexing any per-Gaussian tensor. The DC term stays with the model.
+    """
+
+    def __init__(self, degrees, coefficients):
+        self.degrees = degrees
+        self.coefficients = coefficients
+
+    @classmethod
+    @torch.no_grad()
+    def from_features(cls, features_rest, degrees, max_degree):
+        coefficients = [
+            features_rest[degrees == d, : (d + 1) ** 2 - 1].contiguous()
+            for d in range(max_degree + 1)
+        ]
+        return cls(degrees, coefficients)
+
+    @classmethod
+    @torch.no_grad()
+    def prune(cls, features_rest, max_degree, max_error):
+        """
+        Give every Gaussian the lowest degree whose colour stays within `max_error`
+        (RMS over view directions, see `sh_truncation_error`) of degree `max_degree`.
+        """
+        error = sh_truncation_error(features_rest, max_degree)
+        degrees = (error > max_error).sum(dim=1).to(torch.uint8)
+        return cls.from_features(features_rest, degrees, max_degree)
+
+    def __len__(self):
+        return len(self.degrees)
+
+    @property
+    def max_degree(self):
+        return len(self.coefficients) - 1
+
+    def degree_counts(self):
+        return torch.bincount(self.degrees.long(), minlength=self.max_degree + 1)
+
+    def nbytes(self):
+        return self.degrees.nbytes + sum(c.nbytes for c in self.coefficients)
+
+    def _slots(self):
+        """Row of every Gaussian in the bucket of its degree."""
+        slots = torch.empty(len(self), dtype=torch.long, device=self.degrees.device)
+        for d, coefficients in enumerate(self.coefficients):
+            slots[self.degrees == d] = torch.arange(
+                len(coefficients), device=slots.device
+            )
+        return slots
+
+    def __getitem__(self, index):
+        degrees = self.degrees[index]
+        slots = self._slots()[index]
+        return AdaptiveSH(
+            degrees,
+            [c[slots[degrees == d]] for d, c in enumerate(self.coefficients)],
+        )
+
+    def to_dense(self, max_degree=None):
+        """The (N, (max_degree + 1) ** 2 - 1, 3) coefficients, zero above each degree."""
+        max_degree = self.max_degree if max_degree is None else max_degree
+        dense = self.coefficients[0].new_zeros(
+            (len(self), (max_degree + 1) ** 2 - 1, 3)
+        )
+        for d, coefficients in enumerate(self.coefficients[: max_degree + 1]):
+            dense[self.degrees == d, : coefficients.shape[1]] = coefficients
+        return dense
+
+    def colors(self, features_dc, dirs, max_degree=None):
+        """
+        RGB of every Gaussian seen along the unit `dirs` (N, 3), computed like the
+        rasterizer does from SH, each bucket at its own degree (at most `max_degree`).
+        """
+        max_degree = self.max_degree if max_degree is None else max_degree
+        rgb = dirs.new_empty((len(self), 3))
+        for d, coefficients in enumerate(self.coefficients):
+            members = self.degrees == d
+            sh = torch.cat((features_dc[members], coefficients), dim=1).to(rgb.dtype)
+            rgb[members] = eval_sh(
+                min(d, max_degree), sh.transpose(1, 2), dirs[members]
+            )
+        return torch.clamp_min(rgb + 0.5, 0.0)
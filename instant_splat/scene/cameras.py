@@ -13,6 +13,11 @@ import torch
 from torch import nn
 import numpy as np
 from instant_splat.utils.graphics_utils import getWorld2View2, getProjectionMatrix
+from instant_splat.utils.general_utils import get_default_device
+
+
+def _to_uint8(image):
+    return image.clamp(0.0, 1.0).mul(255.0).round_().to(torch.uint8)
 
 
 class Camera(nn.Module):
@@ -29,8 +34,14 @@ class Camera(nn.Module):
         uid,
         trans=np.array([0.0, 0.0, 0.0]),
         scale=1.0,
-        data_device="cuda",
+        data_device=None,
+        device=None,
+        image_dtype=torch.float32,
     ):
+        """
+        With `image_dtype=torch.uint8` the ground truth and its alpha mask are kept
+        as bytes, a quarter of the float32 size; `get_gt_image` converts them.
+        """
         super(Camera, self).__init__()
 
         self.uid = uid
@@ -41,25 +52,32 @@ class Camera(nn.Module):
         self.FoVy = FoVy
         self.image_name = image_name
 
+        # Camera matrices live on `device` (the model's), images on `data_device`
+        self.device = torch.device(device) if device else get_default_device()
         try:
-            self.data_device = torch.device(data_device)
+            self.data_device = torch.device(data_device or self.device)
         except Exception as e:
             print(e)
             print(
-                f"[Warning] Custom device {data_device} failed, fallback to default cuda device"
+                f"[Warning] Custom device {data_device} failed, fallback to {self.device}"
             )
-            self.data_device = torch.device("cuda")
+            self.data_device = self.device
 
-        self.original_image = image.clamp(0.0, 1.0).to(self.data_device)
-        self.image_width = self.original_image.shape[2]
-        self.image_height = self.original_image.shape[1]
-
-        if gt_alpha_mask is not None:
-            self.original_image *= gt_alpha_mask.to(self.data_device)
-        else:
-            self.original_image *= torch.ones(
-                (1, self.image_height, self.image_width), device=self.data_device
+        self.image_width = image.shape[2]
+        self.image_height = image.shape[1]
+        if image_dtype == torch.uint8:
+            # Quantized on the host, so the float image never reaches data_device
+            self.original_image = _to_uint8(image).to(self.data_device)
+            self.gt_alpha_mask = (
+                None
+                if gt_alpha_mask is None
+                else _to_uint8(gt_alpha_mask).to(self.data_device)
             )
+        else:
+            self.original_image = image.clamp(0.0, 1.0).to(self.data_device)
+            if gt_alpha_mask is not None:
+                self.original_image *= gt_alpha_mask.to(self.data_device)
+            self.gt_alpha_mask = None
 
         self.zfar = 100.0
         self.znear = 0.01
@@ -68,14 +86,16 @@ class Camera(nn.Module):
         self.scale = scale
 
         self.world_view_transform = (
-            torch.tensor(getWorld2View2(R, T, trans, scale)).transpose(0, 1).cuda()
+            torch.tensor(getWorld2View2(R, T, trans, scale))
+            .transpose(0, 1)
+            .to(self.device)
         )
         self.projection_matrix = (
             getProjectionMatrix(
                 znear=self.znear, zfar=self.zfar, fovX=self.FoVx, fovY=self.FoVy
             )
             .transpose(0, 1)
-            .cuda()
+            .to(self.device)
         )
         self.full_proj_transform = (
             self.world_view_transform.unsqueeze(0).bmm(
@@ -84,6 +104,16 @@ class Camera(nn.Module):
         ).squeeze(0)
         self.camera_center = self.world_view_transform.inverse()[3, :3]
 
+    def get_gt_image(self, device=None):
+        """The masked ground truth as float32 in [0, 1] on `device` (default data_device)."""
+        image = self.original_image.to(device or self.data_device, non_blocking=True)
+        if image.dtype == torch.uint8:
+            image = image.float().div_(255.0)
+        if self.gt_alpha_mask is not None:
+            mask = self.gt_alpha_mask.to(image.device, non_blocking=True)
+            image = image.mul_(mask.float().div_(255.0))
+        return image
+
 
 class MiniCam:
     def __init__(
@@ -24,9 +24,13 @@ from instant_splat.utils.graphics_utils import getWorld2View2, focal2fov, fov2fo
 import numpy as np
 import json
 from pathlib import Path
-from plyfile import PlyData, PlyElement
 from instant_splat.utils.sh_utils import SH2RGB
 from instant_splat.scene.gaussian_model import BasicPointCloud
+from instant_splat.utils.ply_utils import (
+    store_point_cloud_ply,
+    read_vertex_ply,
+    vertex_columns,
+)
 
 try:
     from pillow_heif import register_heif_opener  # noqa
@@ -212,38 +216,15 @@ def readColmapCamerasInterp(cam_extrinsics, cam_intrinsics, images_folder, model
 
 
 def fetchPly(path):
-    plydata = PlyData.read(path)
-    vertices = plydata["vertex"]
-    positions = np.vstack([vertices["x"], vertices["y"], vertices["z"]]).T
-    colors = np.vstack([vertices["red"], vertices["green"], vertices["blue"]]).T / 255.0
-    normals = np.vstack([vertices["nx"], vertices["ny"], vertices["nz"]]).T
+    vertices = read_vertex_ply(path)
+    positions = vertex_columns(vertices, ["x", "y", "z"])
+    colors = vertex_columns(vertices, ["red", "green", "blue"]) / 255.0
+    normals = vertex_columns(vertices, ["nx", "ny", "nz"])
     return BasicPointCloud(points=positions, colors=colors, normals=normals)
 
 
 def storePly(path, xyz, rgb):
-    # Define the dtype for the structured array
-    dtype = [
-        ("x", "f4"),
-        ("y", "f4"),
-        ("z", "f4"),
-        ("nx", "f4"),
-        ("ny", "f4"),
-        ("nz", "f4"),
-        ("red", "u1"),
-        ("green", "u1"),
-        ("blue", "u1"),
-    ]
-
-    normals = np.zeros_like(xyz)
-
-    elements = np.empty(xyz.shape[0], dtype=dtype)
-    attributes = np.concatenate((xyz, normals, rgb), axis=1)
-    elements[:] = list(map(tuple, attributes))
-
-    # Create the PlyData object and write to file
-    vertex_element = PlyElement.describe(elements, "vertex")
-    ply_data = PlyData([vertex_element])
-    ply_data.write(path)
+    store_point_cloud_ply(path, xyz, rgb)
 
 
 def readColmapSceneInfo(path, images, eval, args, opt, llffhold=2):
@@ -0,0 +1,234 @@
+import math
+
+import torch
+
+from instant_splat.scene.adaptive_sh import AdaptiveSH
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.general_utils import build_scaling_rotation, inverse_sigmoid
+from instant_splat.utils.point_cloud_utils import morton_codes
+from instant_splat.utils.pose_utils import rotation2quad
+
+# Raw GaussianModel parameters stored for every node, in `_<name>` form
+LOD_ATTRIBUTES = (
+    "xyz",
+    "features_dc",
+    "features_rest",
+    "opacity",
+    "scaling",
+    "rotation",
+)
+
+
+def _merge(gaussians: GaussianModel, features_rest, sh_degrees, node, n_nodes):
+    """
+    Moment-match the Gaussians of every node into one Gaussian per node.
+
+    Weights are opacity times ellipsoid volume. The merged mean and covariance
+    match the weighted mixture's first two moments, and SH coefficients are the
+    weighted average of the dense `features_rest`; with adaptive SH, a node gets
+    the highest of its members' `sh_degrees`. Opacity composites the members with each one's coverage
+    taken relative to the merged footprint: 1 - prod (1 - alpha_i)^(A_i / A).
+    Returns the raw parameters and each node's bounding radius, which covers its
+    members' 3-sigma ellipsoids.
+    """
+    xyz = gaussians.get_xyz
+    # Inference-only models may hold half-precision attributes
+    scales = gaussians.get_scaling.float()
+    alpha = gaussians.get_opacity[:, 0].float()
+    weight = (alpha * scales.prod(dim=1)).clamp_min(1e-12)
+
+    def node_sum(values):
+        out = values.new_zeros((n_nodes,) + values.shape[1:])
+        return out.index_add_(0, node, values)
+
+    total = node_sum(weight)
+    normalized = weight / total[node]
+
+    def node_mean(values):
+        return node_sum(values * normalized.view((-1,) + (1,) * (values.dim() - 1)))
+
+    mean = node_mean(xyz)
+    offset = xyz - mean[node]
+    L = build_scaling_rotation(scales, gaussians._rotation.float())
+    cov = node_mean(L @ L.transpose(1, 2) + offset[:, :, None] * offset[:, None, :])
+
+    eigvals, eigvecs = torch.linalg.eigh(cov)
+    merged_scales = eigvals.clamp_min(1e-12).sqrt()
+    # eigh returns an orthonormal basis; flip one axis where it is a reflection
+    eigvecs[:, :, 0] *= torch.linalg.det(eigvecs).sign()[:, None]
+
+    # Projected footprint of a member, from its two largest axes
+    def area(s):
+        top2 = s.topk(2, dim=1).values
+        return top2[:, 0] * top2[:, 1]
+
+    coverage = (area(scales) / area(merged_scales)[node]).clamp(max=1.0)
+    log_transmittance = node_sum(coverage * torch.log1p(-alpha.clamp(max=0.99)))
+    merged_alpha = (1.0 - torch.exp(log_transmittance)).clamp(1e-6, 0.99)
+
+    radius = torch.zeros(n_nodes, device=xyz.device).scatter_reduce_(
+        0,
+        node,
+        offset.norm(dim=1) + 3.0 * scales.max(dim=1).values,
+        "amax",
+        include_self=False,
+    )
+    params = {
+        "xyz": mean,
+        "features_dc": node_mean(gaussians._features_dc),
+        "features_rest": node_mean(features_rest),
+        "opacity": inverse_sigmoid(merged_alpha)[:, None],
+        "scaling": torch.log(merged_scales),
+        "rotation": rotation2quad(eigvecs),
+    }
+    if sh_degrees is not None:
+        params["sh_degrees"] = (
+            torch.zeros(n_nodes, dtype=torch.long, device=xyz.device)
+            .scatter_reduce_(0, node, sh_degrees.long(), "amax", include_self=False)
+            .to(torch.uint8)
+        )
+    return params, radius
+
+
+class GaussianLOD:
+    """
+    Octree level-of-detail hierarchy over a trained GaussianModel.
+
+    The octree follows the Morton code of every Gaussian, so each level's nodes are
+    the Gaussians that share a code prefix. Each node stores one moment-matched
+    Gaussian (see `_merge`) and the index of its parent in the level above. The
+    original Gaussians form the finest level. `cut` picks, per camera, the coarsest
+    nodes whose projected size stays below a pixel error.
+    """
+
+    def __init__(self, levels, sh_degree, active_sh_degree):
+        self.levels = levels
+        self.sh_degree = sh_degree
+        self.active_sh_degree = active_sh_degree
+
+    @classmethod
+    @torch.no_grad()
+    def build(cls, gaussians: GaussianModel, bits=16, min_reduction=0.5):
+        """
+        Build the hierarchy offline. Levels are octree depths 1..bits. A depth is
+        kept only if it has at most `min_reduction` times as many nodes as the next
+        kept finer level, so near-duplicate levels are skipped.
+        """
+        device = gaussians.get_xyz.device
+        codes = morton_codes(gaussians.get_xyz.cpu().numpy(), bits=bits)
+        codes = torch.from_numpy(codes.astype("int64")).to(device)
+
+        leaves = {
+            name: getattr(gaussians, "_" + name).detach() for name in LOD_ATTRIBUTES
+        }
+        sh_degrees = None
+        if gaussians.adaptive_sh is not None:
+            # Merging averages full coefficients; bands above a Gaussian's degree
+            # are zero, so the dense form renders the same as the adaptive one
+            leaves["features_rest"] = gaussians.adaptive_sh.to_dense(
+                gaussians.max_sh_degree
+            )
+            sh_degrees = leaves["sh_degrees"] = gaussians.adaptive_sh.degrees
+        levels = [
+            dict(leaves, radius=None, node=torch.arange(len(codes), device=device))
+        ]
+        for depth in range(bits - 1, 0, -1):
+            prefix = codes >> (3 * (bits - depth))
+            keys, node = torch.unique(prefix, return_inverse=True)
+            if len(keys) > min_reduction * len(levels[-1]["xyz"]):
+                continue
+            params, radius = _merge(
+                gaussians, leaves["features_rest"], sh_degrees, node, len(keys)
+            )
+            levels.append(dict(params, radius=radius, node=node))
+
+        # Coarse to fine, each level pointing at its parent in the level above
+        levels.reverse()
+        for parent, child in zip(levels, levels[1:]):
+            child["parent"] = torch.zeros(
+                len(child["xyz"]), dtype=torch.long, device=device
+            ).index_copy_(0, child["node"], parent["node"])
+        levels[0]["parent"] = torch.zeros(
+            len(levels[0]["xyz"]), dtype=torch.long, device=device
+        )
+        for level in levels:
+            del level["node"]
+        return cls(levels, gaussians.max_sh_degree, gaussians.active_sh_degree)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def level_sizes(self):
+        return [len(level["xyz"]) for level in self.levels]
+
+    @torch.no_grad()
+    def cut(self, camera_center, focal, pixel_error=1.0) -> GaussianModel:
+        """
+        A GaussianModel holding the LOD cut for a camera at `camera_center` (model
+        frame) with focal length `focal` in pixels.
+
+        Descending from the root, a node is drawn instead of its children once the
+        projected radius of its bounding sphere is below `pixel_error` pixels and the
+        sphere does not contain the camera. Leaves are drawn when their parent is
+        expanded.
+        """
+        selected, expanded = [], None
+        for level in self.levels:
+            reached = (
+                torch.ones_like(level["parent"], dtype=torch.bool)
+                if expanded is None
+                else expanded[level["parent"]]
+            )
+            if level["radius"] is None:
+                draw = reached
+            else:
+                dist = (level["xyz"] - camera_center).norm(dim=1)
+                coarse_enough = (dist > level["radius"]) & (
+                    focal * level["radius"] < pixel_error * dist
+                )
+                draw = reached & coarse_enough
+                expanded = reached & ~coarse_enough
+            selected.append((level, torch.nonzero(draw).squeeze(1)))
+
+        model = GaussianModel(self.sh_degree, device=camera_center.device)
+        model.active_sh_degree = self.active_sh_degree
+        for name in LOD_ATTRIBUTES:
+            setattr(
+                model,
+                "_" + name,
+                torch.cat([level[name][index] for level, index in selected]),
+            )
+        if "sh_degrees" in self.levels[0]:
+            model.adaptive_sh = AdaptiveSH.from_features(
+                model._features_rest,
+                torch.cat([level["sh_degrees"][index] for level, index in selected]),
+                self.sh_degree,
+            )
+            model._features_rest = model._features_rest.new_empty(
+                (len(model._xyz), 0, 3)
+            )
+        return model
+
+    def cut_for_view(self, viewpoint_camera, w2c, pixel_error=1.0) -> GaussianModel:
+        """`cut` for a camera whose model-to-camera transform is `w2c` (4, 4)."""
+        R, t = w2c[:3, :3], w2c[:3, 3]
+        camera_center = -(R.T @ t)
+        focal = viewpoint_camera.image_width / (
+            2.0 * math.tan(viewpoint_camera.FoVx * 0.5)
+        )
+        return self.cut(camera_center, focal, pixel_error)
+
+    def save(self, path):
+        torch.save(
+            {
+                "levels": self.levels,
+                "sh_degree": self.sh_degree,
+                "active_sh_degree": self.active_sh_degree,
+            },
+            path,
+        )
+
+    @classmethod
+    def load(cls, path, device=None):
+        state = torch.load(path, map_location=device)
+        return cls(state["levels"], state["sh_degree"], state["active_sh_degree"])
@@ -17,14 +17,34 @@ from instant_splat.utils.general_utils import (
     inverse_sigmoid,
     get_expon_lr_func,
     build_rotation,
+    get_default_device,
 )
 from torch import nn
 import os
+import weakref
 from instant_splat.utils.system_utils import mkdir_p
-from plyfile import PlyData, PlyElement
+from instant_splat.scene.gaussian_optimizer import GaussianAdam
+from instant_splat.scene.activation_cache import ActivationCache
+from instant_splat.scene.adaptive_sh import AdaptiveSH
+from instant_splat.utils.ply_utils import (
+    write_vertex_ply,
+    write_ply_elements,
+    read_vertex_ply,
+    read_ply_element,
+    vertex_columns,
+)
 from instant_splat.utils.sh_utils import RGB2SH
-from simple_knn._C import distCUDA2
-from instant_splat.utils.graphics_utils import BasicPointCloud
+from instant_splat.utils.knn_utils import mean_sq_dist_3nn
+from instant_splat.utils.spatial_index import MortonIndex
+from instant_splat.utils.graphics_utils import BasicPointCloud, SplatAttributes
+from instant_splat.utils.splat_compression import (
+    save_compressed_ply,
+    load_compressed_ply,
+)
+from instant_splat.utils.splat_streaming import (
+    save_streamable_splat,
+    load_streamable_splat,
+)
 from instant_splat.utils.general_utils import strip_symmetric, build_scaling_rotation
 from scipy.spatial.transform import Rotation as R
 from instant_splat.utils.pose_utils import rotation2quad, get_tensor_from_camera
@@ -73,6 +93,30 @@ def quaternion_to_rotation_matrix(quaternion):
     return R
 
 
+def _sh_columns(features):
+    """(N, K, 3) SH coefficients as (N, 3K) float32 PLY columns, channel-major."""
+    return (
+        features.detach()
+        .float()
+        .transpose(1, 2)
+        .flatten(start_dim=1)
+        .contiguous()
+        .cpu()
+        .numpy()
+    )
+
+
+# Per-Gaussian parameters, one for each of GaussianStorage's GAUSSIAN_GROUPS
+GAUSSIAN_ATTRIBUTES = (
+    "_xyz",
+    "_features_dc",
+    "_features_rest",
+    "_opacity",
+    "_scaling",
+    "_rotation",
+)
+
+
 class GaussianModel:
     def setup_functions(self):
         def build_covariance_from_scaling_rotation(scaling, scaling_modifier, rotation):
@@ -91,7 +135,14 @@ class GaussianModel:
 
         self.rotation_activation = torch.nn.functional.normalize
 
-    def __init__(self, sh_degree: int):
+    def __init__(self, sh_degree: int, device=None, inference_dtype=None):
+        """
+        With `inference_dtype` (e.g. torch.float16), loaded models hold their
+        attributes as plain tensors of that dtype, without gradients, for rendering
+        only; the renderer converts them to float32 at the rasterizer.
+        """
+        self.device = torch.device(device) if device else get_default_device()
+        self.inference_dtype = inference_dtype
         self.active_sh_degree = 0
         self.max_sh_degree = sh_degree
         self._xyz = torch.empty(0)
@@ -104,27 +155,53 @@ class GaussianModel:
         self.xyz_gradient_accum = torch.empty(0)
         self.denom = torch.empty(0)
         self.optimizer = None
+        self.storage = None
         self.percent_dense = 0
         self.spatial_lr_scale = 0
+        self._activations = ActivationCache()
+        self._spatial_index = None
+        self._spatial_index_sync = None
+        self.adaptive_sh = None
         self.setup_functions()
 
     def capture(self):
+        # Parameters are views into the storage buffers, which would be serialized
+        # whole; capture compact copies and leave the spare capacity in place
+        params, optimizer_state = self.storage.capture()
         return (
             self.active_sh_degree,
-            self._xyz,
-            self._features_dc,
-            self._features_rest,
-            self._scaling,
-            self._rotation,
-            self._opacity,
+            params["xyz"],
+            params["f_dc"],
+            params["f_rest"],
+            params["scaling"],
+            params["rotation"],
+            params["opacity"],
             self.max_radii2D,
             self.xyz_gradient_accum,
             self.denom,
-            self.optimizer.state_dict(),
+            optimizer_state,
             self.spatial_lr_scale,
             self.P,
         )
 
+    @torch.no_grad()
+    def snapshot(self):
+        """
+        A detached copy of what rendering the current state needs, that training can
+        go on updating this model underneath: the Gaussians, with SH coefficients up to
+        the active degree only. Camera poses are not included.
+        """
+        snapshot = GaussianModel(self.active_sh_degree, device=self.device)
+        snapshot.active_sh_degree = self.active_sh_degree
+        n_rest = (self.active_sh_degree + 1) ** 2 - 1
+        for name in GAUSSIAN_ATTRIBUTES:
+            tensor = getattr(self, name).detach()
+            if name == "_features_rest":
+                tensor = tensor[:, :n_rest]
+            setattr(snapshot, name, tensor.clone())
+        snapshot.adaptive_sh = self.adaptive_sh
+        return snapshot
+
     def restore(self, model_args, training_args):
         (
             self.active_sh_degree,
@@ -145,19 +222,38 @@ class GaussianModel:
         self.xyz_gradient_accum = xyz_gradient_accum
         self.denom = denom
         self.optimizer.load_state_dict(opt_dict)
+        self._setup_storage()
 
     @property
     def get_scaling(self):
-        return self.scaling_activation(self._scaling)
+        return self._activations.get("scaling", self.scaling_activation, self._scaling)
 
     @property
     def get_rotation(self):
-        return self.rotation_activation(self._rotation)
+        return self._activations.get(
+            "rotation", self.rotation_activation, self._rotation
+        )
 
     @property
     def get_xyz(self):
         return self._xyz
 
+    @property
+    def get_spatial_index(self):
+        """
+        Morton index over the Gaussian centers. Densification and pruning update it
+        incrementally; before it is handed out it is re-synced to points the
+        optimizer moved since the last access.
+        """
+        xyz = self._xyz.detach().float()
+        index, sync = self._spatial_index, self._spatial_index_sync
+        if index is None or len(index) != len(xyz):
+            self._spatial_index = MortonIndex(xyz)
+        elif sync[0]() is not self._xyz or sync[1] != self._xyz._version:
+            index.refresh(xyz)
+        self._spatial_index_sync = (weakref.ref(self._xyz), self._xyz._version)
+        return self._spatial_index
+
     def compute_relative_world_to_camera(self, R1, t1, R2, t2):
         # Create a row of zeros with a one at the end, for homogeneous coordinates
         zero_row = np.array([[0, 0, 0, 1]], dtype=np.float32)
@@ -187,7 +283,7 @@ class GaussianModel:
             )  # R T -> quat t
             poses.append(p)
         poses = torch.stack(poses)
-        self.P = poses.cuda().requires_grad_(True)
+        self.P = poses.to(self.device).requires_grad_(True)
 
     def get_RT(self, idx):
         pose = self.P[idx]
@@ -199,13 +295,18 @@ class GaussianModel:
 
     @property
     def get_features(self):
-        features_dc = self._features_dc
-        features_rest = self._features_rest
-        return torch.cat((features_dc, features_rest), dim=1)
+        return self._activations.get(
+            "features",
+            lambda features_dc, features_rest: torch.cat(
+                (features_dc, features_rest), dim=1
+            ),
+            self._features_dc,
+            self._features_rest,
+        )
 
     @property
     def get_opacity(self):
-        return self.opacity_activation(self._opacity)
+        return self._activations.get("opacity", self.opacity_activation, self._opacity)
 
     def get_covariance(self, scaling_modifier=1):
         return self.covariance_activation(
@@ -216,34 +317,49 @@ class GaussianModel:
         if self.active_sh_degree < self.max_sh_degree:
             self.active_sh_degree += 1
 
+    def prune_sh_degrees(self, max_error=2.0 / 255.0) -> AdaptiveSH:
+        """
+        Switch a trained model to adaptive SH (see `AdaptiveSH.prune`): each
+        Gaussian keeps the lowest degree whose colour is within `max_error` RMS of
+        the active degree, and the dense `_features_rest` is released. Rendering,
+        `save_ply` and `load_ply` support the result; optimizing it does not.
+        """
+        assert self.storage is None, "adaptive SH is only for models not in training"
+        self.adaptive_sh = AdaptiveSH.prune(
+            self._features_rest.detach(), self.active_sh_degree, max_error
+        )
+        self._features_rest = self._attribute(
+            self._features_rest.new_empty((len(self._xyz), 0, 3))
+        )
+        return self.adaptive_sh
+
     def create_from_pcd(
         self, pcd: BasicPointCloud, spatial_lr_scale: float | np.float32
     ):
         self.spatial_lr_scale = spatial_lr_scale
-        fused_point_cloud = torch.tensor(np.asarray(pcd.points)).float().cuda()
-        fused_color = RGB2SH(torch.tensor(np.asarray(pcd.colors)).float().cuda())
+        fused_point_cloud = torch.tensor(np.asarray(pcd.points)).float().to(self.device)
+        fused_color = RGB2SH(
+            torch.tensor(np.asarray(pcd.colors)).float().to(self.device)
+        )
         features = (
             torch.zeros((fused_color.shape[0], 3, (self.max_sh_degree + 1) ** 2))
             .float()
-            .cuda()
+            .to(self.device)
         )
         features[:, :3, 0] = fused_color
         features[:, 3:, 1:] = 0.0
 
         print("Number of points at initialisation : ", fused_point_cloud.shape[0])
 
-        dist2 = torch.clamp_min(
-            distCUDA2(torch.from_numpy(np.asarray(pcd.points)).float().cuda()),
-            0.0000001,
-        )
+        dist2 = torch.clamp_min(mean_sq_dist_3nn(fused_point_cloud), 0.0000001)
         scales = torch.log(torch.sqrt(dist2))[..., None].repeat(1, 3)
-        rots = torch.zeros((fused_point_cloud.shape[0], 4), device="cuda")
+        rots = torch.zeros((fused_point_cloud.shape[0], 4), device=self.device)
         rots[:, 0] = 1
 
         opacities = inverse_sigmoid(
             0.1
             * torch.ones(
-                (fused_point_cloud.shape[0], 1), dtype=torch.float, device="cuda"
+                (fused_point_cloud.shape[0], 1), dtype=torch.float, device=self.device
             )
         )
 
@@ -257,12 +373,14 @@ class GaussianModel:
         self._scaling = nn.Parameter(scales.requires_grad_(True))
         self._rotation = nn.Parameter(rots.requires_grad_(True))
         self._opacity = nn.Parameter(opacities.requires_grad_(True))
-        self.max_radii2D = torch.zeros((self.get_xyz.shape[0]), device="cuda")
+        self.max_radii2D = torch.zeros((self.get_xyz.shape[0]), device=self.device)
 
     def training_setup(self, training_args):
         self.percent_dense = training_args.percent_dense
-        self.xyz_gradient_accum = torch.zeros((self.get_xyz.shape[0], 1), device="cuda")
-        self.denom = torch.zeros((self.get_xyz.shape[0], 1), device="cuda")
+        self.xyz_gradient_accum = torch.zeros(
+            (self.get_xyz.shape[0], 1), device=self.device
+        )
+        self.denom = torch.zeros((self.get_xyz.shape[0], 1), device=self.device)
 
         l = [
             {
@@ -304,7 +422,7 @@ class GaussianModel:
 
         l += l_cam
 
-        self.optimizer = torch.optim.Adam(l, lr=0.0, eps=1e-15)
+        self.optimizer = GaussianAdam(l, lr=0.0, eps=1e-15)
         self.xyz_scheduler_args = get_expon_lr_func(
             lr_init=training_args.position_lr_init * self.spatial_lr_scale,
             lr_final=training_args.position_lr_final * self.spatial_lr_scale,
@@ -321,6 +439,20 @@ class GaussianModel:
             lr_delay_mult=training_args.position_lr_delay_mult,
             max_steps=1000,
         )
+        self._setup_storage()
+
+    def _setup_storage(self):
+        """Adopt the parameters the optimizer moved into its GaussianStorage."""
+        self.storage = self.optimizer.storage
+        self._set_optimizable_tensors(self.storage.optimizable_tensors)
+
+    def _set_optimizable_tensors(self, optimizable_tensors):
+        self._xyz = optimizable_tensors["xyz"]
+        self._features_dc = optimizable_tensors["f_dc"]
+        self._features_rest = optimizable_tensors["f_rest"]
+        self._opacity = optimizable_tensors["opacity"]
+        self._scaling = optimizable_tensors["scaling"]
+        self._rotation = optimizable_tensors["rotation"]
 
     def update_learning_rate(self, iteration):
         """Learning rate scheduling per step"""
@@ -348,42 +480,96 @@ class GaussianModel:
             l.append("rot_{}".format(i))
         return l
 
+    def get_ply_attributes(self) -> SplatAttributes:
+        """
+        Per-Gaussian export arrays, in Morton order of the centers. Adaptive SH is
+        expanded to the full degree.
+        """
+        order = self.get_spatial_index.order
+        attributes = SplatAttributes(
+            *(a[order.cpu().numpy()] for a in self._ply_arrays())
+        )
+        if self.adaptive_sh is not None:
+            dense = self.adaptive_sh[order].to_dense(self.max_sh_degree)
+            attributes = attributes._replace(f_rest=_sh_columns(dense))
+        return attributes
+
+    def _ply_arrays(self) -> SplatAttributes:
+        return SplatAttributes(
+            xyz=self._xyz.detach().float().cpu().numpy(),
+            f_dc=_sh_columns(self._features_dc),
+            f_rest=_sh_columns(self._features_rest),
+            opacity=self._opacity.detach().float().cpu().numpy(),
+            scale=self._scaling.detach().float().cpu().numpy(),
+            rotation=self._rotation.detach().float().cpu().numpy(),
+        )
+
     def save_ply(self, path):
+        """
+        Write a 3DGS PLY. With adaptive SH, the vertex element stores each
+        Gaussian's `sh_degree` instead of `f_rest`, and element `sh_<d>` holds the
+        `f_rest` columns of the degree d Gaussians, in vertex order.
+        """
         mkdir_p(os.path.dirname(path))
+        if self.adaptive_sh is None:
+            xyz, f_dc, f_rest, opacities, scale, rotation = self.get_ply_attributes()
+            normals = np.zeros_like(xyz)
 
-        xyz = self._xyz.detach().cpu().numpy()
-        normals = np.zeros_like(xyz)
-        f_dc = (
-            self._features_dc.detach()
-            .transpose(1, 2)
-            .flatten(start_dim=1)
-            .contiguous()
-            .cpu()
-            .numpy()
-        )
-        f_rest = (
-            self._features_rest.detach()
-            .transpose(1, 2)
-            .flatten(start_dim=1)
-            .contiguous()
-            .cpu()
-            .numpy()
-        )
-        opacities = self._opacity.detach().cpu().numpy()
-        scale = self._scaling.detach().cpu().numpy()
-        rotation = self._rotation.detach().cpu().numpy()
-
-        dtype_full = [
-            (attribute, "f4") for attribute in self.construct_list_of_attributes()
-        ]
+            attributes = np.concatenate(
+                (xyz, normals, f_dc, f_rest, opacities, scale, rotation), axis=1
+            )
+            write_vertex_ply(
+                path, [(self.construct_list_of_attributes(), attributes, "f4")]
+            )
+            return
 
-        elements = np.empty(xyz.shape[0], dtype=dtype_full)
+        order = self.get_spatial_index.order
+        xyz, f_dc, _, opacities, scale, rotation = (
+            a[order.cpu().numpy()] for a in self._ply_arrays()
+        )
+        adaptive = self.adaptive_sh[order]
         attributes = np.concatenate(
-            (xyz, normals, f_dc, f_rest, opacities, scale, rotation), axis=1
+            (xyz, np.zeros_like(xyz), f_dc, opacities, scale, rotation), axis=1
         )
-        elements[:] = list(map(tuple, attributes))
-        el = PlyElement.describe(elements, "vertex")
-        PlyData([el]).write(path)
+        elements = [
+            (
+                "vertex",
+                [
+                    (self.construct_list_of_attributes(), attributes, "f4"),
+                    (["sh_degree"], adaptive.degrees.cpu().numpy(), "u1"),
+                ],
+            )
+        ]
+        for d in range(1, self.max_sh_degree + 1):
+            n_coeffs = (d + 1) ** 2 - 1
+            coefficients = (
+                adaptive.coefficients[d]
+                if d <= adaptive.max_degree
+                else torch.empty((0, n_coeffs, 3))
+            )
+            names = [f"f_rest_{i}" for i in range(3 * n_coeffs)]
+            elements.append((f"sh_{d}", [(names, _sh_columns(coefficients), "f4")]))
+        write_ply_elements(path, elements)
+
+    def save_compressed_ply(self, path, sh_degree=None):
+        """
+        Export a quantized PLY (see `splat_compression`), keeping SH bands up to
+        `sh_degree` (defaults to the currently active degree).
+        """
+        mkdir_p(os.path.dirname(path))
+        if sh_degree is None:
+            sh_degree = self.active_sh_degree
+        save_compressed_ply(path, self.get_ply_attributes(), sh_degree=sh_degree)
+
+    def save_streamable_splat(self, path, sh_degree=None):
+        """
+        Export an importance-ordered, chunked file (see `splat_streaming`) whose
+        prefixes load as progressively finer models.
+        """
+        mkdir_p(os.path.dirname(path))
+        if sh_degree is None:
+            sh_degree = self.active_sh_degree
+        save_streamable_splat(path, self.get_ply_attributes(), sh_degree=sh_degree)
 
     def reset_opacity(self):
         opacities_new = inverse_sigmoid(
@@ -393,133 +579,146 @@ class GaussianModel:
         self._opacity = optimizable_tensors["opacity"]
 
     def load_ply(self, path):
-        plydata = PlyData.read(path)
-
-        xyz = np.stack(
-            (
-                np.asarray(plydata.elements[0]["x"]),
-                np.asarray(plydata.elements[0]["y"]),
-                np.asarray(plydata.elements[0]["z"]),
-            ),
-            axis=1,
-        )
-        opacities = np.asarray(plydata.elements[0]["opacity"])[..., np.newaxis]
+        vertices = read_vertex_ply(path)
 
-        features_dc = np.zeros((xyz.shape[0], 3, 1))
-        features_dc[:, 0, 0] = np.asarray(plydata.elements[0]["f_dc_0"])
-        features_dc[:, 1, 0] = np.asarray(plydata.elements[0]["f_dc_1"])
-        features_dc[:, 2, 0] = np.asarray(plydata.elements[0]["f_dc_2"])
+        def sorted_properties(prefix):
+            names = [n for n in vertices.dtype.names if n.startswith(prefix)]
+            return sorted(names, key=lambda x: int(x.split("_")[-1]))
 
-        extra_f_names = [
-            p.name
-            for p in plydata.elements[0].properties
-            if p.name.startswith("f_rest_")
-        ]
-        extra_f_names = sorted(extra_f_names, key=lambda x: int(x.split("_")[-1]))
-        assert len(extra_f_names) == 3 * (self.max_sh_degree + 1) ** 2 - 3
-        features_extra = np.zeros((xyz.shape[0], len(extra_f_names)))
-        for idx, attr_name in enumerate(extra_f_names):
-            features_extra[:, idx] = np.asarray(plydata.elements[0][attr_name])
-        # Reshape (P,F*SH_coeffs) to (P, F, SH_coeffs except DC)
-        features_extra = features_extra.reshape(
-            (features_extra.shape[0], 3, (self.max_sh_degree + 1) ** 2 - 1)
+        extra_f_names = sorted_properties("f_rest_")
+        adaptive = "sh_degree" in vertices.dtype.names
+        assert len(extra_f_names) == (
+            0 if adaptive else 3 * (self.max_sh_degree + 1) ** 2 - 3
+        )
+        scale_names = sorted_properties("scale_")
+        rot_names = sorted_properties("rot")
+
+        # Slice every attribute straight out of the mapped file into one float32
+        # buffer and move it to the GPU in a single transfer
+        names = ["x", "y", "z", "f_dc_0", "f_dc_1", "f_dc_2"]
+        names += extra_f_names + ["opacity"] + scale_names + rot_names
+        self._set_from_ply_columns(vertex_columns(vertices, names))
+        if adaptive:
+            self._load_adaptive_sh(path, np.asarray(vertices["sh_degree"]))
+
+    def _load_adaptive_sh(self, path, degrees):
+        """Read the `sh_<d>` elements written by `save_ply` for adaptive SH."""
+        coefficients = []
+        for d in range(self.max_sh_degree + 1):
+            n_coeffs = (d + 1) ** 2 - 1
+            if d == 0:
+                columns = np.empty((int((degrees == 0).sum()), 0), dtype=np.float32)
+            else:
+                names = [f"f_rest_{i}" for i in range(3 * n_coeffs)]
+                columns = vertex_columns(read_ply_element(path, f"sh_{d}"), names)
+            coefficients.append(
+                torch.from_numpy(columns)
+                .to(self.device, self.inference_dtype)
+                .reshape(len(columns), 3, n_coeffs)
+                .transpose(1, 2)
+                .contiguous()
+            )
+        self.adaptive_sh = AdaptiveSH(
+            torch.from_numpy(degrees.astype(np.uint8)).to(self.device), coefficients
         )
 
-        scale_names = [
-            p.name
-            for p in plydata.elements[0].properties
-            if p.name.startswith("scale_")
-        ]
-        scale_names = sorted(scale_names, key=lambda x: int(x.split("_")[-1]))
-        scales = np.zeros((xyz.shape[0], len(scale_names)))
-        for idx, attr_name in enumerate(scale_names):
-            scales[:, idx] = np.asarray(plydata.elements[0][attr_name])
-
-        rot_names = [
-            p.name for p in plydata.elements[0].properties if p.name.startswith("rot")
-        ]
-        rot_names = sorted(rot_names, key=lambda x: int(x.split("_")[-1]))
-        rots = np.zeros((xyz.shape[0], len(rot_names)))
-        for idx, attr_name in enumerate(rot_names):
-            rots[:, idx] = np.asarray(plydata.elements[0][attr_name])
+    def load_compressed_ply(self, path):
+        attributes = load_compressed_ply(path, sh_degree=self.max_sh_degree)
+        self._set_from_ply_columns(np.concatenate(attributes, axis=1))
 
-        self._xyz = nn.Parameter(
-            torch.tensor(xyz, dtype=torch.float, device="cuda").requires_grad_(True)
-        )
-        self._features_dc = nn.Parameter(
-            torch.tensor(features_dc, dtype=torch.float, device="cuda")
-            .transpose(1, 2)
-            .contiguous()
-            .requires_grad_(True)
-        )
-        self._features_rest = nn.Parameter(
-            torch.tensor(features_extra, dtype=torch.float, device="cuda")
-            .transpose(1, 2)
-            .contiguous()
-            .requires_grad_(True)
-        )
-        self._opacity = nn.Parameter(
-            torch.tensor(opacities, dtype=torch.float, device="cuda").requires_grad_(
-                True
-            )
+    def load_streamable_splat(self, path, max_bytes=None):
+        """Load the complete chunks within the first `max_bytes` of a streamable file."""
+        attributes = load_streamable_splat(
+            path, max_bytes=max_bytes, sh_degree=self.max_sh_degree
         )
-        self._scaling = nn.Parameter(
-            torch.tensor(scales, dtype=torch.float, device="cuda").requires_grad_(True)
+        self._set_from_ply_columns(np.concatenate(attributes, axis=1))
+
+    def _attribute(self, tensor):
+        """
+        A loaded per-Gaussian attribute: a trainable parameter, or a plain tensor in
+        `inference_dtype` for inference-only models.
+        """
+        if self.inference_dtype is not None:
+            return tensor.to(self.inference_dtype).contiguous()
+        return nn.Parameter(tensor.contiguous().requires_grad_(True))
+
+    def _set_from_ply_columns(self, columns):
+        """
+        Set all Gaussian parameters from (N, 14 + n_rest) float32 PLY-ordered columns.
+
+        Inference-only models keep the centers in float32, as half precision cannot
+        resolve positions in a large scene, and cast everything else to
+        `inference_dtype` before it is moved to the device.
+        """
+        packed = torch.from_numpy(columns)
+        n_rest = packed.shape[1] - 14
+        if self.inference_dtype is None:
+            xyz, packed = packed.to(self.device).split([3, 11 + n_rest], dim=1)
+        else:
+            xyz = packed[:, :3].to(self.device)
+            packed = packed[:, 3:].to(self.inference_dtype).to(self.device)
+        features_dc, features_extra, opacities, scales, rots = packed.split(
+            [3, n_rest, 1, 3, 4], dim=1
         )
-        self._rotation = nn.Parameter(
-            torch.tensor(rots, dtype=torch.float, device="cuda").requires_grad_(True)
+        # Reshape (P,F*SH_coeffs) to (P, F, SH_coeffs except DC)
+        features_extra = features_extra.reshape(
+            (features_extra.shape[0], 3, n_rest // 3)
         )
 
-        self.active_sh_degree = self.max_sh_degree
+        if self.inference_dtype is None:
+            self._xyz = nn.Parameter(xyz.contiguous().requires_grad_(True))
+        else:
+            self._xyz = xyz.contiguous()
+        self._features_dc = self._attribute(features_dc[:, None, :])
+        self._features_rest = self._attribute(features_extra.transpose(1, 2))
+        self._opacity = self._attribute(opacities)
+        self._scaling = self._attribute(scales)
+        self._rotation = self._attribute(rots)
+        self.adaptive_sh = None
 
-    def replace_tensor_to_optimizer(self, tensor, name):
-        optimizable_tensors = {}
-        for group in self.optimizer.param_groups:
-            if group["name"] == name:
-                # breakpoint()
-                stored_state = self.optimizer.state.get(group["params"][0], None)
-                stored_state["exp_avg"] = torch.zeros_like(tensor)
-                stored_state["exp_avg_sq"] = torch.zeros_like(tensor)
+        self.active_sh_degree = self.max_sh_degree
 
-                del self.optimizer.state[group["params"][0]]
-                group["params"][0] = nn.Parameter(tensor.requires_grad_(True))
-                self.optimizer.state[group["params"][0]] = stored_state
+    @torch.no_grad()
+    def reorder_by_morton(self):
+        """
+        Sort the Gaussians by the Morton code of their centers, along with their
+        optimizer moments and densification statistics, so that Gaussians close in
+        space are close in memory. Returns the applied order.
+        """
+        index = self.get_spatial_index
+        order = index.order
+        if self.storage is not None:
+            self.storage.permute(order)
+        else:
+            for name in GAUSSIAN_ATTRIBUTES:
+                tensor = getattr(self, name)
+                reordered = tensor.detach()[order]
+                if isinstance(tensor, nn.Parameter):
+                    reordered = nn.Parameter(reordered.requires_grad_(True))
+                setattr(self, name, reordered)
+        if self.adaptive_sh is not None:
+            self.adaptive_sh = self.adaptive_sh[order]
+        for name in ("xyz_gradient_accum", "denom", "max_radii2D"):
+            stats = getattr(self, name)
+            if len(stats) == len(order):
+                setattr(self, name, stats[order])
+
+        index.renumber(order)
+        self._spatial_index_sync = (weakref.ref(self._xyz), self._xyz._version)
+        return order
 
-                optimizable_tensors[group["name"]] = group["params"][0]
-        return optimizable_tensors
+    def replace_tensor_to_optimizer(self, tensor, name):
+        return self.storage.replace(name, tensor)
 
     def _prune_optimizer(self, mask):
-        optimizable_tensors = {}
-        for group in self.optimizer.param_groups:
-            stored_state = self.optimizer.state.get(group["params"][0], None)
-            if stored_state is not None:
-                stored_state["exp_avg"] = stored_state["exp_avg"][mask]
-                stored_state["exp_avg_sq"] = stored_state["exp_avg_sq"][mask]
-
-                del self.optimizer.state[group["params"][0]]
-                group["params"][0] = nn.Parameter(
-                    (group["params"][0][mask].requires_grad_(True))
-                )
-                self.optimizer.state[group["params"][0]] = stored_state
-
-                optimizable_tensors[group["name"]] = group["params"][0]
-            else:
-                group["params"][0] = nn.Parameter(
-                    group["params"][0][mask].requires_grad_(True)
-                )
-                optimizable_tensors[group["name"]] = group["params"][0]
-        return optimizable_tensors
+        return self.storage.keep(mask)
 
     def prune_points(self, mask):
         valid_points_mask = ~mask
-        optimizable_tensors = self._prune_optimizer(valid_points_mask)
+        self._set_optimizable_tensors(self._prune_optimizer(valid_points_mask))
 
-        self._xyz = optimizable_tensors["xyz"]
-        self._features_dc = optimizable_tensors["f_dc"]
-        self._features_rest = optimizable_tensors["f_rest"]
-        self._opacity = optimizable_tensors["opacity"]
-        self._scaling = optimizable_tensors["scaling"]
-        self._rotation = optimizable_tensors["rotation"]
+        if self._spatial_index is not None:
+            self._spatial_index.keep(valid_points_mask)
 
         self.xyz_gradient_accum = self.xyz_gradient_accum[valid_points_mask]
 
@@ -527,38 +726,7 @@ class GaussianModel:
         self.max_radii2D = self.max_radii2D[valid_points_mask]
 
     def cat_tensors_to_optimizer(self, tensors_dict):
-        optimizable_tensors = {}
-        for group in self.optimizer.param_groups:
-            assert len(group["params"]) == 1
-            extension_tensor = tensors_dict[group["name"]]
-            stored_state = self.optimizer.state.get(group["params"][0], None)
-            if stored_state is not None:
-                stored_state["exp_avg"] = torch.cat(
-                    (stored_state["exp_avg"], torch.zeros_like(extension_tensor)), dim=0
-                )
-                stored_state["exp_avg_sq"] = torch.cat(
-                    (stored_state["exp_avg_sq"], torch.zeros_like(extension_tensor)),
-                    dim=0,
-                )
-
-                del self.optimizer.state[group["params"][0]]
-                group["params"][0] = nn.Parameter(
-                    torch.cat(
-                        (group["params"][0], extension_tensor), dim=0
-                    ).requires_grad_(True)
-                )
-                self.optimizer.state[group["params"][0]] = stored_state
-
-                optimizable_tensors[group["name"]] = group["params"][0]
-            else:
-                group["params"][0] = nn.Parameter(
-                    torch.cat(
-                        (group["params"][0], extension_tensor), dim=0
-                    ).requires_grad_(True)
-                )
-                optimizable_tensors[group["name"]] = group["params"][0]
-
-        return optimizable_tensors
+        return self.storage.append(tensors_dict)
 
     def densification_postfix(
         self,
@@ -578,22 +746,20 @@ class GaussianModel:
             "rotation": new_rotation,
         }
 
-        optimizable_tensors = self.cat_tensors_to_optimizer(d)
-        self._xyz = optimizable_tensors["xyz"]
-        self._features_dc = optimizable_tensors["f_dc"]
-        self._features_rest = optimizable_tensors["f_rest"]
-        self._opacity = optimizable_tensors["opacity"]
-        self._scaling = optimizable_tensors["scaling"]
-        self._rotation = optimizable_tensors["rotation"]
+        self._set_optimizable_tensors(self.cat_tensors_to_optimizer(d))
+        if self._spatial_index is not None:
+            self._spatial_index.append(self._xyz.detach())
 
-        self.xyz_gradient_accum = torch.zeros((self.get_xyz.shape[0], 1), device="cuda")
-        self.denom = torch.zeros((self.get_xyz.shape[0], 1), device="cuda")
-        self.max_radii2D = torch.zeros((self.get_xyz.shape[0]), device="cuda")
+        self.xyz_gradient_accum = torch.zeros(
+            (self.get_xyz.shape[0], 1), device=self.device
+        )
+        self.denom = torch.zeros((self.get_xyz.shape[0], 1), device=self.device)
+        self.max_radii2D = torch.zeros((self.get_xyz.shape[0]), device=self.device)
 
     def densify_and_split(self, grads, grad_threshold, scene_extent, N=2):
         n_init_points = self.get_xyz.shape[0]
         # Extract points that satisfy the gradient condition
-        padded_grad = torch.zeros((n_init_points), device="cuda")
+        padded_grad = torch.zeros((n_init_points), device=self.device)
         padded_grad[: grads.shape[0]] = grads.squeeze()
         selected_pts_mask = torch.where(padded_grad >= grad_threshold, True, False)
         selected_pts_mask = torch.logical_and(
@@ -603,7 +769,7 @@ class GaussianModel:
         )
 
         stds = self.get_scaling[selected_pts_mask].repeat(N, 1)
-        means = torch.zeros((stds.size(0), 3), device="cuda")
+        means = torch.zeros((stds.size(0), 3), device=self.device)
         samples = torch.normal(mean=means, std=stds)
         rots = build_rotation(self._rotation[selected_pts_mask]).repeat(N, 1, 1)
         new_xyz = torch.bmm(rots, samples.unsqueeze(-1)).squeeze(-1) + self.get_xyz[
@@ -629,7 +795,9 @@ class GaussianModel:
         prune_filter = torch.cat(
             (
                 selected_pts_mask,
-                torch.zeros(N * selected_pts_mask.sum(), device="cuda", dtype=bool),
+                torch.zeros(
+                    N * selected_pts_mask.sum(), device=self.device, dtype=bool
+                ),
             )
         )
         self.prune_points(prune_filter)
@@ -677,7 +845,8 @@ class GaussianModel:
             )
         self.prune_points(prune_mask)
 
-        torch.cuda.empty_cache()
+        if self.device.type == "cuda":
+            torch.cuda.empty_cache()
 
     def add_densification_stats(self, viewspace_point_tensor, update_filter):
         self.xyz_gradient_accum[update_filter] += torch.norm(
@@ -0,0 +1,58 @@
+import math
+
+import torch
+
+from instant_splat.scene.gaussian_storage import GaussianStorage
+
+
+class GaussianAdam(torch.optim.Optimizer):
+    """
+    Adam for GaussianModel. The per-Gaussian groups live in a `GaussianStorage` and are
+    updated by one fused pass over its buffers; any other group (e.g. camera poses) is
+    updated per parameter like torch.optim.Adam. State dicts use torch.optim.Adam's
+    layout, so checkpoints are interchangeable.
+    """
+
+    def __init__(self, params, lr=1e-3, betas=(0.9, 0.999), eps=1e-8):
+        super().__init__(params, dict(lr=lr, betas=betas, eps=eps))
+        self.storage = GaussianStorage(self)
+
+    def load_state_dict(self, state_dict):
+        super().load_state_dict(state_dict)
+        self.storage = GaussianStorage(self)
+
+    @torch.no_grad()
+    def step(self, closure=None):
+        loss = None
+        if closure is not None:
+            with torch.enable_grad():
+                loss = closure()
+
+        group = next(iter(self.storage.groups.values()))
+        self.storage.adam_step(group["betas"], group["eps"])
+
+        for group in self.param_groups:
+            if group["name"] in self.storage.groups:
+                continue
+            beta1, beta2 = group["betas"]
+            for p in group["params"]:
+                if p.grad is None:
+                    continue
+                state = self.state[p]
+                if len(state) == 0:
+                    state["step"] = torch.zeros((), dtype=torch.float32)
+                    state["exp_avg"] = torch.zeros_like(p)
+                    state["exp_avg_sq"] = torch.zeros_like(p)
+                state["step"] += 1
+                step = state["step"].item()
+                state["exp_avg"].lerp_(p.grad, 1 - beta1)
+                state["exp_avg_sq"].mul_(beta2).addcmul_(
+                    p.grad, p.grad, value=1 - beta2
+                )
+                denom = (
+                    state["exp_avg_sq"].sqrt() / math.sqrt(1 - beta2**step)
+                ).add_(group["eps"])
+                p.addcdiv_(
+                    state["exp_avg"], denom, value=-group["lr"] / (1 - beta1**step)
+                )
+        return loss
@@ -0,0 +1,209 @@
+import math
+
+import torch
+from torch import nn
+
+# Optimizer groups holding one row per Gaussian
+GAUSSIAN_GROUPS = ("xyz", "f_dc", "f_rest", "opacity", "scaling", "rotation")
+
+
+class GaussianStorage:
+    """
+    Capacity-managed, struct-of-arrays storage for the per-Gaussian optimizer groups.
+
+    All attributes share one (capacity, width) parameter buffer, one gradient buffer
+    of the same shape and one (2, capacity, width) buffer for the Adam moments; each
+    attribute owns a block of columns. The nn.Parameter handed to the optimizer and its
+    moment state are views of the first `count` rows of its block, so pruning, cloning,
+    resetting and the Adam update are each a single operation on the shared buffers.
+    Capacity grows by `growth` when exceeded and is only released once less than a
+    quarter of it is in use.
+    """
+
+    def __init__(self, optimizer, names=GAUSSIAN_GROUPS, growth=2.0):
+        self.optimizer = optimizer
+        self.growth = growth
+        self.groups = {
+            group["name"]: group
+            for group in optimizer.param_groups
+            if group["name"] in names
+        }
+
+        self.layout, width = {}, 0
+        for name, group in self.groups.items():
+            assert len(group["params"]) == 1
+            param = group["params"][0]
+            self.layout[name] = (width, param[0].numel(), param.shape[1:])
+            width += param[0].numel()
+        self.count = self.capacity = len(param)
+        self.params = param.new_empty((self.count, width))
+        self.grads = param.new_zeros((self.count, width))
+        self.moments = param.new_zeros((2, self.count, width))
+
+        # One step count per attribute, as attributes without a gradient are skipped
+        self.steps = {}
+        for name, group in self.groups.items():
+            param = group["params"][0]
+            state = optimizer.state.get(param, {})
+            with torch.no_grad():
+                self.columns(self.params, name).copy_(param)
+                if "exp_avg" in state:
+                    self.columns(self.moments[0], name).copy_(state["exp_avg"])
+                    self.columns(self.moments[1], name).copy_(state["exp_avg_sq"])
+            self.steps[name] = (
+                state["step"].detach().clone().float().cpu()
+                if "step" in state
+                else torch.zeros((), dtype=torch.float32)
+            )
+        self.optimizable_tensors = self.bind()
+
+    def columns(self, buffer, name):
+        """View the active rows of `name`'s column block with the attribute's shape."""
+        offset, width, shape = self.layout[name]
+        return buffer[: self.count, offset : offset + width].view((self.count,) + shape)
+
+    def _resize(self, capacity):
+        def resized(buffer, dim):
+            shape = list(buffer.shape)
+            shape[dim] = capacity
+            new = buffer.new_zeros(shape)
+            new.narrow(dim, 0, self.count).copy_(buffer.narrow(dim, 0, self.count))
+            return new
+
+        self.params = resized(self.params, 0)
+        self.grads = resized(self.grads, 0)
+        self.moments = resized(self.moments, 1)
+        self.capacity = capacity
+
+    def bind(self):
+        """
+        Point every optimizer group and its moment state at views of the active rows
+        and return the new parameters by group name.
+        """
+        optimizable_tensors = {}
+        for name, group in self.groups.items():
+            self.optimizer.state.pop(group["params"][0], None)
+            param = nn.Parameter(self.columns(self.params, name))
+            group["params"][0] = param
+            self.optimizer.state[param] = {
+                "step": self.steps[name],
+                "exp_avg": self.columns(self.moments[0], name),
+                "exp_avg_sq": self.columns(self.moments[1], name),
+            }
+            optimizable_tensors[name] = param
+        return optimizable_tensors
+
+    @torch.no_grad()
+    def append(self, tensors_dict):
+        """Add rows with zeroed moments, growing capacity geometrically if needed."""
+        n_new = len(tensors_dict[next(iter(self.groups))])
+        required = self.count + n_new
+        if required > self.capacity:
+            self._resize(max(required, int(self.capacity * self.growth)))
+        rows = slice(self.count, required)
+        for name, (offset, width, _) in self.layout.items():
+            self.params[rows, offset : offset + width] = tensors_dict[name].reshape(
+                n_new, width
+            )
+        self.moments[:, rows] = 0
+        self.count = required
+        return self.bind()
+
+    @torch.no_grad()
+    def keep(self, mask):
+        """Compact the rows selected by `mask` to the front of the buffers."""
+        kept = int(mask.sum())
+        self.params[:kept] = self.params[: self.count][mask]
+        self.moments[:, :kept] = self.moments[:, : self.count][:, mask]
+        self.count = kept
+        if self.count < self.capacity // 4:
+            self._resize(int(self.count * self.growth))
+        return self.bind()
+
+    @torch.no_grad()
+    def permute(self, order):
+        """
+        Reorder the rows in place so that row `order[i]` becomes row i. Parameters keep
+        their identity; their version counter moves, like after an optimizer step.
+        """
+        self.params[: self.count] = self.params[: self.count][order]
+        self.moments[:, : self.count] = self.moments[:, : self.count][:, order]
+
+    @torch.no_grad()
+    def replace(self, name, tensor):
+        """Overwrite one attribute in place and reset its moments."""
+        self.columns(self.params, name).copy_(tensor)
+        self.columns(self.moments[0], name).zero_()
+        self.columns(self.moments[1], name).zero_()
+        return {name: self.groups[name]["params"][0]}
+
+    @torch.no_grad()
+    def capture(self):
+        """
+        Compact copies of the parameters, by group name, and of the optimizer state
+        dict for serialization. Saving the views themselves would write the whole
+        buffers, spare capacity included, while the live storage keeps its capacity.
+        """
+        params = {
+            name: nn.Parameter(group["params"][0].detach().clone())
+            for name, group in self.groups.items()
+        }
+        state_dict = self.optimizer.state_dict()
+        state_dict["state"] = {
+            index: {key: value.clone() for key, value in state.items()}
+            for index, state in state_dict["state"].items()
+        }
+        return params, state_dict
+
+    @torch.no_grad()
+    def adam_step(self, betas, eps):
+        """
+        One Adam update of every Gaussian attribute with per-group learning rates.
+
+        Attributes without a gradient are skipped like in torch.optim.Adam: their
+        parameters, moments and step count stay as they are. When all attributes have
+        one, the gradients are gathered into the shared buffer with a single copy and
+        updated in one pass; otherwise each column block is updated on its own.
+        """
+        beta1, beta2 = betas
+        blocks = []
+        for name, (offset, width, _) in self.layout.items():
+            grad = self.groups[name]["params"][0].grad
+            if grad is None:
+                continue
+            self.steps[name] += 1
+            step = self.steps[name].item()
+            blocks.append(
+                (
+                    slice(offset, offset + width),
+                    grad.reshape(self.count, width),
+                    self.groups[name]["lr"] / (1 - beta1**step),
+                    math.sqrt(1 - beta2**step),
+                )
+            )
+        if not blocks:
+            return
+        if len(blocks) < len(self.layout):
+            for columns, grad, lr, correction in blocks:
+                self._adam(columns, grad, lr, correction, betas, eps)
+            return
+
+        grads = self.grads[: self.count]
+        torch.cat([grad for _, grad, _, _ in blocks], dim=1, out=grads)
+        widths = [width for _, width, _ in self.layout.values()]
+        lr, correction = (
+            torch.cat(
+                [torch.full((width,), block[i]) for width, block in zip(widths, blocks)]
+            ).to(self.params.device, non_blocking=True)
+            for i in (2, 3)
+        )
+        self._adam(slice(None), grads, lr, correction, betas, eps)
+
+    def _adam(self, columns, grad, lr, correction, betas, eps):
+        """Adam on a column range with bias-corrected `lr` and `correction`."""
+        beta1, beta2 = betas
+        exp_avg, exp_avg_sq = self.moments[:, : self.count, columns]
+        exp_avg.lerp_(grad, 1 - beta1)
+        exp_avg_sq.mul_(beta2).addcmul_(grad, grad, value=1 - beta2)
+        denom = (exp_avg_sq.sqrt() / correction).add_(eps)
+        self.params[: self.count, columns].sub_(exp_avg.div(denom).mul_(lr))
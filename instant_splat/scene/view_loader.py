@@ -0,0 +1,62 @@
+from random import randint
+
+import torch
+
+from instant_splat.scene.cameras import Camera
+
+
+class TrainViewLoader:
+    """
+    Draw training cameras in random order, each once per pass, together with their
+    ground-truth image on `device`.
+
+    Images kept on the host (`data_device=cpu`) are pinned once, and the image of
+    the next camera is copied on a side CUDA stream while the current one trains,
+    so the training loop never waits for a pageable host-to-device copy. Images
+    already on `device` are returned as they are.
+    """
+
+    def __init__(self, cameras: list[Camera], device) -> None:
+        self.cameras = cameras
+        self.device = torch.device(device)
+        self.stream = None
+        if self.device.type == "cuda" and any(
+            cam.original_image.device.type == "cpu" for cam in cameras
+        ):
+            self.stream = torch.cuda.Stream(self.device)
+            for cam in cameras:
+                if cam.original_image.device.type == "cpu":
+                    cam.original_image = cam.original_image.pin_memory()
+                    if cam.gt_alpha_mask is not None:
+                        cam.gt_alpha_mask = cam.gt_alpha_mask.pin_memory()
+        self.stack = []
+        self.prefetched = self._fetch(self._draw())
+
+    def _draw(self) -> Camera:
+        if not self.stack:
+            self.stack = self.cameras.copy()
+        return self.stack.pop(randint(0, len(self.stack) - 1))
+
+    def _fetch(self, cam: Camera):
+        if self.stream is None or cam.original_image.device == self.device:
+            return cam, cam.get_gt_image(self.device), None
+        # uint8 images are also converted to float on the side stream
+        with torch.cuda.stream(self.stream):
+            image = cam.get_gt_image(self.device)
+            copied = torch.cuda.Event()
+            copied.record()
+        return cam, image, copied
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple[Camera, torch.Tensor]:
+        cam, image, copied = self.prefetched
+        if copied is not None:
+            stream = torch.cuda.current_stream(self.device)
+            stream.wait_event(copied)
+            # Allocated on the side stream; keep it from being reused while the
+            # training stream still reads it
+            image.record_stream(stream)
+        self.prefetched = self._fetch(self._draw())
+        return cam, image
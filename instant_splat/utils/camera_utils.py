@@ -12,6 +12,7 @@
 from instant_splat.scene.cameras import Camera
 from instant_splat.scene.dataset_readers import CameraInfo
 import numpy as np
+import torch
 from instant_splat.utils.general_utils import PILtoTorch
 from instant_splat.utils.graphics_utils import fov2focal
 import scipy
@@ -20,7 +21,7 @@ import matplotlib.pyplot as plt
 WARNED = False
 
 
-def loadCam(args, id, cam_info, resolution_scale):
+def loadCam(args, id, cam_info, resolution_scale, device=None):
     orig_w, orig_h = cam_info.image.size
 
     if args.resolution in [1, 2, 4, 8]:
@@ -66,14 +67,16 @@ def loadCam(args, id, cam_info, resolution_scale):
         image_name=cam_info.image_name,
         uid=id,
         data_device=args.data_device,
+        device=device,
+        image_dtype=torch.uint8 if args.uint8_images else torch.float32,
     )
 
 
-def cameraList_from_camInfos(cam_infos, resolution_scale, args):
+def cameraList_from_camInfos(cam_infos, resolution_scale, args, device=None):
     camera_list = []
 
     for id, c in enumerate(cam_infos):
-        camera_list.append(loadCam(args, id, c, resolution_scale))
+        camera_list.append(loadCam(args, id, c, resolution_scale, device=device))
 
     return camera_list
 
@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import threading
+
+import torch
+
+MANIFEST = "manifest.json"
+TENSORS = "tensors.bin"
+# Every tensor starts at a multiple of this many bytes in TENSORS
+ALIGNMENT = 64
+
+
+def _flatten(value, tensors):
+    """
+    Encode nested tuples, lists and dicts as JSON, moving every tensor into
+    `tensors` under a generated name. Containers are tagged so that tuples and
+    non-string dict keys (e.g. optimizer state ids) survive the round trip.
+    """
+    if isinstance(value, torch.Tensor):
+        name = f"t{len(tensors)}"
+        tensors[name] = value
+        return {
+            "tensor": name,
+            "parameter": isinstance(value, torch.nn.Parameter),
+            "requires_grad": value.requires_grad,
+        }
+    if isinstance(value, tuple):
+        return {"tuple": [_flatten(v, tensors) for v in value]}
+    if isinstance(value, list):
+        return {"list": [_flatten(v, tensors) for v in value]}
+    if isinstance(value, dict):
+        return {
+            "dict": [
+                [_flatten(k, tensors), _flatten(v, tensors)] for k, v in value.items()
+            ]
+        }
+    assert value is None or isinstance(value, (bool, int, float, str)), type(value)
+    return value
+
+
+def _unflatten(value, tensors):
+    if not isinstance(value, dict):
+        return value
+    if "tensor" in value:
+        tensor = tensors[value["tensor"]]
+        if value["parameter"]:
+            return torch.nn.Parameter(tensor, requires_grad=value["requires_grad"])
+        return tensor.requires_grad_(value["requires_grad"])
+    if "tuple" in value:
+        return tuple(_unflatten(v, tensors) for v in value["tuple"])
+    if "list" in value:
+        return [_unflatten(v, tensors) for v in value["list"]]
+    return {_unflatten(k, tensors): _unflatten(v, tensors) for k, v in value["dict"]}
+
+
+def _write(path, state, tensors):
+    """Write a checkpoint directory atomically: a temporary one is renamed at the end."""
+    table, offset = {}, 0
+    for name, tensor in tensors.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        nbytes = tensor.numel() * tensor.element_size()
+        table[name] = {
+            "dtype": str(tensor.dtype).removeprefix("torch."),
+            "shape": list(tensor.shape),
+            "offset": offset,
+            "nbytes": nbytes,
+        }
+        offset += nbytes
+
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    with open(os.path.join(tmp_path, TENSORS), "wb") as f:
+        for name, tensor in tensors.items():
+            f.seek(table[name]["offset"])
+            f.write(tensor.reshape(-1).view(torch.uint8).numpy().data)
+        f.truncate(offset)
+    with open(os.path.join(tmp_path, MANIFEST), "w") as f:
+        json.dump({"tensors": table, "state": state}, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def save_checkpoint(path, state):
+    """
+    Save nested tuples, lists and dicts of tensors and plain values as a directory
+    holding one flat binary file of tensors and a JSON manifest describing them.
+    """
+    tensors = {}
+    state = _flatten(state, tensors)
+    tensors = {name: t.detach().cpu().contiguous() for name, t in tensors.items()}
+    _write(path, state, tensors)
+
+
+def load_checkpoint(path, device=None):
+    """
+    Load a checkpoint written by `save_checkpoint` or `CheckpointWriter`.
+
+    The tensor file is memory mapped copy-on-write, so nothing is read until a
+    tensor is used; with `device`, tensors are copied straight from the mapping.
+    """
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    tensors_path = os.path.join(path, TENSORS)
+    size = os.path.getsize(tensors_path)
+    mapped = (
+        torch.from_file(tensors_path, shared=False, size=size, dtype=torch.uint8)
+        if size
+        else torch.empty(0, dtype=torch.uint8)
+    )
+
+    tensors = {}
+    for name, entry in manifest["tensors"].items():
+        data = mapped[entry["offset"] : entry["offset"] + entry["nbytes"]]
+        tensor = data.view(getattr(torch, entry["dtype"])).view(entry["shape"])
+        tensors[name] = tensor if device is None else tensor.to(device)
+    return _unflatten(manifest["state"], tensors)
+
+
+class CheckpointWriter:
+    """
+    Save checkpoints in a background thread so the training loop does not wait for
+    the disk.
+
+    `save` snapshots every tensor into a host buffer before returning, with an
+    asynchronous copy from pinned memory for CUDA tensors, so training can modify
+    the originals right away. Buffers are reused by later checkpoints of the same
+    shapes. At most one write is in flight; `wait` blocks until it is done.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        self.thread = None
+
+    def _snapshot(self, name, tensor):
+        tensor = tensor.detach()
+        buffer = self.buffers.get(name)
+        if (
+            buffer is None
+            or buffer.shape != tensor.shape
+            or buffer.dtype != tensor.dtype
+        ):
+            buffer = torch.empty(
+                tensor.shape, dtype=tensor.dtype, pin_memory=tensor.is_cuda
+            )
+            self.buffers[name] = buffer
+        buffer.copy_(tensor, non_blocking=tensor.is_cuda)
+        return buffer
+
+    def save(self, path, state):
+        self.wait()
+        tensors = {}
+        state = _flatten(state, tensors)
+        tensors = {name: self._snapshot(name, t) for name, t in tensors.items()}
+        copied = None
+        if torch.cuda.is_available() and torch.cuda.is_initialized():
+            copied = torch.cuda.Event()
+            copied.record()
+
+        def write():
+            if copied is not None:
+                copied.synchronize()
+            _write(path, state, tensors)
+
+        self.thread = threading.Thread(target=write, daemon=True)
+        self.thread.start()
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,338 @@
+import copy
+import numpy as np
+import torch
+import roma
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+
+from mini_dust3r.inference import inference
+from mini_dust3r.model import AsymmetricCroCo3DStereo
+from mini_dust3r.utils.device import to_numpy
+from mini_dust3r.image_pairs import make_pairs
+from mini_dust3r.cloud_opt import global_aligner, GlobalAlignerMode
+
+from instant_splat.utils.dust3r_utils import (
+    compute_global_alignment,
+    rigid_points_registration,
+)
+
+
+class WindowAlignment(NamedTuple):
+    frame_ids: list
+    imgs: list
+    focals: np.ndarray
+    poses: np.ndarray
+    pts3d: list
+    confs: list
+    confidence_masks: list
+    intrinsics: np.ndarray
+
+
+class Sim3(NamedTuple):
+    s: float
+    R: np.ndarray
+    T: np.ndarray
+
+
+def split_windows(n_views, window_size, overlap):
+    """
+    Split n_views frames into overlapping [start, end) windows.
+
+    Consecutive windows share `overlap` frames; the last window is shifted back so
+    that it is full-sized instead of leaving a short tail.
+    """
+    assert window_size > overlap >= 1, "window_size must be larger than overlap >= 1"
+    if n_views <= window_size:
+        return [(0, n_views)]
+    stride = window_size - overlap
+    starts = list(range(0, n_views - window_size + 1, stride))
+    if starts[-1] + window_size < n_views:
+        starts.append(n_views - window_size)
+    return [(s, s + window_size) for s in starts]
+
+
+def align_window(
+    images,
+    frame_ids,
+    model,
+    device,
+    batch_size,
+    schedule,
+    lr,
+    niter,
+    focal_avg,
+    confidence,
+) -> WindowAlignment:
+    """Run pairwise inference and global alignment on a single window of frames."""
+    window_images = []
+    for i, frame_id in enumerate(frame_ids):
+        img = copy.copy(images[frame_id])
+        img["idx"] = i
+        img["instance"] = str(i)
+        window_images.append(img)
+
+    pairs = make_pairs(
+        window_images, scene_graph="complete", prefilter=None, symmetrize=True
+    )
+    output = inference(pairs, model, device, batch_size=batch_size)
+    scene = global_aligner(
+        output, device=device, mode=GlobalAlignerMode.PointCloudOptimizer
+    )
+    compute_global_alignment(
+        scene=scene,
+        init="mst",
+        niter=niter,
+        schedule=schedule,
+        lr=lr,
+        focal_avg=focal_avg,
+    )
+    scene = scene.clean_pointcloud()
+    scene.min_conf_thr = float(scene.conf_trf(torch.tensor(confidence)))
+
+    # Only host copies leave this function so GPU memory is bounded by the window
+    result = WindowAlignment(
+        frame_ids=list(frame_ids),
+        imgs=list(to_numpy(scene.imgs)),
+        focals=to_numpy(scene.get_focals()),
+        poses=to_numpy(scene.get_im_poses()),
+        pts3d=list(to_numpy(scene.get_pts3d())),
+        confs=list(to_numpy(scene.im_conf)),
+        confidence_masks=list(to_numpy(scene.get_masks())),
+        intrinsics=to_numpy(scene.get_intrinsics()),
+    )
+    del scene, output, pairs
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    return result
+
+
+def estimate_overlap_sim3(
+    src: WindowAlignment, dst: WindowAlignment, max_points=20_000, seed=0
+):
+    """
+    Estimate the Sim(3) mapping src window coordinates onto dst window coordinates.
+
+    Shared frames give pixel-aligned pointmaps in both windows, so every pixel that is
+    confident in both is a correspondence. Returns the transform together with the
+    (subsampled) correspondences and their weights for the pose-graph refinement.
+    """
+    shared = sorted(set(src.frame_ids) & set(dst.frame_ids))
+    pts_src, pts_dst, weights = [], [], []
+    for frame_id in shared:
+        i = src.frame_ids.index(frame_id)
+        j = dst.frame_ids.index(frame_id)
+        mask = src.confidence_masks[i] & dst.confidence_masks[j]
+        pts_src.append(src.pts3d[i][mask])
+        pts_dst.append(dst.pts3d[j][mask])
+        weights.append(src.confs[i][mask] * dst.confs[j][mask])
+    pts_src = np.concatenate(pts_src)
+    pts_dst = np.concatenate(pts_dst)
+    weights = np.concatenate(weights)
+    assert len(weights) >= 3, f"Not enough overlap correspondences ({len(weights)})"
+
+    if len(weights) > max_points:
+        keep = np.random.default_rng(seed).choice(
+            len(weights), max_points, replace=False
+        )
+        pts_src, pts_dst, weights = pts_src[keep], pts_dst[keep], weights[keep]
+
+    s, R, T = rigid_points_registration(
+        torch.from_numpy(pts_src).double(),
+        torch.from_numpy(pts_dst).double(),
+        conf=torch.from_numpy(weights).double(),
+    )
+    sim3 = Sim3(s=float(s), R=R.numpy(), T=T.numpy())
+    return sim3, (pts_src, pts_dst, weights)
+
+
+def compose_sim3(a: Sim3, b: Sim3) -> Sim3:
+    """Return a ∘ b, i.e. x -> a(b(x))."""
+    return Sim3(s=a.s * b.s, R=a.R @ b.R, T=a.s * a.R @ b.T + a.T)
+
+
+def invert_sim3(a: Sim3) -> Sim3:
+    R_inv = a.R.T
+    return Sim3(s=1.0 / a.s, R=R_inv, T=-(R_inv @ a.T) / a.s)
+
+
+def solve_sim3_pose_graph(n_windows, edges, niter=200):
+    """
+    Solve for one Sim(3) per window mapping it into the frame of window 0.
+
+    `edges` is a list of (src, dst, sim3, (pts_src, pts_dst, weights)) where sim3 maps
+    window src onto window dst. The transforms are initialised by chaining edges along
+    a spanning tree and then jointly refined so that all overlap correspondences agree,
+    which distributes drift over loops when windows overlap more than one neighbour.
+    """
+    world = {0: Sim3(s=1.0, R=np.eye(3), T=np.zeros(3))}
+    while len(world) < n_windows:
+        progressed = False
+        for src, dst, sim3, _ in edges:
+            if dst in world and src not in world:
+                world[src] = compose_sim3(world[dst], sim3)
+                progressed = True
+            elif src in world and dst not in world:
+                world[dst] = compose_sim3(world[src], invert_sim3(sim3))
+                progressed = True
+        assert progressed, "Window overlap graph is not connected"
+
+    if n_windows == 1 or len(edges) < n_windows:
+        # spanning tree only, nothing to distribute
+        return [world[k] for k in range(n_windows)]
+
+    log_s = torch.tensor(
+        [np.log(world[k].s) for k in range(1, n_windows)], dtype=torch.float64
+    )
+    rotvec = roma.rotmat_to_rotvec(
+        torch.tensor(np.stack([world[k].R for k in range(1, n_windows)]))
+    )
+    trans = torch.tensor(np.stack([world[k].T for k in range(1, n_windows)]))
+    log_s, rotvec, trans = (
+        p.clone().requires_grad_(True) for p in (log_s, rotvec, trans)
+    )
+
+    corr = [
+        (
+            src,
+            dst,
+            torch.from_numpy(c[0]).double(),
+            torch.from_numpy(c[1]).double(),
+            torch.from_numpy(c[2] / c[2].sum()).double(),
+        )
+        for src, dst, _, c in edges
+    ]
+    ref_pts = edges[0][3][1]
+    scene_scale = float(np.linalg.norm(ref_pts - ref_pts.mean(0), axis=1).mean())
+
+    def apply(k, x):
+        if k == 0:
+            return x
+        R = roma.rotvec_to_rotmat(rotvec[k - 1])
+        return torch.exp(log_s[k - 1]) * x @ R.T + trans[k - 1]
+
+    optimizer = torch.optim.LBFGS(
+        [log_s, rotvec, trans], max_iter=niter, line_search_fn="strong_wolfe"
+    )
+
+    def closure():
+        optimizer.zero_grad()
+        loss = 0.0
+        for src, dst, pts_src, pts_dst, w in corr:
+            diff = apply(src, pts_src) - apply(dst, pts_dst)
+            loss = loss + (w * diff.square().sum(-1)).sum() / scene_scale**2
+        loss.backward()
+        return loss
+
+    optimizer.step(closure)
+
+    with torch.no_grad():
+        solved = [world[0]]
+        for k in range(1, n_windows):
+            solved.append(
+                Sim3(
+                    s=float(torch.exp(log_s[k - 1])),
+                    R=roma.rotvec_to_rotmat(rotvec[k - 1]).numpy(),
+                    T=trans[k - 1].numpy(),
+                )
+            )
+    return solved
+
+
+def chunked_global_alignment(
+    images,
+    model_path,
+    device,
+    batch_size,
+    schedule,
+    lr,
+    niter,
+    focal_avg,
+    confidence,
+    window_size,
+    window_overlap,
+):
+    """
+    Align a long sequence window by window and stitch the windows with a Sim(3) pose graph.
+
+    Windows are aligned independently (one worker per visible GPU when `device` is a bare
+    "cuda"), so peak memory is bounded by `window_size` rather than the sequence length.
+    Returns per-frame (imgs, focals, poses, pts3d, confs, confidence_masks, intrinsics) in the
+    coordinate frame of the first window, matching the single-pass outputs.
+    """
+    n_views = len(images)
+    windows = split_windows(n_views, window_size, window_overlap)
+    print(
+        f"Chunked alignment of {n_views} views into {len(windows)} windows: {windows}"
+    )
+
+    if device == "cuda" and torch.cuda.device_count() > 1:
+        devices = [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+    else:
+        devices = [device]
+    devices = devices[: len(windows)]
+    models = [
+        AsymmetricCroCo3DStereo.from_pretrained(model_path).to(d) for d in devices
+    ]
+
+    def run(k):
+        worker = k % len(devices)
+        start, end = windows[k]
+        return align_window(
+            images,
+            list(range(start, end)),
+            models[worker],
+            devices[worker],
+            batch_size,
+            schedule,
+            lr,
+            niter,
+            focal_avg,
+            confidence,
+        )
+
+    if len(devices) > 1:
+        with ThreadPoolExecutor(max_workers=len(devices)) as executor:
+            aligned = list(executor.map(run, range(len(windows))))
+    else:
+        aligned = [run(k) for k in range(len(windows))]
+    del models
+
+    edges = []
+    for a in range(len(aligned)):
+        for b in range(a + 1, len(aligned)):
+            if set(aligned[a].frame_ids) & set(aligned[b].frame_ids):
+                sim3, corr = estimate_overlap_sim3(aligned[b], aligned[a])
+                edges.append((b, a, sim3, corr))
+    world_from_window = solve_sim3_pose_graph(len(aligned), edges)
+
+    # Each frame is taken from the window in which it is most central
+    imgs, focals, poses, pts3d, confs, masks, intrinsics = [], [], [], [], [], [], []
+    for frame_id in range(n_views):
+        k = max(
+            (k for k, (s, e) in enumerate(windows) if s <= frame_id < e),
+            key=lambda k: min(frame_id - windows[k][0], windows[k][1] - 1 - frame_id),
+        )
+        window, sim3 = aligned[k], world_from_window[k]
+        i = window.frame_ids.index(frame_id)
+
+        pose = window.poses[i].copy()
+        pose[:3, :3] = sim3.R @ pose[:3, :3]
+        pose[:3, 3] = sim3.s * sim3.R @ pose[:3, 3] + sim3.T
+
+        imgs.append(window.imgs[i])
+        focals.append(window.focals[i])
+        poses.append(pose)
+        pts3d.append((sim3.s * window.pts3d[i] @ sim3.R.T + sim3.T).astype(np.float32))
+        confs.append(window.confs[i])
+        masks.append(window.confidence_masks[i])
+        intrinsics.append(window.intrinsics[i].copy())
+
+    focals = np.stack(focals)
+    intrinsics = np.stack(intrinsics)
+    if focal_avg:
+        # windows average their focals independently, re-average across the sequence
+        focals[:] = focals.mean()
+        intrinsics[:, 0, 0] = focals[:, 0]
+        intrinsics[:, 1, 1] = focals[:, 0]
+    poses = np.stack(poses).astype(np.float32)
+    return imgs, focals, poses, pts3d, confs, masks, intrinsics
@@ -4,7 +4,6 @@ import cv2
 import numpy as np
 import PIL.Image
 from PIL.ImageOps import exif_transpose
-from plyfile import PlyData, PlyElement
 import torchvision.transforms as tvf
 import roma
 
@@ -14,6 +13,8 @@ from mini_dust3r.utils.geometry import geotrf, inv
 from mini_dust3r.cloud_opt.commons import edge_str
 from mini_dust3r.utils.image import _resize_pil_image
 
+from instant_splat.utils.ply_utils import store_point_cloud_ply
+
 try:
     from pillow_heif import register_heif_opener  # noqa
 
@@ -193,29 +194,7 @@ def load_images(folder_or_list, size, square_ok=False):
 
 
 def storePly(path, xyz, rgb):
-    # Define the dtype for the structured array
-    dtype = [
-        ("x", "f4"),
-        ("y", "f4"),
-        ("z", "f4"),
-        ("nx", "f4"),
-        ("ny", "f4"),
-        ("nz", "f4"),
-        ("red", "u1"),
-        ("green", "u1"),
-        ("blue", "u1"),
-    ]
-
-    normals = np.zeros_like(xyz)
-
-    elements = np.empty(xyz.shape[0], dtype=dtype)
-    attributes = np.concatenate((xyz, normals, rgb), axis=1)
-    elements[:] = list(map(tuple, attributes))
-
-    # Create the PlyData object and write to file
-    vertex_element = PlyElement.describe(elements, "vertex")
-    ply_data = PlyData([vertex_element])
-    ply_data.write(path)
+    store_point_cloud_ply(path, xyz, rgb)
 
 
 def R_to_quaternion(R):
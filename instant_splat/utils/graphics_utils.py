@@ -19,6 +19,15 @@ class BasicPointCloud(NamedTuple):
     colors : np.array
     normals : np.array
 
+class SplatAttributes(NamedTuple):
+    """Per-Gaussian float32 arrays in the column layout of GaussianModel.save_ply."""
+    xyz : np.ndarray
+    f_dc : np.ndarray
+    f_rest : np.ndarray
+    opacity : np.ndarray
+    scale : np.ndarray
+    rotation : np.ndarray
+
 def geom_transform_points(points, transf_matrix):
     P, _ = points.shape
     ones = torch.ones(P, 1, dtype=points.dtype, device=points.device)
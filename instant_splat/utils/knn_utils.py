@@ -0,0 +1,62 @@
+import numpy as np
+import torch
+from scipy.spatial import cKDTree
+
+from instant_splat.utils.spatial_index import MortonIndex
+
+try:
+    from simple_knn._C import distCUDA2
+except ImportError:
+    distCUDA2 = None
+
+
+def _dist_cuda(points):
+    return distCUDA2(points.float().contiguous())
+
+
+def _dist_kdtree(points, k=3, workers=-1):
+    """Exact k-nearest-neighbour search on the CPU, parallel across all cores."""
+    xyz = points.detach().float().cpu().numpy()
+    if len(xyz) <= 1:
+        return torch.zeros(len(xyz), dtype=torch.float32, device=points.device)
+    k = min(k, len(xyz) - 1)
+    # Query k + 1 neighbours and drop the first, which is the point itself (or an
+    # exact duplicate of it, which is at the same zero distance)
+    dist, _ = cKDTree(xyz).query(xyz, k=k + 1, workers=workers)
+    dist2 = np.square(dist[:, 1:], dtype=np.float64).mean(axis=1)
+    return torch.from_numpy(dist2.astype(np.float32)).to(points.device)
+
+
+def _dist_morton(points, k=3):
+    """Exact k-nearest-neighbour search in torch through a Morton spatial index."""
+    xyz = points.detach().float()
+    if len(xyz) <= 1:
+        return torch.zeros(len(xyz), dtype=torch.float32, device=points.device)
+    k = min(k, len(xyz) - 1)
+    dist2, _ = MortonIndex(xyz).knn(xyz, k + 1, xyz)
+    return dist2[:, 1:].mean(dim=1)
+
+
+KNN_BACKENDS = {"cuda": _dist_cuda, "kdtree": _dist_kdtree, "morton": _dist_morton}
+
+
+def knn_backend(points, backend="auto"):
+    if backend != "auto":
+        assert backend in KNN_BACKENDS, f"unknown KNN backend {backend}"
+        return backend
+    if points.is_cuda:
+        # Without simple_knn, stay on the GPU rather than copying to a KD-tree
+        return "cuda" if distCUDA2 is not None else "morton"
+    return "kdtree"
+
+
+def mean_sq_dist_3nn(points, backend="auto"):
+    """
+    Mean squared distance of every point to its 3 nearest neighbours, as computed by
+    `simple_knn._C.distCUDA2`.
+
+    The CUDA extension is used for CUDA tensors when it is installed, and a Morton
+    spatial index on the GPU otherwise; CPU tensors go to a multi-threaded KD-tree. All
+    backends compute the same exact result, on the device of `points`.
+    """
+    return KNN_BACKENDS[knn_backend(points, backend)](points)
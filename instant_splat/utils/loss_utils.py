@@ -13,6 +13,7 @@ import torch
 import torch.nn.functional as F
 from torch.autograd import Variable
 from math import exp
+from functools import lru_cache
 
 def l1_loss(network_output, gt):
     return torch.abs((network_output - gt)).mean()
@@ -30,15 +31,47 @@ def create_window(window_size, channel):
     window = Variable(_2D_window.expand(channel, 1, window_size, window_size).contiguous())
     return window
 
+@lru_cache(maxsize=None)
+def _separable_windows(window_size, groups, dtype, device):
+    """Vertical and horizontal 1D Gaussian kernels for a depthwise conv over `groups` maps."""
+    window = gaussian(window_size, 1.5).to(device=device, dtype=dtype)
+    vertical = window.view(1, 1, window_size, 1).expand(groups, 1, window_size, 1)
+    horizontal = window.view(1, 1, 1, window_size).expand(groups, 1, 1, window_size)
+    return vertical.contiguous(), horizontal.contiguous()
+
 def ssim(img1, img2, window_size=11, size_average=True):
+    """
+    SSIM with the same Gaussian window and zero padding as `_ssim`, computed with
+    one pair of separable grouped convolutions over all five moment maps instead
+    of five 2D ones. The window is built once per size, channels, dtype and device.
+    """
     channel = img1.size(-3)
-    window = create_window(window_size, channel)
+    groups = 5 * channel
+    vertical, horizontal = _separable_windows(window_size, groups, img1.dtype, img1.device)
 
-    if img1.is_cuda:
-        window = window.cuda(img1.get_device())
-    window = window.type_as(img1)
+    moments = torch.cat([img1, img2, img1 * img1, img2 * img2, img1 * img2], dim=-3)
+    unbatched = moments.dim() == 3
+    if unbatched:
+        moments = moments.unsqueeze(0)
+    if moments.device.type == "cpu":
+        # oneDNN's depthwise convolutions are several times faster in NHWC
+        moments = moments.contiguous(memory_format=torch.channels_last)
+    pad = window_size // 2
+    moments = F.conv2d(moments, vertical, padding=(pad, 0), groups=groups)
+    moments = F.conv2d(moments, horizontal, padding=(0, pad), groups=groups)
+    if unbatched:
+        moments = moments.squeeze(0)
+    mu1, mu2, img1_sq, img2_sq, img1_img2 = moments.split(channel, dim=-3)
 
-    return _ssim(img1, img2, window, window_size, channel, size_average)
+    mu1_sq = mu1.pow(2)
+    mu2_sq = mu2.pow(2)
+    mu1_mu2 = mu1 * mu2
+
+    sigma1_sq = img1_sq - mu1_sq
+    sigma2_sq = img2_sq - mu2_sq
+    sigma12 = img1_img2 - mu1_mu2
+
+    return _ssim_from_moments(mu1_sq, mu2_sq, mu1_mu2, sigma1_sq, sigma2_sq, sigma12, size_average)
 
 def _ssim(img1, img2, window, window_size, channel, size_average=True):
     mu1 = F.conv2d(img1, window, padding=window_size // 2, groups=channel)
@@ -52,6 +85,9 @@ def _ssim(img1, img2, window, window_size, channel, size_average=True):
     sigma2_sq = F.conv2d(img2 * img2, window, padding=window_size // 2, groups=channel) - mu2_sq
     sigma12 = F.conv2d(img1 * img2, window, padding=window_size // 2, groups=channel) - mu1_mu2
 
+    return _ssim_from_moments(mu1_sq, mu2_sq, mu1_mu2, sigma1_sq, sigma2_sq, sigma12, size_average)
+
+def _ssim_from_moments(mu1_sq, mu2_sq, mu1_mu2, sigma1_sq, sigma2_sq, sigma12, size_average):
     C1 = 0.01 ** 2
     C2 = 0.03 ** 2
 
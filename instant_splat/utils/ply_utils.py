@@ -0,0 +1,166 @@
+import numpy as np
+from plyfile import PlyData, PlyElement
+
+
+def build_vertex_array(columns):
+    """
+    Pack per-point attribute blocks into a PLY-ready structured array.
+
+    `columns` is a sequence of (names, values, dtype) where values has shape (N, len(names)).
+    When every block shares a dtype the blocks are concatenated once and the resulting
+    contiguous buffer is reinterpreted as the structured dtype; otherwise fields are
+    filled one column at a time. Neither path creates per-point Python objects.
+    """
+    columns = [
+        (
+            list(names),
+            np.asarray(values).reshape(len(values), -1 if len(values) else len(names)),
+            np.dtype(dt),
+        )
+        for names, values, dt in columns
+    ]
+    for names, values, _ in columns:
+        assert values.shape[1] == len(names), f"{names} does not match {values.shape}"
+    n = len(columns[0][1])
+    dtype = [(name, dt.newbyteorder("<")) for names, _, dt in columns for name in names]
+
+    if len({dt for _, _, dt in columns}) == 1:
+        dt = columns[0][2].newbyteorder("<")
+        buffer = np.empty((n, len(dtype)), dtype=dt)
+        offset = 0
+        for names, values, _ in columns:
+            buffer[:, offset : offset + len(names)] = values
+            offset += len(names)
+        return buffer.view(dtype).reshape(n)
+
+    elements = np.empty(n, dtype=dtype)
+    for names, values, _ in columns:
+        for i, name in enumerate(names):
+            elements[name] = values[:, i]
+    return elements
+
+
+def write_ply_elements(path, elements):
+    """Write (name, columns) pairs as consecutive elements of a binary little-endian PLY."""
+    PlyData(
+        [
+            PlyElement.describe(build_vertex_array(columns), name)
+            for name, columns in elements
+        ],
+        byte_order="<",
+    ).write(path)
+
+
+def write_vertex_ply(path, columns):
+    """Write attribute blocks (see `build_vertex_array`) as a binary little-endian PLY."""
+    write_ply_elements(path, [("vertex", columns)])
+
+
+def store_point_cloud_ply(path, xyz, rgb):
+    """Write a colored point cloud with zero normals, as expected by `fetchPly`."""
+    write_vertex_ply(
+        path,
+        [
+            (["x", "y", "z"], xyz, "f4"),
+            (["nx", "ny", "nz"], np.zeros((len(xyz), 3), dtype=np.float32), "f4"),
+            (["red", "green", "blue"], rgb, "u1"),
+        ],
+    )
+
+
+PLY_DTYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
+
+def _read_vertex_header(path):
+    """
+    Parse a PLY header and return (offset, count, dtype) of a leading binary
+    little-endian vertex element, or None if the file needs the generic reader.
+    """
+    with open(path, "rb") as f:
+        if f.readline().strip() != b"ply":
+            return None
+        fmt, elements = None, []
+        while True:
+            line = f.readline()
+            if not line:
+                return None
+            tokens = line.decode("ascii").split()
+            if not tokens or tokens[0] in ("comment", "obj_info"):
+                continue
+            if tokens[0] == "end_header":
+                break
+            if tokens[0] == "format":
+                fmt = tokens[1]
+            elif tokens[0] == "element":
+                elements.append((tokens[1], int(tokens[2]), []))
+            elif tokens[0] == "property":
+                if tokens[1] == "list" or tokens[1] not in PLY_DTYPES:
+                    return None
+                elements[-1][2].append((tokens[2], "<" + PLY_DTYPES[tokens[1]]))
+        offset = f.tell()
+
+    if fmt != "binary_little_endian" or not elements or elements[0][0] != "vertex":
+        return None
+    _, count, properties = elements[0]
+    return offset, count, np.dtype(properties)
+
+
+def read_vertex_ply(path):
+    """
+    Return the vertex element of a PLY file as a structured array.
+
+    Binary little-endian files (everything written by `write_vertex_ply`) are memory
+    mapped, so no attribute is decoded or converted until it is sliced.
+    """
+    header = _read_vertex_header(path)
+    if header is None:
+        return PlyData.read(path)["vertex"].data
+    offset, count, dtype = header
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+def read_ply_element(path, name):
+    """Return element `name` of a PLY file as a structured array."""
+    return PlyData.read(path)[name].data
+
+
+def vertex_columns(vertices, names, dtype=np.float32):
+    """
+    Gather the named vertex properties into a contiguous (N, len(names)) array.
+
+    When every property already has `dtype`, the records are viewed as a 2D array and
+    the columns are gathered with a single `np.take` copy; otherwise each field is cast
+    straight into the output buffer.
+    """
+    dtype = np.dtype(dtype)
+    field_dtypes = {vertices.dtype.fields[name][0] for name in vertices.dtype.names}
+    if field_dtypes == {dtype.newbyteorder("<")}:
+        flat = vertices.view(field_dtypes.pop()).reshape(
+            len(vertices), len(vertices.dtype.names)
+        )
+        index = [vertices.dtype.names.index(name) for name in names]
+        return np.take(flat, index, axis=1)
+
+    columns = np.empty((len(vertices), len(names)), dtype=dtype)
+    for i, name in enumerate(names):
+        columns[:, i] = vertices[name]
+    return columns
@@ -0,0 +1,115 @@
+import numpy as np
+
+
+def _voxel_keys(points, voxel_size):
+    """Flatten integer voxel coordinates of every point into a single int64 key."""
+    cells = np.floor((points - points.min(axis=0)) / voxel_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    return (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+
+def _spread_bits(v):
+    """Insert two zero bits between each of the low 21 bits of v."""
+    v = v.astype(np.uint64) & np.uint64(0x1FFFFF)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+def morton_codes(points, bits=21):
+    """
+    Return 3D Morton (Z-order) codes of points quantized to `bits` per axis within
+    their bounding box, as uint64. Sorting by these codes makes neighbouring points
+    contiguous in memory.
+    """
+    assert 0 < bits <= 21, "at most 21 bits per axis fit in a 64-bit code"
+    lo = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - lo, 1e-12)
+    cells = np.clip(
+        (points - lo) / extent * ((1 << bits) - 1), 0, (1 << bits) - 1
+    ).astype(np.uint64)
+    return (
+        (_spread_bits(cells[:, 0]) << np.uint64(2))
+        | (_spread_bits(cells[:, 1]) << np.uint64(1))
+        | _spread_bits(cells[:, 2])
+    )
+
+
+def count_occupied_voxels(points, voxel_size):
+    keys = np.sort(_voxel_keys(points, voxel_size))
+    return int(np.count_nonzero(np.diff(keys))) + 1 if len(keys) else 0
+
+
+def voxel_size_for_budget(points, max_points, tolerance=0.1, max_iter=20):
+    """
+    Search for the smallest voxel size whose occupied-cell count fits in max_points.
+
+    Bisects in log space between a tiny cell and the bounding-box diagonal and stops as
+    soon as the count lands within `tolerance` below the budget.
+    """
+    extent = float(np.linalg.norm(points.max(axis=0) - points.min(axis=0)))
+    lo, hi = extent * 1e-6, extent
+    for _ in range(max_iter):
+        mid = np.sqrt(lo * hi)
+        count = count_occupied_voxels(points, mid)
+        if count > max_points:
+            lo = mid
+        else:
+            hi = mid
+            if count >= (1.0 - tolerance) * max_points:
+                break
+    return hi
+
+
+def voxel_fuse(points, colors, weights=None, voxel_size=0.0, max_points=0):
+    """
+    Merge all points falling into the same voxel into a single point.
+
+    Positions and colors are averaged with `weights` (e.g. DUSt3R confidences), so a
+    cell seen by many views collapses to its confidence-weighted centroid. If only
+    `max_points` is given, the voxel size is chosen to fit the budget; if both are given
+    and the voxel grid still exceeds the budget, the cells with the largest accumulated
+    weight are kept.
+
+    Returns (points, colors, weights) of the fused cloud, colors in the input dtype.
+    """
+    if len(points) == 0 or (voxel_size <= 0 and max_points <= 0):
+        return points, colors, weights
+    if weights is None:
+        weights = np.ones(len(points), dtype=np.float64)
+    if voxel_size <= 0:
+        if len(points) <= max_points:
+            return points, colors, weights
+        voxel_size = voxel_size_for_budget(points, max_points)
+
+    _, inverse = np.unique(_voxel_keys(points, voxel_size), return_inverse=True)
+    n_cells = int(inverse.max()) + 1
+    weights = weights.astype(np.float64)
+    cell_weight = np.bincount(inverse, weights=weights, minlength=n_cells)
+
+    def weighted_mean(values):
+        sums = [
+            np.bincount(inverse, weights=column * weights, minlength=n_cells)
+            for column in values.astype(np.float64).T
+        ]
+        return np.stack(sums, axis=1) / cell_weight[:, None]
+
+    fused_points = weighted_mean(points).astype(points.dtype)
+    fused_colors = weighted_mean(colors)
+    if np.issubdtype(colors.dtype, np.integer):
+        fused_colors = np.round(fused_colors)
+    fused_colors = fused_colors.astype(colors.dtype)
+
+    if 0 < max_points < n_cells:
+        keep = np.argpartition(-cell_weight, max_points)[:max_points]
+        fused_points = fused_points[keep]
+        fused_colors = fused_colors[keep]
+        cell_weight = cell_weight[keep]
+
+    print(
+        f"Voxel fusion ({voxel_size:.4g}): {len(points)} -> {len(fused_points)} points"
+    )
+    return fused_points, fused_colors, cell_weight
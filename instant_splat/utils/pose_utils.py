@@ -3,6 +3,7 @@ import torch
 import torch.nn.functional as F
 from typing import Tuple
 from instant_splat.utils.stepfun import sample_np, sample
+from instant_splat.utils.general_utils import get_default_device
 import scipy
 
 
@@ -31,7 +32,7 @@ def quad2rotation(q):
     # rot_mat[:, 2, 2] = 1 - two_s * (qi**2 + qj**2)
     # return rot_mat
     if not isinstance(q, torch.Tensor):
-        q = torch.tensor(q).cuda()
+        q = torch.tensor(q, device=get_default_device())
 
     norm = torch.sqrt(
         q[:, 0] * q[:, 0] + q[:, 1] * q[:, 1] + q[:, 2] * q[:, 2] + q[:, 3] * q[:, 3]
@@ -60,7 +61,7 @@ def get_camera_from_tensor(inputs):
 
     """
     if not isinstance(inputs, torch.Tensor):
-        inputs = torch.tensor(inputs).cuda()
+        inputs = torch.tensor(inputs, device=get_default_device())
 
     N = len(inputs.shape)
     if N == 1:
@@ -105,6 +106,33 @@ def quadmultiply(q1, q2):
     return result_quaternion
 
 
+def quadmultiply_left(q1, q2):
+    """
+    quadmultiply(q1, q2) for a single quaternion q1 and a batch q2 (N, 4).
+
+    Left multiplication by q1 is linear in q2, so the batch is multiplied by a 4x4
+    matrix in one matmul instead of sixteen elementwise products.
+    """
+    w, x, y, z = q1.unbind(dim=-1)
+    left = torch.stack(
+        [
+            torch.stack([w, -x, -y, -z]),
+            torch.stack([x, w, -z, y]),
+            torch.stack([y, z, w, -x]),
+            torch.stack([z, -y, x, w]),
+        ]
+    )
+    return q2 @ left.T
+
+
+def transform_points(w2c, points):
+    """
+    Apply a (4, 4) rigid transform to points (N, 3) as R·x + t in a single addmm,
+    without padding the points to homogeneous coordinates.
+    """
+    return torch.addmm(w2c[:3, 3], points, w2c[:3, :3].T)
+
+
 def _sqrt_positive_part(x: torch.Tensor) -> torch.Tensor:
     """
     Returns torch.sqrt(torch.max(0, x))
@@ -132,7 +160,7 @@ def rotation2quad(matrix: torch.Tensor) -> torch.Tensor:
         raise ValueError(f"Invalid rotation matrix shape {matrix.shape}.")
 
     if not isinstance(matrix, torch.Tensor):
-        matrix = torch.tensor(matrix).cuda()
+        matrix = torch.tensor(matrix, device=get_default_device())
 
     batch_dim = matrix.shape[:-2]
     m00, m01, m02, m10, m11, m12, m20, m21, m22 = torch.unbind(
@@ -209,7 +237,7 @@ def get_tensor_from_camera(RT, Tquad=False):
     # return tensor
 
     if not isinstance(RT, torch.Tensor):
-        RT = torch.tensor(RT).cuda()
+        RT = torch.tensor(RT, device=get_default_device())
 
     rot = RT[:3, :3].unsqueeze(0).detach()
     quat = rotation2quad(rot).squeeze()
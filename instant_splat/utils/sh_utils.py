@@ -21,6 +21,8 @@
 #  ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 #  POSSIBILITY OF SUCH DAMAGE.
 
+import math
+
 import torch
 
 C0 = 0.28209479177387814
@@ -111,6 +113,27 @@ def eval_sh(deg, sh, dirs):
                             C4[8] * (xx * (xx - 3 * yy) - yy * (3 * xx - yy)) * sh[..., 24])
     return result
 
+def sh_truncation_error(features_rest, max_degree):
+    """
+    RMS colour error, over all view directions, of truncating SH colours to each
+    degree 0..max_degree. The basis of `eval_sh` is orthonormal on the sphere, so
+    dropping the bands above d changes the colour by sqrt(sum of their squared
+    coefficients / 4 pi) on average.
+    Args:
+        features_rest: SH coeffs of bands 1.. [N, K, C], as GaussianModel._features_rest
+    Returns:
+        [N, max_degree + 1], the worst channel; the last column is 0
+    """
+    energy = features_rest[:, : (max_degree + 1) ** 2 - 1].float().square()
+    bands = [
+        energy[:, l * l - 1 : (l + 1) ** 2 - 1].sum(dim=1)
+        for l in range(1, max_degree + 1)
+    ]
+    tail = [torch.zeros_like(energy[:, 0])]
+    for band in reversed(bands):
+        tail.insert(0, tail[0] + band)
+    return (torch.stack(tail, dim=1) / (4 * math.pi)).sqrt().amax(dim=-1)
+
 def RGB2SH(rgb):
     return (rgb - 0.5) / C0
 
@@ -0,0 +1,361 @@
+import math
+
+import torch
+
+MORTON_BITS = 21
+_MAX_COORD = (1 << MORTON_BITS) - 1
+
+
+def _spread_bits(v):
+    """Insert two zero bits between each of the low 21 bits of int64 `v`."""
+    v = v & 0x1FFFFF
+    v = (v | (v << 32)) & 0x1F00000000FFFF
+    v = (v | (v << 16)) & 0x1F0000FF0000FF
+    v = (v | (v << 8)) & 0x100F00F00F00F00F
+    v = (v | (v << 4)) & 0x10C30C30C30C30C3
+    v = (v | (v << 2)) & 0x1249249249249249
+    return v
+
+
+def _compact_bits(v):
+    """Inverse of `_spread_bits`."""
+    v = v & 0x1249249249249249
+    v = (v ^ (v >> 2)) & 0x10C30C30C30C30C3
+    v = (v ^ (v >> 4)) & 0x100F00F00F00F00F
+    v = (v ^ (v >> 8)) & 0x1F0000FF0000FF
+    v = (v ^ (v >> 16)) & 0x1F00000000FFFF
+    v = (v ^ (v >> 32)) & 0x1FFFFF
+    return v
+
+
+def morton_encode(coords):
+    """Interleave (N, 3) int64 coordinates of up to 21 bits into Morton codes."""
+    return (
+        (_spread_bits(coords[:, 0]) << 2)
+        | (_spread_bits(coords[:, 1]) << 1)
+        | _spread_bits(coords[:, 2])
+    )
+
+
+def morton_decode(codes):
+    return torch.stack(
+        [_compact_bits(codes >> 2), _compact_bits(codes >> 1), _compact_bits(codes)],
+        dim=-1,
+    )
+
+
+def in_frustum(centers, radii, tanfovx, tanfovy, near):
+    """Spheres in camera space that intersect the frustum in front of `near`."""
+    x, y, z = centers.unbind(-1)
+    visible = z + radii > near
+    for coord, tan in ((x, tanfovx), (y, tanfovy)):
+        norm = math.sqrt(1.0 + tan * tan)
+        visible &= (coord - tan * z) / norm <= radii
+        visible &= (-coord - tan * z) / norm <= radii
+    return visible
+
+
+class MortonIndex:
+    """
+    Spatial index over Gaussian centers, kept as Morton-sorted arrays so it runs on
+    whatever device the centers live on.
+
+    Every point gets a 63-bit Morton code on a cubic 2^21 grid around the cloud and
+    `order` lists point indices sorted by code. Queries work on the cells of a coarser
+    level, the code prefixes of `cell_bits` bits per axis, chosen so that a cell holds
+    about `points_per_cell` points on average. The cells are stored CSR-style as
+    `cell_codes`, `cell_starts` and `cell_counts`.
+
+    `append`, `keep` and `refresh` keep the index in sync with densification, pruning
+    and moving points without re-sorting everything. Queries are exact for the
+    positions the index was last synced to.
+    """
+
+    @torch.no_grad()
+    def __init__(self, xyz, points_per_cell=16, margin=0.05):
+        self.points_per_cell = points_per_cell
+        self.margin = margin
+        self.build(xyz)
+
+    @torch.no_grad()
+    def build(self, xyz):
+        if len(xyz):
+            lo, hi = xyz.min(dim=0).values, xyz.max(dim=0).values
+        else:
+            # An empty cloud, e.g. after pruning everything: any grid will do
+            lo = hi = xyz.new_zeros(3)
+        extent = float((hi - lo).max().clamp_min(1e-6)) * (1.0 + 2.0 * self.margin)
+        self.origin = 0.5 * (lo + hi) - 0.5 * extent
+        self.extent = extent
+        codes = self._encode(xyz)
+        self.codes, self.order = torch.sort(codes)
+        self._choose_cell_bits()
+        self._update_cells()
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def cell_size(self):
+        return self.extent / (1 << self.cell_bits)
+
+    def _grid_coords(self, xyz):
+        scaled = (xyz - self.origin) / self.extent * (1 << MORTON_BITS)
+        return scaled.floor().long()
+
+    def _inside(self, xyz):
+        coords = self._grid_coords(xyz)
+        return bool(((coords >= 0) & (coords <= _MAX_COORD)).all())
+
+    def _encode(self, xyz):
+        return morton_encode(self._grid_coords(xyz).clamp(0, _MAX_COORD))
+
+    def _choose_cell_bits(self):
+        self.cell_bits = MORTON_BITS
+        for bits in range(1, MORTON_BITS + 1):
+            prefix = self.codes >> (3 * (MORTON_BITS - bits))
+            occupied = 1 + int((prefix[1:] != prefix[:-1]).sum())
+            if len(self.codes) <= self.points_per_cell * occupied:
+                self.cell_bits = bits
+                break
+
+    def _update_cells(self):
+        cells = self.codes >> (3 * (MORTON_BITS - self.cell_bits))
+        self.cell_codes, self.cell_counts = torch.unique_consecutive(
+            cells, return_counts=True
+        )
+        self.cell_starts = torch.cumsum(self.cell_counts, 0) - self.cell_counts
+
+    def _cell_coords(self, cell_codes):
+        return morton_decode(cell_codes)
+
+    def _cell_lookup(self, coords):
+        """Cell ids of integer cell coordinates, -1 where the cell is empty."""
+        n_cells = 1 << self.cell_bits
+        valid = ((coords >= 0) & (coords < n_cells)).all(dim=-1)
+        codes = morton_encode(coords.clamp(0, n_cells - 1).reshape(-1, 3)).view(
+            coords.shape[:-1]
+        )
+        ids = torch.searchsorted(self.cell_codes, codes).clamp(
+            max=len(self.cell_codes) - 1
+        )
+        found = valid & (self.cell_codes[ids] == codes)
+        return torch.where(found, ids, -1)
+
+    def points_in_cells(self, cells):
+        """Point indices of every cell in `cells`, cell after cell."""
+        counts = self.cell_counts[cells]
+        starts = torch.repeat_interleave(
+            self.cell_starts[cells] - torch.cumsum(counts, 0) + counts, counts
+        )
+        return self.order[starts + torch.arange(len(starts), device=self.order.device)]
+
+    @torch.no_grad()
+    def append(self, xyz):
+        """Insert the points `xyz[len(self):]`, which were appended to the cloud."""
+        new = xyz[len(self) :]
+        if not self._inside(new):
+            self.build(xyz)
+            return
+        new_codes, new_order = torch.sort(self._encode(new))
+        self._merge(new_codes, new_order + len(self))
+
+    def _merge(self, new_codes, new_order):
+        n = len(self.codes) + len(new_codes)
+        slots = torch.searchsorted(self.codes, new_codes, right=True)
+        slots += torch.arange(len(new_codes), device=slots.device)
+        is_new = torch.zeros(n, dtype=torch.bool, device=slots.device)
+        is_new[slots] = True
+        codes = self.codes.new_empty(n)
+        order = self.order.new_empty(n)
+        codes[slots], order[slots] = new_codes, new_order
+        codes[~is_new], order[~is_new] = self.codes, self.order
+        self.codes, self.order = codes, order
+        self._update_cells()
+
+    @torch.no_grad()
+    def keep(self, mask):
+        """Drop the points where `mask` is False and renumber the rest."""
+        kept = mask[self.order]
+        new_index = torch.cumsum(mask, 0) - 1
+        self.order = new_index[self.order[kept]]
+        self.codes = self.codes[kept]
+        self._update_cells()
+
+    @torch.no_grad()
+    def renumber(self, order):
+        """Follow a reordering of the cloud in which point `order[i]` becomes point i."""
+        new_index = torch.empty_like(order)
+        new_index[order] = torch.arange(len(order), device=order.device)
+        self.order = new_index[self.order]
+
+    @torch.no_grad()
+    def refresh(self, xyz, max_resort=0.25):
+        """
+        Re-sync to moved points. Only points that changed cell are removed and
+        re-inserted; everything is rebuilt if a point left the grid or more than
+        `max_resort` of them changed cell. The codes of points that stay in their cell
+        are left as they were, so below the cell level `codes` may be stale.
+        """
+        if not self._inside(xyz):
+            self.build(xyz)
+            return
+        codes = self._encode(xyz[self.order])
+        shift = 3 * (MORTON_BITS - self.cell_bits)
+        moved = (codes >> shift) != (self.codes >> shift)
+        n_moved = int(moved.sum())
+        if n_moved == 0:
+            return
+        if n_moved > max_resort * len(codes):
+            self.codes, order = torch.sort(codes)
+            self.order = self.order[order]
+            self._update_cells()
+            return
+        moved_order = self.order[moved]
+        self.codes, self.order = self.codes[~moved], self.order[~moved]
+        new_codes, perm = torch.sort(codes[moved])
+        self._merge(new_codes, moved_order[perm])
+
+    @torch.no_grad()
+    def range(self, lo, hi, xyz):
+        """Indices of the points inside the axis-aligned box [lo, hi]."""
+        lo = torch.as_tensor(lo, dtype=xyz.dtype, device=xyz.device)
+        hi = torch.as_tensor(hi, dtype=xyz.dtype, device=xyz.device)
+        cell_lo = self.origin + self._cell_coords(self.cell_codes) * self.cell_size
+        overlap = ((cell_lo <= hi) & (cell_lo + self.cell_size >= lo)).all(dim=1)
+        candidates = self.points_in_cells(torch.nonzero(overlap).squeeze(1))
+        p = xyz[candidates]
+        inside = ((p >= lo) & (p <= hi)).all(dim=1)
+        return torch.sort(candidates[inside]).values
+
+    @torch.no_grad()
+    def frustum(self, xyz, w2c, tanfovx, tanfovy, near, radii=None):
+        """
+        Indices of the points whose sphere of `radii` (0 if None) intersects the
+        frustum of a camera with model-to-camera transform `w2c` (4, 4).
+        """
+        if radii is None:
+            radii = torch.zeros(len(xyz), dtype=xyz.dtype, device=xyz.device)
+        R, t = w2c[:3, :3], w2c[:3, 3]
+        cell_radii = torch.zeros(
+            len(self.cell_codes), dtype=xyz.dtype, device=xyz.device
+        ).scatter_reduce_(
+            0,
+            torch.repeat_interleave(
+                torch.arange(len(self.cell_codes), device=xyz.device),
+                self.cell_counts,
+            ),
+            radii[self.order],
+            "amax",
+        )
+        cell_centers = (
+            self.origin + (self._cell_coords(self.cell_codes) + 0.5) * self.cell_size
+        )
+        visible = in_frustum(
+            torch.addmm(t, cell_centers, R.T),
+            cell_radii + 0.5 * math.sqrt(3.0) * self.cell_size,
+            tanfovx,
+            tanfovy,
+            near,
+        )
+        candidates = self.points_in_cells(torch.nonzero(visible).squeeze(1))
+        keep = in_frustum(
+            torch.addmm(t, xyz[candidates], R.T),
+            radii[candidates],
+            tanfovx,
+            tanfovy,
+            near,
+        )
+        return torch.sort(candidates[keep]).values
+
+    @torch.no_grad()
+    def knn(self, queries, k, xyz, max_pairs=2**24):
+        """
+        Exact k nearest points of every query: (squared distances, indices), both
+        (Q, k) and sorted by distance, padded with inf / -1 if the cloud has fewer
+        than k points.
+
+        Candidates come from the block of cells around each query's cell; queries
+        whose k-th distance could still be beaten outside the block are retried with
+        a block twice as wide.
+        """
+        n_queries = len(queries)
+        dist2 = torch.full((n_queries, k), math.inf, dtype=xyz.dtype, device=xyz.device)
+        index = torch.full((n_queries, k), -1, dtype=torch.long, device=xyz.device)
+        if len(xyz) == 0:
+            return dist2, index
+        pending = torch.arange(n_queries, device=xyz.device)
+        n_cells = 1 << self.cell_bits
+        ring = 1
+        while len(pending):
+            if (2 * ring + 1) ** 3 >= len(self.cell_codes):
+                # The block would cover about every occupied cell; compare with all
+                chunk = max(max_pairs // len(xyz), 1)
+                for start in range(0, len(pending), chunk):
+                    ids = pending[start : start + chunk]
+                    d = torch.cdist(queries[ids], xyz).square()
+                    d, i = torch.topk(d, min(k, len(xyz)), dim=1, largest=False)
+                    dist2[ids, : d.shape[1]], index[ids, : d.shape[1]] = d, i
+                break
+            side = torch.arange(-ring, ring + 1, device=xyz.device)
+            offsets = torch.stack(
+                torch.meshgrid(side, side, side, indexing="ij"), -1
+            ).reshape(-1, 3)
+            per_query = len(offsets) * max(int(self.cell_counts.max()), 1)
+            chunk = max(max_pairs // per_query, 1)
+            unresolved = []
+            for start in range(0, len(pending), chunk):
+                ids = pending[start : start + chunk]
+                q = queries[ids]
+                coords = (
+                    ((q - self.origin) / self.cell_size)
+                    .floor()
+                    .long()
+                    .clamp(0, n_cells - 1)
+                )
+                cells = self._cell_lookup(coords[:, None, :] + offsets)
+                d, i = self._nearest_in_cells(q, cells, k, xyz)
+                dist2[ids], index[ids] = d, i
+
+                # Distance from each query to the nearest face of its block that
+                # still has cells beyond it
+                block_lo = self.origin + (coords - ring) * self.cell_size
+                block_hi = self.origin + (coords + ring + 1) * self.cell_size
+                margin = (
+                    torch.minimum(
+                        torch.where(coords - ring > 0, q - block_lo, math.inf),
+                        torch.where(
+                            coords + ring < n_cells - 1, block_hi - q, math.inf
+                        ),
+                    )
+                    .min(dim=1)
+                    .values
+                )
+                unresolved.append(ids[d[:, -1] > margin.square()])
+            pending = torch.cat(unresolved)
+            ring *= 2
+        return dist2, index
+
+    def _nearest_in_cells(self, q, cells, k, xyz):
+        n_queries, n_offsets = cells.shape
+        flat = cells.reshape(-1)
+        found = flat >= 0
+        counts = torch.where(found, self.cell_counts[flat.clamp(min=0)], 0)
+        owner = torch.repeat_interleave(
+            torch.arange(n_queries, device=q.device).repeat_interleave(n_offsets),
+            counts,
+        )
+        candidates = self.points_in_cells(flat[found])
+
+        # Scatter each query's candidates into a padded (Q, C) distance matrix
+        per_query = counts.view(n_queries, n_offsets).sum(dim=1)
+        width = max(int(per_query.max()), k)
+        slot = torch.arange(len(owner), device=q.device) - torch.repeat_interleave(
+            torch.cumsum(per_query, 0) - per_query, per_query
+        )
+        d = torch.full((n_queries, width), math.inf, dtype=xyz.dtype, device=q.device)
+        i = torch.full((n_queries, width), -1, dtype=torch.long, device=q.device)
+        d[owner, slot] = (xyz[candidates] - q[owner]).square().sum(dim=1)
+        i[owner, slot] = candidates
+        d, top = torch.topk(d, k, dim=1, largest=False)
+        return d, torch.gather(i, 1, top)
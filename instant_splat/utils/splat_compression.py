@@ -0,0 +1,273 @@
+import numpy as np
+from plyfile import PlyData
+
+from instant_splat.utils.graphics_utils import SplatAttributes
+from instant_splat.utils.ply_utils import write_ply_elements, vertex_columns
+from instant_splat.utils.point_cloud_utils import morton_codes
+from instant_splat.utils.sh_utils import C0
+
+# Layout follows the PlayCanvas / SuperSplat "compressed ply": Gaussians are sorted in
+# Morton order and grouped into chunks of 256 that store per-chunk bounds, every
+# Gaussian packs position, rotation, log-scale and color+opacity into four uint32 and
+# the higher SH bands are stored as one uint8 per coefficient.
+CHUNK_SIZE = 256
+SH_RANGE = 8.0
+VERTEX_PROPERTIES = [
+    "packed_position",
+    "packed_rotation",
+    "packed_scale",
+    "packed_color",
+]
+CHUNK_PROPERTIES = [
+    f"{bound}_{name}"
+    for group in [["x", "y", "z"], ["scale_x", "scale_y", "scale_z"], ["r", "g", "b"]]
+    for bound in ["min", "max"]
+    for name in group
+]
+
+
+def _pack_unorm(value, bits):
+    top = (1 << bits) - 1
+    return np.clip(np.floor(value * top + 0.5), 0, top).astype(np.uint32)
+
+
+def _unpack_unorm(packed, bits):
+    return packed.astype(np.float32) / ((1 << bits) - 1)
+
+
+def _chunk_bounds(values, n_chunks):
+    """Per-chunk min/max of (N, C) values, padding the last chunk with its last row."""
+    padded = np.concatenate(
+        [values, np.repeat(values[-1:], n_chunks * CHUNK_SIZE - len(values), axis=0)]
+    ).reshape(n_chunks, CHUNK_SIZE, -1)
+    return padded.min(axis=1), padded.max(axis=1)
+
+
+def _normalize(values, lo, hi, chunk_ids):
+    lo, hi = lo[chunk_ids], hi[chunk_ids]
+    return (values - lo) / np.where(hi - lo > 0, hi - lo, 1.0)
+
+
+def _pack_11_10_11(unorm):
+    return (
+        (_pack_unorm(unorm[:, 0], 11) << 21)
+        | (_pack_unorm(unorm[:, 1], 10) << 11)
+        | _pack_unorm(unorm[:, 2], 11)
+    )
+
+
+def _unpack_11_10_11(packed):
+    return np.stack(
+        [
+            _unpack_unorm(packed >> 21, 11),
+            _unpack_unorm((packed >> 11) & 0x3FF, 10),
+            _unpack_unorm(packed & 0x7FF, 11),
+        ],
+        axis=1,
+    )
+
+
+def _pack_rotation(rotation):
+    """Smallest-three quaternion encoding: 2 bits for the largest index, 3 x 10 bits."""
+    # PLY stores (w, x, y, z); the packed layout uses (x, y, z, w)
+    q = rotation[:, [1, 2, 3, 0]]
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    largest = np.abs(q).argmax(axis=1)
+    q = q * np.sign(q[np.arange(len(q)), largest])[:, None]
+    packed = largest.astype(np.uint32)
+    for i in range(4):
+        keep = largest != i
+        component = _pack_unorm(q[:, i] * np.sqrt(0.5) + 0.5, 10)
+        packed = np.where(keep, (packed << 10) | component, packed)
+    return packed
+
+
+def _unpack_rotation(packed):
+    largest = packed >> 30
+    q = np.zeros((len(packed), 4), dtype=np.float32)
+    shift = 20
+    for i in range(4):
+        keep = largest != i
+        value = (_unpack_unorm((packed >> shift) & 0x3FF, 10) - 0.5) / np.sqrt(0.5)
+        q[:, i] = np.where(keep, value, 0.0)
+        shift = np.where(keep, shift - 10, shift)
+    rows = np.arange(len(packed))
+    q[rows, largest] = np.sqrt(np.clip(1.0 - np.square(q).sum(axis=1), 0.0, 1.0))
+    return q[:, [3, 0, 1, 2]]
+
+
+def truncate_sh(f_rest, sh_degree):
+    """Keep the bands up to sh_degree of channel-major (N, 3 * coefficients) f_rest."""
+    per_channel = f_rest.shape[1] // 3
+    keep = (sh_degree + 1) ** 2 - 1
+    assert keep <= per_channel, f"SH degree {sh_degree} exceeds the stored bands"
+    return f_rest.reshape(len(f_rest), 3, per_channel)[:, :, :keep].reshape(
+        len(f_rest), 3 * keep
+    )
+
+
+def pad_sh(f_rest, sh_degree):
+    """Zero-pad channel-major f_rest to the coefficients of sh_degree."""
+    per_channel = f_rest.shape[1] // 3
+    target = (sh_degree + 1) ** 2 - 1
+    padded = np.zeros((len(f_rest), 3, target), dtype=np.float32)
+    padded[:, :, :per_channel] = f_rest.reshape(len(f_rest), 3, per_channel)
+    return padded.reshape(len(f_rest), 3 * target)
+
+
+def encode_splats(attributes: SplatAttributes, sh_degree=None):
+    """
+    Quantize Gaussians into the compressed layout.
+
+    Returns (order, chunks, vertices, sh): the Morton permutation that was applied,
+    (n_chunks, 18) float32 bounds in `CHUNK_PROPERTIES` order, (N, 4) uint32 packed
+    attributes in `VERTEX_PROPERTIES` order and (N, n_rest) uint8 SH coefficients.
+    """
+    order = np.argsort(morton_codes(attributes.xyz), kind="stable")
+    xyz, f_dc, f_rest, opacity, scale, rotation = (a[order] for a in attributes)
+    if sh_degree is not None:
+        f_rest = truncate_sh(f_rest, sh_degree)
+
+    n = len(xyz)
+    n_chunks = (n + CHUNK_SIZE - 1) // CHUNK_SIZE
+    chunk_ids = np.arange(n) // CHUNK_SIZE
+    scale = np.clip(scale, -20.0, 20.0)
+    color = 0.5 + C0 * f_dc
+
+    chunks, packed = [], {}
+    for key, values in [("position", xyz), ("scale", scale), ("color", color)]:
+        lo, hi = _chunk_bounds(values, n_chunks)
+        chunks += [lo, hi]
+        packed[key] = _normalize(values, lo, hi, chunk_ids)
+
+    alpha = 1.0 / (1.0 + np.exp(-opacity[:, 0]))
+    packed_color = (
+        (_pack_unorm(packed["color"][:, 0], 8) << 24)
+        | (_pack_unorm(packed["color"][:, 1], 8) << 16)
+        | (_pack_unorm(packed["color"][:, 2], 8) << 8)
+        | _pack_unorm(alpha, 8)
+    )
+    vertices = np.stack(
+        [
+            _pack_11_10_11(packed["position"]),
+            _pack_rotation(rotation),
+            _pack_11_10_11(packed["scale"]),
+            packed_color,
+        ],
+        axis=1,
+    )
+    sh = _pack_unorm(f_rest / SH_RANGE + 0.5, 8).astype(np.uint8)
+    return order, np.concatenate(chunks, axis=1).astype(np.float32), vertices, sh
+
+
+def decode_splats(chunks, vertices, sh, sh_degree=None) -> SplatAttributes:
+    """
+    Invert `encode_splats`. SH bands are zero-padded up to `sh_degree` when given, so
+    the result can be loaded into a GaussianModel with a higher `max_sh_degree`.
+    """
+    chunk_ids = np.arange(len(vertices)) // CHUNK_SIZE
+
+    def dequantize(unorm, group):
+        lo = chunks[chunk_ids, 6 * group : 6 * group + 3]
+        hi = chunks[chunk_ids, 6 * group + 3 : 6 * group + 6]
+        return (lo + unorm * (hi - lo)).astype(np.float32)
+
+    packed_position, packed_rotation, packed_scale, packed_color = vertices.T
+    xyz = dequantize(_unpack_11_10_11(packed_position), 0)
+    scale = dequantize(_unpack_11_10_11(packed_scale), 1)
+    rotation = _unpack_rotation(packed_rotation)
+
+    color = dequantize(
+        np.stack(
+            [_unpack_unorm((packed_color >> s) & 0xFF, 8) for s in (24, 16, 8)], axis=1
+        ),
+        2,
+    )
+    f_dc = ((color - 0.5) / C0).astype(np.float32)
+    alpha = np.clip(_unpack_unorm(packed_color & 0xFF, 8), 0.5 / 255, 1 - 0.5 / 255)
+    opacity = np.log(alpha / (1.0 - alpha))[:, None].astype(np.float32)
+
+    f_rest = ((_unpack_unorm(sh, 8) - 0.5) * SH_RANGE).astype(np.float32)
+    if sh_degree is not None:
+        f_rest = pad_sh(f_rest, sh_degree)
+
+    return SplatAttributes(
+        xyz=xyz,
+        f_dc=f_dc,
+        f_rest=f_rest,
+        opacity=opacity,
+        scale=scale,
+        rotation=rotation,
+    )
+
+
+def save_compressed_ply(path, attributes: SplatAttributes, sh_degree=None):
+    """
+    Write Gaussians as a quantized, chunked PLY, dropping SH bands above `sh_degree`.
+
+    Positions and log-scales are quantized to 11/10/11 bits relative to their chunk
+    bounds, rotations to 2+3x10 bits, base color and opacity to 8 bits each, and the
+    remaining SH coefficients to 8 bits in [-4, 4].
+    """
+    _, chunks, vertices, sh = encode_splats(attributes, sh_degree)
+    elements = [
+        ("chunk", [(CHUNK_PROPERTIES, chunks, "f4")]),
+        ("vertex", [(VERTEX_PROPERTIES, vertices, "u4")]),
+    ]
+    if sh.shape[1] > 0:
+        names = [f"f_rest_{i}" for i in range(sh.shape[1])]
+        elements.append(("sh", [(names, sh, "u1")]))
+    write_ply_elements(path, elements)
+
+
+def load_compressed_ply(path, sh_degree=None) -> SplatAttributes:
+    """Decode a file written by `save_compressed_ply` back into float32 attributes."""
+    plydata = PlyData.read(path)
+    vertices = plydata["vertex"].data
+    if "sh" in plydata:
+        sh = plydata["sh"].data
+        names = sorted(sh.dtype.names, key=lambda x: int(x.split("_")[-1]))
+        sh = vertex_columns(sh, names, np.uint8)
+    else:
+        sh = np.zeros((len(vertices), 0), dtype=np.uint8)
+    return decode_splats(
+        vertex_columns(plydata["chunk"].data, CHUNK_PROPERTIES),
+        vertex_columns(vertices, VERTEX_PROPERTIES, np.uint32),
+        sh,
+        sh_degree=sh_degree,
+    )
+
+
+def compression_report(original: SplatAttributes, decoded: SplatAttributes):
+    """
+    Attribute-level fidelity of a decoded model against the original.
+
+    Gaussians are matched by Morton order, which is the order `save_compressed_ply`
+    writes them in.
+    """
+    order = np.argsort(morton_codes(original.xyz), kind="stable")
+    original = SplatAttributes(*(a[order] for a in original))
+    extent = float(np.linalg.norm(original.xyz.max(0) - original.xyz.min(0)))
+
+    q0 = original.rotation / np.linalg.norm(original.rotation, axis=1, keepdims=True)
+    q1 = decoded.rotation / np.linalg.norm(decoded.rotation, axis=1, keepdims=True)
+    cos_half = np.clip(np.abs((q0 * q1).sum(axis=1)), 0.0, 1.0)
+
+    sh_degree = round(np.sqrt(original.f_rest.shape[1] // 3 + 1)) - 1
+    sh_error = pad_sh(decoded.f_rest, sh_degree) - original.f_rest
+
+    sigmoid = lambda x: 1.0 / (1.0 + np.exp(-x))  # noqa: E731
+    return {
+        "position_rmse_rel": float(
+            np.sqrt(np.square(decoded.xyz - original.xyz).sum(1).mean()) / extent
+        ),
+        "log_scale_mae": float(np.abs(decoded.scale - original.scale).mean()),
+        "rotation_mean_deg": float(np.degrees(2 * np.arccos(cos_half)).mean()),
+        "opacity_mae": float(
+            np.abs(sigmoid(decoded.opacity) - sigmoid(original.opacity)).mean()
+        ),
+        "color_rmse": float(
+            np.sqrt(np.square(C0 * (decoded.f_dc - original.f_dc)).mean())
+        ),
+        "sh_rmse": float(np.sqrt(np.square(sh_error).mean())) if sh_error.size else 0.0,
+    }
@@ -0,0 +1,139 @@
+import json
+import struct
+
+import numpy as np
+
+from instant_splat.utils.graphics_utils import SplatAttributes
+from instant_splat.utils.splat_compression import (
+    CHUNK_SIZE,
+    CHUNK_PROPERTIES,
+    encode_splats,
+    decode_splats,
+)
+
+# Streamable layout: an 8-byte magic, a little-endian uint32 header length and a JSON
+# header indexing the chunks, followed by the chunk bodies. Gaussians are sorted by
+# decreasing importance and every chunk is an independently decodable block of the
+# `splat_compression` encoding (bounds, packed attributes, uint8 SH), so any prefix of
+# the file that covers the header yields a valid, coarser model.
+MAGIC = b"ISPLSTRM"
+VERSION = 1
+_PREAMBLE = struct.Struct("<8sI")
+
+
+def importance(attributes: SplatAttributes):
+    """Opacity times ellipsoid volume, a view-independent proxy for screen coverage."""
+    alpha = 1.0 / (1.0 + np.exp(-attributes.opacity[:, 0].astype(np.float64)))
+    return alpha * np.exp(attributes.scale.astype(np.float64).sum(axis=1))
+
+
+def chunk_counts(n, first_chunk=4096, growth=2.0, max_chunk=262144):
+    """Geometrically growing chunk sizes, rounded to the quantization block size."""
+    counts, size = [], max(first_chunk, CHUNK_SIZE)
+    while n > 0:
+        size = min(int(np.ceil(size / CHUNK_SIZE)) * CHUNK_SIZE, max_chunk)
+        counts.append(min(size, n))
+        n -= counts[-1]
+        size *= growth
+    return counts
+
+
+def _pad4(nbytes):
+    return (4 - nbytes % 4) % 4
+
+
+def save_streamable_splat(
+    path, attributes: SplatAttributes, sh_degree=None, first_chunk=4096, growth=2.0
+):
+    """
+    Write Gaussians ordered by `importance` as self-contained quantized chunks.
+
+    The first chunk holds the `first_chunk` most important Gaussians and each following
+    chunk is `growth` times larger, so a client gets a coarse preview from the first few
+    percent of the bytes and refines as the rest arrives.
+    """
+    order = np.argsort(-importance(attributes), kind="stable")
+    attributes = SplatAttributes(*(a[order] for a in attributes))
+
+    bodies, index, start = [], [], 0
+    for count in chunk_counts(len(order), first_chunk, growth):
+        chunk = SplatAttributes(*(a[start : start + count] for a in attributes))
+        _, bounds, vertices, sh = encode_splats(chunk, sh_degree)
+        body = bounds.tobytes() + vertices.astype("<u4").tobytes() + sh.tobytes()
+        bodies.append(body + b"\0" * _pad4(len(body)))
+        index.append({"count": count, "nbytes": len(bodies[-1])})
+        start += count
+    n_rest = sh.shape[1] if bodies else 0
+
+    header = {
+        "version": VERSION,
+        "count": int(len(order)),
+        "sh_coefficients": int(n_rest),
+        "chunk_size": CHUNK_SIZE,
+        "chunks": index,
+    }
+    # Offsets depend on the header length, which depends on the offsets; repeat until
+    # the encoded header stops changing
+    blob = None
+    while True:
+        encoded = json.dumps(header).encode("utf-8")
+        encoded += b" " * _pad4(_PREAMBLE.size + len(encoded))
+        if encoded == blob:
+            break
+        blob = encoded
+        offset = _PREAMBLE.size + len(blob)
+        for entry in index:
+            entry["offset"] = offset
+            offset += entry["nbytes"]
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, len(blob)))
+        f.write(blob)
+        for body in bodies:
+            f.write(body)
+
+
+def read_streamable_header(data):
+    """Parse the header from the leading bytes of a streamable file."""
+    magic, length = _PREAMBLE.unpack_from(data)
+    assert magic == MAGIC, "not a streamable splat file"
+    assert len(data) >= _PREAMBLE.size + length, "prefix does not cover the header"
+    header = json.loads(bytes(data[_PREAMBLE.size : _PREAMBLE.size + length]))
+    assert header["version"] == VERSION, f"unsupported version {header['version']}"
+    return header
+
+
+def decode_streamable_prefix(data, sh_degree=None) -> SplatAttributes:
+    """
+    Decode every chunk fully contained in `data`, the leading bytes of a streamable
+    file, into float32 attributes. Trailing partial chunks are ignored.
+    """
+    header = read_streamable_header(data)
+    n_rest = header["sh_coefficients"]
+    decoded = []
+    for entry in header["chunks"]:
+        if entry["offset"] + entry["nbytes"] > len(data):
+            break
+        count, offset = entry["count"], entry["offset"]
+        n_blocks = (count + CHUNK_SIZE - 1) // CHUNK_SIZE
+        bounds = np.frombuffer(
+            data, "<f4", n_blocks * len(CHUNK_PROPERTIES), offset
+        ).reshape(n_blocks, -1)
+        offset += bounds.nbytes
+        vertices = np.frombuffer(data, "<u4", count * 4, offset).reshape(count, 4)
+        offset += vertices.nbytes
+        sh = np.frombuffer(data, np.uint8, count * n_rest, offset).reshape(count, -1)
+        decoded.append(decode_splats(bounds, vertices, sh, sh_degree=sh_degree))
+
+    if not decoded:
+        n_sh = n_rest if sh_degree is None else 3 * (sh_degree + 1) ** 2 - 3
+        widths = [3, 3, n_sh, 1, 3, 4]
+        return SplatAttributes(*(np.zeros((0, w), dtype=np.float32) for w in widths))
+    return SplatAttributes(*(np.concatenate(parts) for parts in zip(*decoded)))
+
+
+def load_streamable_splat(path, max_bytes=None, sh_degree=None) -> SplatAttributes:
+    """Read the first `max_bytes` of a streamable file (all of it by default)."""
+    with open(path, "rb") as f:
+        data = f.read() if max_bytes is None else f.read(max_bytes)
+    return decode_streamable_prefix(data, sh_degree=sh_degree)
@@ -95,6 +95,7 @@ def generate():
         fps = request_data.get('fps', 1)  # Default 1 fps
         conf_thresh = request_data.get('conf_thresh', 1e-3)  # Default confidence threshold
         iterations = request_data.get('iterations', 200)  # Default training iterations
+        save_compressed = request_data.get('save_compressed', False)  # Also write a quantized PLY
         
         task_id = str(uuid.uuid4())
         logger.debug(f"Creating task: {task_id}")
@@ -105,7 +106,7 @@ def generate():
             'created_at': time.time()
         }
 
-        def process_video_task(task_id, video_url, model, kf_every, fps, conf_thresh, iterations):
+        def process_video_task(task_id, video_url, model, kf_every, fps, conf_thresh, iterations, save_compressed):
             try:
                 video_name = Path(urlparse(video_url).path).stem
                 timestamp = int(time.time())
@@ -124,7 +125,7 @@ def generate():
                     logger.info("Model: InstantSplat")
                     n_frames = extract_frames(video_path, input_folder, f'{input_folder}/images', fps)
                     run_camera_inference(input_folder, n_frames)
-                    run_training(input_folder, output_folder, n_frames, iterations)
+                    run_training(input_folder, output_folder, n_frames, iterations, save_compressed)
                     ply_url = get_ply_url(video_name, timestamp, iterations)
                 
                 elif model == 'spann3r':
@@ -148,7 +149,7 @@ def generate():
                 tasks[task_id]['status'] = 'failed'
                 tasks[task_id]['result'] = str(e)
 
-        executor.submit(process_video_task, task_id, video_url, model, kf_every, fps, conf_thresh, iterations)
+        executor.submit(process_video_task, task_id, video_url, model, kf_every, fps, conf_thresh, iterations, save_compressed)
         return jsonify({'task_id': task_id})
 
     except Exception as e:
@@ -189,9 +190,11 @@ def run_camera_inference(img_path, n_views):
         logger.error(f"Error in run_camera_inference: {e.output}")
         raise
 
-def run_training(scene_path, output_path, n_views, iterations):
+def run_training(scene_path, output_path, n_views, iterations, save_compressed=False):
     try:
         cmd = f'pixi run python tools/train_joint.py -s {scene_path} -m {output_path} --n_views {n_views} --scene {Path(scene_path).name} --iter {iterations} --optim_pose'
+        if save_compressed:
+            cmd += ' --save_compressed'
         logger.debug(f"Running command: {cmd}")
         result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
         logger.debug(f"Training output: {result.stdout}")
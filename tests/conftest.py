@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+from instant_splat.scene.cameras import Camera
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.graphics_utils import BasicPointCloud, SplatAttributes
+
+
+def make_pipe(**overrides):
+    return SimpleNamespace(
+        **dict(
+            convert_SHs_python=False,
+            compute_cov3D_python=False,
+            frustum_culling=False,
+            debug=False,
+        )
+        | overrides
+    )
+
+
+def make_training_args(**overrides):
+    return SimpleNamespace(
+        **dict(
+            percent_dense=0.01,
+            position_lr_init=1e-3,
+            position_lr_final=1e-5,
+            position_lr_delay_mult=0.01,
+            position_lr_max_steps=1000,
+            feature_lr=2.5e-3,
+            opacity_lr=0.05,
+            scaling_lr=5e-3,
+            rotation_lr=1e-3,
+        )
+        | overrides
+    )
+
+
+@pytest.fixture
+def attributes():
+    """1000 random sh_degree=3 Gaussians, not a whole number of chunks."""
+    rng = np.random.default_rng(0)
+    n = 1000
+    rotation = rng.standard_normal((n, 4))
+    return SplatAttributes(
+        *(
+            a.astype(np.float32)
+            for a in (
+                rng.random((n, 3)) * [4, 2, 1],
+                rng.uniform(-1, 1, (n, 3)),
+                rng.uniform(-3, 3, (n, 45)),
+                rng.uniform(-4, 4, (n, 1)),
+                rng.uniform(-6, -1, (n, 3)),
+                rotation / np.linalg.norm(rotation, axis=1, keepdims=True),
+            )
+        )
+    )
+
+
+@pytest.fixture
+def camera():
+    """A 80x60 view down +z from z = -1, in front of `gaussians`."""
+    return Camera(
+        0,
+        np.eye(3),
+        np.array([0.0, 0.0, -1.0]),
+        0.9,
+        0.7,
+        torch.rand(3, 60, 80, generator=torch.Generator().manual_seed(0)),
+        None,
+        "test",
+        0,
+        device="cpu",
+    )
+
+
+@pytest.fixture
+def gaussians(camera):
+    """2000 small sh_degree=3 Gaussians with view-dependent colour, on the CPU."""
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    n = 2000
+    pcd = BasicPointCloud(
+        points=(rng.random((n, 3)) * 4 - [2, 2, -1]).astype(np.float32),
+        colors=rng.random((n, 3)).astype(np.float32),
+        normals=np.zeros((n, 3), dtype=np.float32),
+    )
+    model = GaussianModel(3, device="cpu")
+    model.create_from_pcd(pcd, 1.0)
+    model.active_sh_degree = 3
+    with torch.no_grad():
+        scale = torch.from_numpy(
+            rng.choice([0.0, 1e-3, 0.1], size=(n, 1, 1)).astype(np.float32)
+        )
+        model._features_rest.copy_(torch.randn(n, 15, 3) * scale)
+        model._scaling -= 1.5
+    model.init_RT_seq({1.0: [camera]})
+    return model
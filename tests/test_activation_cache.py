@@ -0,0 +1,50 @@
+import torch
+
+from instant_splat.scene.activation_cache import ActivationCache
+
+
+class CountingActivation:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, x):
+        self.calls += 1
+        return torch.sigmoid(x)
+
+
+def test_reused_until_the_source_changes():
+    cache, activation = ActivationCache(), CountingActivation()
+    param = torch.nn.Parameter(torch.zeros(4))
+    value = cache.get("opacity", activation, param)
+    assert cache.get("opacity", activation, param) is value
+    assert activation.calls == 1
+
+    with torch.no_grad():
+        param.add_(1)
+    updated = cache.get("opacity", activation, param)
+    assert activation.calls == 2
+    torch.testing.assert_close(updated, torch.sigmoid(torch.ones(4)))
+
+    replacement = torch.nn.Parameter(torch.zeros(4))
+    cache.get("opacity", activation, replacement)
+    assert activation.calls == 3
+
+
+def test_no_grad_values_are_not_handed_out_with_grad():
+    cache, activation = ActivationCache(), CountingActivation()
+    param = torch.nn.Parameter(torch.zeros(4))
+    with torch.no_grad():
+        assert not cache.get("opacity", activation, param).requires_grad
+    value = cache.get("opacity", activation, param)
+    assert value.requires_grad and activation.calls == 2
+    with torch.no_grad():
+        assert cache.get("opacity", activation, param) is value
+
+
+def test_model_activations_follow_in_place_updates(gaussians):
+    opacity = gaussians.get_opacity
+    assert gaussians.get_opacity is opacity
+    with torch.no_grad():
+        gaussians._opacity.add_(1)
+    torch.testing.assert_close(gaussians.get_opacity, torch.sigmoid(gaussians._opacity))
+    assert gaussians.get_opacity is not opacity
@@ -0,0 +1,38 @@
+import os
+
+import torch
+
+from instant_splat.gaussian_renderer import render
+from instant_splat.scene.gaussian_model import GaussianModel
+
+from conftest import make_pipe
+
+
+def test_pruned_render_stays_within_budget(gaussians, camera):
+    pipe = make_pipe()
+    pose = gaussians.get_RT(camera.uid).detach()
+    features_rest = gaussians._features_rest.detach().clone()
+    with torch.no_grad():
+        dense = render(camera, gaussians, pipe, torch.zeros(3), camera_pose=pose)
+        adaptive = gaussians.prune_sh_degrees(2 / 255)
+        pruned = render(camera, gaussians, pipe, torch.zeros(3), camera_pose=pose)
+
+    # The fixture's Gaussians without view-dependent colour drop to degree 0
+    flat = (features_rest == 0).all(dim=2).all(dim=1)
+    assert (adaptive.degrees[flat] == 0).all()
+    assert adaptive.degree_counts()[3] < len(gaussians.get_xyz)
+    assert (pruned["render"] - dense["render"]).abs().mean() < 2 / 255
+
+
+def test_save_and_load_adaptive_model(gaussians, tmp_path):
+    adaptive = gaussians.prune_sh_degrees(2 / 255)
+    path = os.path.join(tmp_path, "point_cloud.ply")
+    gaussians.save_ply(path)
+
+    loaded = GaussianModel(3, device="cpu")
+    loaded.load_ply(path)
+    order = gaussians.get_spatial_index.order
+    assert torch.equal(loaded.adaptive_sh.degrees, adaptive.degrees[order])
+    torch.testing.assert_close(
+        loaded.adaptive_sh.to_dense(3), adaptive.to_dense(3)[order]
+    )
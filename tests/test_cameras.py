@@ -0,0 +1,45 @@
+import numpy as np
+import torch
+
+from instant_splat.scene.cameras import Camera
+from instant_splat.scene.view_loader import TrainViewLoader
+
+
+def make_camera(image, mask, image_dtype):
+    return Camera(
+        0,
+        np.eye(3),
+        np.zeros(3),
+        0.9,
+        0.7,
+        image,
+        mask,
+        "view",
+        0,
+        device="cpu",
+        image_dtype=image_dtype,
+    )
+
+
+def test_uint8_images_match_float_images():
+    generator = torch.Generator().manual_seed(0)
+    # 8-bit data, as loaded from PIL
+    image = torch.randint(0, 256, (3, 60, 80), generator=generator) / 255.0
+    mask = torch.randint(0, 256, (1, 60, 80), generator=generator) / 255.0
+    reference = make_camera(image, mask, torch.float32)
+    camera = make_camera(image, mask, torch.uint8)
+
+    assert camera.original_image.dtype == torch.uint8
+    assert camera.gt_alpha_mask.dtype == torch.uint8
+    gt = camera.get_gt_image()
+    assert gt.dtype == torch.float32
+    torch.testing.assert_close(gt, reference.get_gt_image(), rtol=0, atol=1 / 255)
+    torch.testing.assert_close(gt, image * mask, rtol=0, atol=1 / 255)
+
+
+def test_loader_returns_float_images():
+    image = torch.randint(0, 256, (3, 6, 8)) / 255.0
+    camera = make_camera(image, None, torch.uint8)
+    _, gt = next(TrainViewLoader([camera], "cpu"))
+    assert gt.dtype == torch.float32
+    torch.testing.assert_close(gt, image)
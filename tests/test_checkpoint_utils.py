@@ -0,0 +1,78 @@
+import torch
+
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.checkpoint_utils import (
+    CheckpointWriter,
+    load_checkpoint,
+    save_checkpoint,
+)
+
+from conftest import make_training_args
+
+
+def assert_same(loaded, original):
+    assert type(loaded) is type(original)
+    if isinstance(original, torch.Tensor):
+        assert loaded.dtype == original.dtype
+        assert loaded.requires_grad == original.requires_grad
+        assert torch.equal(loaded.detach(), original.detach())
+    elif isinstance(original, (tuple, list)):
+        assert len(loaded) == len(original)
+        for a, b in zip(loaded, original):
+            assert_same(a, b)
+    elif isinstance(original, dict):
+        assert list(loaded) == list(original)
+        for key in original:
+            assert_same(loaded[key], original[key])
+    else:
+        assert loaded == original
+
+
+def test_nested_state_round_trip(tmp_path):
+    base = torch.arange(24, dtype=torch.float32).reshape(4, 6)
+    state = (
+        3,
+        torch.nn.Parameter(torch.randn(5, 3)),
+        {0: {"step": torch.tensor(7.0), "exp_avg": base[:, 1:4]}, "lr": 1e-3},
+        [torch.zeros(0, 3), torch.ones(3, dtype=torch.bool), None, "name"],
+        torch.randn(7, dtype=torch.float16),
+        torch.arange(5),
+    )
+    path = str(tmp_path / "chkpnt.ckpt")
+    save_checkpoint(path, state)
+    assert_same(load_checkpoint(path), state)
+    save_checkpoint(path, state[:1])
+    assert_same(load_checkpoint(path), state[:1])
+
+
+def test_writer_snapshots_before_returning(tmp_path):
+    tensor = torch.randn(1000, 59)
+    expected = tensor.clone()
+    writer = CheckpointWriter()
+    path = str(tmp_path / "chkpnt.ckpt")
+    writer.save(path, (tensor, 10))
+    tensor.zero_()
+    writer.wait()
+    loaded, iteration = load_checkpoint(path)
+    assert iteration == 10 and torch.equal(loaded, expected)
+
+
+def test_model_checkpoint_round_trip(gaussians, tmp_path):
+    gaussians.training_setup(make_training_args())
+    gaussians.get_xyz.sum().backward()
+    gaussians.optimizer.step()
+    path = str(tmp_path / "chkpnt.ckpt")
+    writer = CheckpointWriter()
+    writer.save(path, (gaussians.capture(), 1))
+    writer.wait()
+
+    model_params, iteration = load_checkpoint(path)
+    restored = GaussianModel(3, device="cpu")
+    restored.restore(model_params, make_training_args())
+    assert iteration == 1
+    for name in ("_xyz", "_features_rest", "_opacity", "_rotation"):
+        assert torch.equal(getattr(restored, name), getattr(gaussians, name))
+    moments = restored.optimizer.state[restored._xyz]
+    expected = gaussians.optimizer.state[gaussians._xyz]
+    assert torch.equal(moments["exp_avg"], expected["exp_avg"])
+    assert moments["step"] == expected["step"]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("mini_dust3r")
+
+from instant_splat.utils.chunked_alignment import (
+    Sim3,
+    WindowAlignment,
+    compose_sim3,
+    estimate_overlap_sim3,
+    invert_sim3,
+    solve_sim3_pose_graph,
+    split_windows,
+)
+
+
+def random_sim3(rng):
+    R, _ = np.linalg.qr(rng.standard_normal((3, 3)))
+    R *= np.linalg.det(R)
+    return Sim3(s=float(rng.uniform(0.5, 2.0)), R=R, T=rng.standard_normal(3))
+
+
+def apply(sim3, x):
+    return sim3.s * x @ sim3.R.T + sim3.T
+
+
+def make_window(frame_ids, pointmaps, world_to_window):
+    """A window whose pointmaps are `pointmaps` seen in its own frame."""
+    pts3d = [apply(world_to_window, pointmaps[i]) for i in frame_ids]
+    return WindowAlignment(
+        frame_ids=list(frame_ids),
+        imgs=[],
+        focals=np.ones(len(pts3d)),
+        poses=np.tile(np.eye(4), (len(pts3d), 1, 1)),
+        pts3d=pts3d,
+        confs=[np.ones(p.shape[:2]) for p in pts3d],
+        confidence_masks=[np.ones(p.shape[:2], dtype=bool) for p in pts3d],
+        intrinsics=np.tile(np.eye(3), (len(pts3d), 1, 1)),
+    )
+
+
+def test_split_windows_cover_every_frame():
+    assert split_windows(5, 8, 3) == [(0, 5)]
+    windows = split_windows(23, 8, 3)
+    assert windows[0][0] == 0 and windows[-1][1] == 23
+    assert all(end - start == 8 for start, end in windows)
+    for (_, end), (start, _) in zip(windows, windows[1:]):
+        assert end - start >= 3
+
+
+def test_sim3_compose_and_invert():
+    rng = np.random.default_rng(0)
+    a, b = random_sim3(rng), random_sim3(rng)
+    x = rng.standard_normal((5, 3))
+    np.testing.assert_allclose(apply(compose_sim3(a, b), x), apply(a, apply(b, x)))
+    np.testing.assert_allclose(apply(invert_sim3(a), apply(a, x)), x, atol=1e-12)
+
+
+def test_pose_graph_maps_every_window_onto_the_first():
+    rng = np.random.default_rng(0)
+    pointmaps = rng.standard_normal((10, 4, 5, 3))
+    truth = [Sim3(s=1.0, R=np.eye(3), T=np.zeros(3))]
+    truth += [random_sim3(rng) for _ in range(2)]
+    # The last window also overlaps the first, closing a loop
+    frames = [range(0, 6), range(3, 9), range(5, 10)]
+    windows = [make_window(f, pointmaps, sim3) for f, sim3 in zip(frames, truth)]
+
+    edges = []
+    for src, dst in [(1, 0), (2, 1), (2, 0)]:
+        sim3, correspondences = estimate_overlap_sim3(windows[src], windows[dst])
+        edges.append((src, dst, sim3, correspondences))
+    solved = solve_sim3_pose_graph(len(windows), edges)
+
+    for window, sim3 in zip(windows, solved):
+        for frame_id, pts3d in zip(window.frame_ids, window.pts3d):
+            np.testing.assert_allclose(
+                apply(sim3, pts3d), pointmaps[frame_id], atol=1e-6
+            )
@@ -0,0 +1,53 @@
+import math
+
+import pytest
+import torch
+
+from instant_splat.gaussian_renderer import render
+from instant_splat.utils.pose_utils import get_tensor_from_camera
+
+from conftest import make_pipe
+
+
+def rotation_y(degrees):
+    angle = math.radians(degrees)
+    c, s = math.cos(angle), math.sin(angle)
+    return torch.tensor([[c, 0.0, s], [0.0, 1.0, 0.0], [-s, 0.0, c]])
+
+
+@pytest.mark.parametrize(
+    "degrees, translation",
+    [
+        (0.0, [0.0, 0.0, 1.0]),
+        # Inside the cloud: Gaussians behind the camera and across the near plane
+        (0.0, [0.0, 0.0, -2.0]),
+        # Most of the cloud off the side of the image
+        (40.0, [0.5, 0.3, 0.5]),
+    ],
+)
+def test_culling_keeps_every_drawn_gaussian(gaussians, camera, degrees, translation):
+    w2c = torch.eye(4)
+    w2c[:3, :3] = rotation_y(degrees)
+    w2c[:3, 3] = torch.tensor(translation)
+    pose = get_tensor_from_camera(w2c)
+    with torch.no_grad():
+        # Large, nearly transparent Gaussians, whose footprint reaches far beyond
+        # their center but which the rasterizer still gives a radius
+        gaussians._scaling[::7] += 2.0
+        gaussians._opacity[::5] = -10.0
+
+    background = torch.zeros(3)
+    with torch.no_grad():
+        full = render(camera, gaussians, make_pipe(), background, camera_pose=pose)
+        culled = render(
+            camera,
+            gaussians,
+            make_pipe(frustum_culling=True),
+            background,
+            camera_pose=pose,
+        )
+    drawn = full["visibility_filter"]
+    assert 0 < drawn.sum() < len(drawn)
+    assert torch.equal(culled["visibility_filter"], drawn)
+    assert torch.equal(culled["radii"], full["radii"])
+    torch.testing.assert_close(culled["render"], full["render"])
@@ -0,0 +1,70 @@
+import torch
+
+from instant_splat.gaussian_renderer import render, render_lod
+from instant_splat.scene.gaussian_lod import GaussianLOD
+
+from conftest import make_pipe
+
+
+def test_zero_pixel_error_draws_the_leaves(gaussians, camera):
+    pipe = make_pipe()
+    background = torch.zeros(3)
+    pose = gaussians.get_RT(0)
+
+    lod = GaussianLOD.build(gaussians)
+    assert lod.level_sizes()[-1] == len(gaussians.get_xyz)
+    cut = lod.cut_for_view(camera, torch.eye(4), pixel_error=0.0)
+    assert len(cut.get_xyz) == len(gaussians.get_xyz)
+
+    with torch.no_grad():
+        reference = render(camera, gaussians, pipe, background, camera_pose=pose)
+        leaves = render_lod(
+            camera, lod, pipe, background, camera_pose=pose, pixel_error=0.0
+        )
+        coarse = render_lod(
+            camera, lod, pipe, background, camera_pose=pose, pixel_error=8.0
+        )
+    torch.testing.assert_close(leaves["render"], reference["render"])
+    assert coarse["render"].isfinite().all()
+    assert len(lod.cut_for_view(camera, torch.eye(4), 8.0).get_xyz) < len(cut.get_xyz)
+
+
+def test_save_and_load(gaussians, camera, tmp_path):
+    lod = GaussianLOD.build(gaussians)
+    path = tmp_path / "lod.pt"
+    lod.save(path)
+    loaded = GaussianLOD.load(path, device="cpu")
+    assert loaded.level_sizes() == lod.level_sizes()
+    for pixel_error in (0.0, 4.0):
+        ours = loaded.cut_for_view(camera, torch.eye(4), pixel_error)
+        theirs = lod.cut_for_view(camera, torch.eye(4), pixel_error)
+        torch.testing.assert_close(ours.get_xyz, theirs.get_xyz)
+        torch.testing.assert_close(ours.get_features, theirs.get_features)
+
+
+def test_lod_of_sh_pruned_model(gaussians, camera):
+    pipe = make_pipe()
+    background = torch.zeros(3)
+    pose = gaussians.get_RT(0)
+    adaptive = gaussians.prune_sh_degrees(2 / 255)
+    assert adaptive.degree_counts()[3] < len(gaussians.get_xyz)
+
+    lod = GaussianLOD.build(gaussians)
+    cut = lod.cut_for_view(camera, torch.eye(4), pixel_error=0.0)
+    # A zero pixel error draws the leaves: the pruned model itself
+    assert cut.adaptive_sh is not None
+    assert torch.equal(cut.adaptive_sh.degrees, adaptive.degrees)
+    torch.testing.assert_close(
+        cut.adaptive_sh.to_dense(3), adaptive.to_dense(3), rtol=0, atol=0
+    )
+
+    with torch.no_grad():
+        reference = render(camera, gaussians, pipe, background, camera_pose=pose)
+        leaves = render_lod(
+            camera, lod, pipe, background, camera_pose=pose, pixel_error=0.0
+        )
+        coarse = render_lod(
+            camera, lod, pipe, background, camera_pose=pose, pixel_error=8.0
+        )
+    torch.testing.assert_close(leaves["render"], reference["render"])
+    assert coarse["render"].isfinite().all()
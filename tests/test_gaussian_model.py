@@ -0,0 +1,103 @@
+import os
+
+import pytest
+import torch
+
+from instant_splat.gaussian_renderer import render
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.loss_utils import l1_loss
+
+from conftest import make_pipe, make_training_args
+
+ATTRIBUTES = (
+    "_xyz",
+    "_features_dc",
+    "_features_rest",
+    "_opacity",
+    "_scaling",
+    "_rotation",
+)
+
+
+def test_save_and_load_empty_model(gaussians, tmp_path):
+    for name in ATTRIBUTES:
+        empty = getattr(gaussians, name)[:0].detach().clone()
+        setattr(gaussians, name, torch.nn.Parameter(empty))
+    path = os.path.join(tmp_path, "point_cloud.ply")
+    gaussians.save_ply(path)
+
+    loaded = GaussianModel(3, device="cpu")
+    loaded.load_ply(path)
+    assert loaded.get_xyz.shape == (0, 3)
+
+
+def test_training_step_on_cpu(gaussians, camera):
+    """One iteration of the training loop, without CUDA."""
+    gaussians.training_setup(make_training_args())
+    gaussians.update_learning_rate(1)
+    before = gaussians.get_xyz.detach().clone()
+
+    pose = gaussians.get_RT(camera.uid)
+    render_pkg = render(
+        camera, gaussians, make_pipe(), torch.zeros(3), camera_pose=pose
+    )
+    loss = l1_loss(render_pkg["render"], camera.original_image)
+    loss.backward()
+    gaussians.add_densification_stats(
+        render_pkg["viewspace_points"], render_pkg["visibility_filter"]
+    )
+    gaussians.optimizer.step()
+    gaussians.optimizer.zero_grad(set_to_none=True)
+
+    assert render_pkg["visibility_filter"].any()
+    assert gaussians.get_xyz.isfinite().all()
+    assert not torch.equal(gaussians.get_xyz, before)
+
+
+@pytest.mark.parametrize("dtype, min_psnr", [(torch.float16, 70), (torch.bfloat16, 55)])
+def test_low_precision_load(gaussians, camera, tmp_path, dtype, min_psnr):
+    path = os.path.join(tmp_path, "point_cloud.ply")
+    gaussians.save_ply(path)
+    pose = gaussians.get_RT(camera.uid).detach()
+    models = {}
+    for inference_dtype in (None, dtype):
+        models[inference_dtype] = GaussianModel(
+            3, device="cpu", inference_dtype=inference_dtype
+        )
+        models[inference_dtype].load_ply(path)
+        models[inference_dtype].active_sh_degree = 3
+
+    low = models[dtype]
+    assert low.get_xyz.dtype == torch.float32
+    assert low._features_rest.dtype == dtype and not low._opacity.requires_grad
+    with torch.no_grad():
+        images = [
+            render(
+                camera,
+                model,
+                make_pipe(frustum_culling=True),
+                torch.zeros(3),
+                camera_pose=pose,
+            )["render"]
+            for model in models.values()
+        ]
+    assert images[1].dtype == torch.float32
+    mse = (images[1] - images[0]).square().mean()
+    assert 10 * torch.log10(1 / mse) > min_psnr
+
+
+def test_snapshot_renders_like_the_model(gaussians, camera):
+    gaussians.active_sh_degree = 1
+    snapshot = gaussians.snapshot()
+    assert snapshot._features_rest.shape == (len(gaussians.get_xyz), 3, 3)
+
+    pose = gaussians.get_RT(camera.uid).detach()
+    with torch.no_grad():
+        expected = render(
+            camera, gaussians, make_pipe(), torch.zeros(3), camera_pose=pose
+        )
+        gaussians._xyz += 1.0
+        rendered = render(
+            camera, snapshot, make_pipe(), torch.zeros(3), camera_pose=pose
+        )
+    torch.testing.assert_close(rendered["render"], expected["render"])
@@ -0,0 +1,52 @@
+import torch
+
+from instant_splat.scene.gaussian_optimizer import GaussianAdam
+
+SHAPES = {
+    "xyz": (3,),
+    "f_dc": (1, 3),
+    "f_rest": (15, 3),
+    "opacity": (1,),
+    "scaling": (3,),
+    "rotation": (4,),
+    "pose": None,
+}
+
+
+def make_groups(generator, n=50):
+    groups = []
+    for i, (name, shape) in enumerate(SHAPES.items()):
+        shape = (1, 7) if shape is None else (n,) + shape
+        param = torch.nn.Parameter(torch.randn(shape, generator=generator))
+        groups.append({"params": [param], "lr": 1e-2 * (i + 1), "name": name})
+    return groups
+
+
+def test_adam_skips_attributes_without_gradient():
+    """f_rest gets no gradient at first, like at active_sh_degree 0."""
+    generator = torch.Generator().manual_seed(0)
+    groups = make_groups(generator)
+    reference_groups = [
+        group | {"params": [torch.nn.Parameter(group["params"][0].detach().clone())]}
+        for group in groups
+    ]
+    optimizer = GaussianAdam(groups, lr=0.0, eps=1e-15)
+    reference = torch.optim.Adam(reference_groups, lr=0.0, eps=1e-15)
+
+    for iteration in range(6):
+        for ours, theirs in zip(optimizer.param_groups, reference.param_groups):
+            if ours["name"] == "f_rest" and iteration < 3:
+                continue
+            grad = torch.randn(ours["params"][0].shape, generator=generator)
+            ours["params"][0].grad = grad
+            theirs["params"][0].grad = grad.clone()
+        optimizer.step()
+        reference.step()
+        optimizer.zero_grad(set_to_none=True)
+        reference.zero_grad(set_to_none=True)
+
+        for ours, theirs in zip(optimizer.param_groups, reference.param_groups):
+            torch.testing.assert_close(ours["params"][0], theirs["params"][0])
+            state = reference.state[theirs["params"][0]]
+            if state:
+                assert optimizer.state[ours["params"][0]]["step"] == state["step"]
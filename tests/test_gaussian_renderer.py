@@ -0,0 +1,26 @@
+import pytest
+import torch
+
+from instant_splat.gaussian_renderer import render, render_batch
+
+from conftest import make_pipe
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"compute_cov3D_python": True}, {"convert_SHs_python": True}],
+)
+def test_render_batch_matches_single_views(gaussians, camera, options):
+    pipe = make_pipe(**options)
+    pose = gaussians.get_RT(camera.uid).detach()
+    poses = [pose, pose + torch.tensor([0, 0, 0, 0, 0.1, -0.05, 0.2])]
+    background = torch.rand(3)
+
+    batch = render_batch([camera, camera], gaussians, pipe, background, poses)
+    assert batch["render"].shape == (2, 3, 60, 80)
+    for i, view_pose in enumerate(poses):
+        single = render(camera, gaussians, pipe, background, camera_pose=view_pose)
+        torch.testing.assert_close(batch["render"][i], single["render"])
+        assert torch.equal(batch["radii"][i], single["radii"])
+        assert torch.equal(batch["visibility_filter"][i], single["visibility_filter"])
+    assert not torch.equal(batch["render"][0], batch["render"][1])
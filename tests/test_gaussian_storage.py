@@ -0,0 +1,56 @@
+import torch
+from torch import nn
+
+from instant_splat.scene.gaussian_storage import GAUSSIAN_GROUPS, GaussianStorage
+
+WIDTHS = dict(xyz=3, f_dc=3, f_rest=45, opacity=1, scaling=3, rotation=4)
+
+
+def make_storage(n=100):
+    torch.manual_seed(0)
+    optimizer = torch.optim.Adam(
+        [
+            {"params": [nn.Parameter(torch.randn(n, WIDTHS[name]))], "name": name}
+            for name in GAUSSIAN_GROUPS
+        ]
+    )
+    return GaussianStorage(optimizer)
+
+
+def test_append_and_keep_reuse_capacity():
+    storage = make_storage()
+    tensors = storage.append(
+        {name: torch.randn(10, WIDTHS[name]) for name in GAUSSIAN_GROUPS}
+    )
+    assert storage.count == 110 and storage.capacity == 200
+    assert tensors["xyz"].shape == (110, 3)
+
+    mask = torch.arange(110) % 2 == 0
+    expected = tensors["f_rest"].detach()[mask].clone()
+    tensors = storage.keep(mask)
+    assert storage.count == 55 and storage.capacity == 200
+    torch.testing.assert_close(tensors["f_rest"].detach(), expected)
+
+
+def test_capture_is_compact_and_keeps_capacity():
+    storage = make_storage()
+    tensors = storage.append(
+        {name: torch.randn(10, WIDTHS[name]) for name in GAUSSIAN_GROUPS}
+    )
+    tensors["xyz"].sum().backward()
+    storage.optimizer.step()
+
+    params, state_dict = storage.capture()
+    assert storage.count == 110 and storage.capacity == 200
+    for name in GAUSSIAN_GROUPS:
+        torch.testing.assert_close(params[name], tensors[name].detach())
+        assert params[name].untyped_storage().size() == params[name].nbytes
+    for state in state_dict["state"].values():
+        for key in ("exp_avg", "exp_avg_sq"):
+            assert state[key].untyped_storage().size() == state[key].nbytes
+
+    # The capture is a copy: live state is neither replaced nor shared
+    live = storage.optimizer.state[tensors["xyz"]]
+    assert state_dict["state"][0]["exp_avg"] is not live["exp_avg"]
+    state_dict["state"][0]["exp_avg"].add_(1)
+    assert not torch.equal(state_dict["state"][0]["exp_avg"], live["exp_avg"])
@@ -0,0 +1,35 @@
+import pytest
+import torch
+
+from instant_splat.utils.knn_utils import knn_backend, mean_sq_dist_3nn
+
+
+def test_kdtree_matches_brute_force():
+    torch.manual_seed(0)
+    points = torch.randn(500, 3)
+    points[1] = points[0]  # duplicates are each other's nearest neighbour
+    dist2 = torch.cdist(points, points).square()
+    dist2.fill_diagonal_(float("inf"))
+    expected = dist2.topk(3, largest=False).values.mean(dim=1)
+
+    torch.testing.assert_close(mean_sq_dist_3nn(points, "kdtree"), expected)
+
+
+def test_small_clouds():
+    assert mean_sq_dist_3nn(torch.zeros(0, 3), "kdtree").shape == (0,)
+    assert mean_sq_dist_3nn(torch.ones(1, 3), "kdtree").tolist() == [0.0]
+    points = torch.tensor([[0.0, 0, 0], [1, 0, 0], [0, 2, 0]])
+    assert mean_sq_dist_3nn(points, "kdtree").tolist() == [2.5, 3.0, 4.5]
+
+
+def test_cpu_tensors_use_the_kdtree():
+    assert knn_backend(torch.zeros(4, 3)) == "kdtree"
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="needs CUDA")
+def test_cuda_backend_matches_kdtree():
+    pytest.importorskip("simple_knn")
+    points = torch.randn(2000, 3, device="cuda")
+    torch.testing.assert_close(
+        mean_sq_dist_3nn(points, "cuda"), mean_sq_dist_3nn(points, "kdtree")
+    )
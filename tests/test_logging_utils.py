@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import pytest
+import torch
+
+rr = pytest.importorskip("rerun")
+
+from instant_splat.logging_utils import AsyncTrainingLogger
+
+from conftest import make_pipe
+
+
+def test_logger_runs_jobs_in_the_background(gaussians, camera):
+    rr.init("instant_splat_test")
+    rr.memory_recording()
+    logger = AsyncTrainingLogger(
+        Path("world"), [camera], make_pipe(), torch.zeros(3), [0], budget=0.0
+    )
+    logger.log_cameras(1, gaussians)
+    logger.log_3d_splats(1, gaussians)
+    logger.close()
+
+    assert logger.error is None
+    assert logger.submitted == 3 and logger.dropped == 0
+    assert logger.main_thread_seconds > 0 and logger.worker_seconds > 0
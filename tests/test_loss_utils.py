@@ -0,0 +1,34 @@
+import pytest
+import torch
+
+from instant_splat.utils.loss_utils import _ssim, create_window, ssim
+
+
+def reference_ssim(img1, img2, size_average=True):
+    window = create_window(11, img1.size(-3)).to(img1)
+    return _ssim(img1, img2, window, 11, img1.size(-3), size_average)
+
+
+@pytest.mark.parametrize("shape", [(3, 48, 64), (2, 3, 37, 29)])
+def test_separable_ssim_matches_2d_window(shape):
+    generator = torch.Generator().manual_seed(0)
+    img1 = torch.rand(shape, generator=generator, dtype=torch.float64)
+    img2 = img1 + 0.1 * torch.randn(shape, generator=generator, dtype=torch.float64)
+    img1.requires_grad_(True)
+
+    ours = ssim(img1, img2)
+    reference = reference_ssim(img1, img2)
+    torch.testing.assert_close(ours, reference)
+    (grad,) = torch.autograd.grad(ours, img1)
+    (expected,) = torch.autograd.grad(reference, img1)
+    torch.testing.assert_close(grad, expected)
+    if len(shape) == 4:
+        torch.testing.assert_close(
+            ssim(img1, img2, size_average=False),
+            reference_ssim(img1, img2, size_average=False),
+        )
+
+
+def test_identical_images():
+    image = torch.rand(3, 32, 32)
+    torch.testing.assert_close(ssim(image, image), torch.tensor(1.0))
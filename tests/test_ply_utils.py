@@ -0,0 +1,73 @@
+import numpy as np
+from plyfile import PlyData, PlyElement
+
+from instant_splat.utils.ply_utils import (
+    read_vertex_ply,
+    store_point_cloud_ply,
+    vertex_columns,
+    write_vertex_ply,
+)
+
+
+def test_single_dtype_blocks_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    xyz = rng.random((100, 3)).astype(np.float32)
+    f_rest = rng.random((100, 45)).astype(np.float32)
+    names = [f"f_rest_{i}" for i in range(45)]
+    path = tmp_path / "splat.ply"
+    write_vertex_ply(path, [(["x", "y", "z"], xyz, "f4"), (names, f_rest, "f4")])
+
+    vertex = PlyData.read(path)["vertex"]
+    assert [p.name for p in vertex.properties] == ["x", "y", "z"] + names
+    np.testing.assert_array_equal(np.stack([vertex[n] for n in "xyz"], 1), xyz)
+    np.testing.assert_array_equal(np.stack([vertex[n] for n in names], 1), f_rest)
+
+
+def test_point_cloud_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    xyz = rng.random((100, 3)).astype(np.float32)
+    rgb = rng.integers(0, 256, (100, 3)).astype(np.uint8)
+    path = tmp_path / "points3D.ply"
+    store_point_cloud_ply(path, xyz, rgb)
+
+    vertex = PlyData.read(path)["vertex"]
+    assert vertex["red"].dtype == np.uint8
+    np.testing.assert_array_equal(np.stack([vertex[n] for n in "xyz"], 1), xyz)
+    np.testing.assert_array_equal(
+        np.stack([vertex[n] for n in ("red", "green", "blue")], 1), rgb
+    )
+    assert not np.stack([vertex[n] for n in ("nx", "ny", "nz")]).any()
+
+
+def test_read_vertex_ply_maps_binary_files(tmp_path):
+    rng = np.random.default_rng(0)
+    xyz = rng.random((100, 3)).astype(np.float32)
+    rgb = rng.integers(0, 256, (100, 3)).astype(np.uint8)
+    path = tmp_path / "points3D.ply"
+    store_point_cloud_ply(path, xyz, rgb)
+
+    vertices = read_vertex_ply(path)
+    assert isinstance(vertices, np.memmap)
+    np.testing.assert_array_equal(vertices, PlyData.read(path)["vertex"].data)
+    np.testing.assert_array_equal(vertex_columns(vertices, ["x", "y", "z"]), xyz)
+    np.testing.assert_array_equal(
+        vertex_columns(vertices, ["blue", "red"], dtype=np.uint8), rgb[:, [2, 0]]
+    )
+
+
+def test_read_vertex_ply_falls_back_to_plyfile(tmp_path):
+    vertices = np.array([(1.0, 2.0), (3.0, 4.0)], dtype=[("x", "f4"), ("y", "f4")])
+    path = tmp_path / "ascii.ply"
+    PlyData([PlyElement.describe(vertices, "vertex")], text=True).write(path)
+
+    loaded = read_vertex_ply(path)
+    assert not isinstance(loaded, np.memmap)
+    np.testing.assert_array_equal(vertex_columns(loaded, ["y", "x"]), [[2, 1], [4, 3]])
+
+
+def test_read_empty_vertex_ply(tmp_path):
+    path = tmp_path / "empty.ply"
+    store_point_cloud_ply(
+        path, np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.uint8)
+    )
+    assert vertex_columns(read_vertex_ply(path), ["x", "y", "z"]).shape == (0, 3)
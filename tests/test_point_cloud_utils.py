@@ -0,0 +1,39 @@
+import numpy as np
+
+from instant_splat.utils.point_cloud_utils import count_occupied_voxels, voxel_fuse
+
+
+def test_voxel_fuse_takes_confidence_weighted_means():
+    points = np.array(
+        [[0.1, 0.1, 0.1], [0.3, 0.3, 0.3], [1.2, 0.2, 0.2]], dtype=np.float32
+    )
+    colors = np.array([[0, 0, 0], [255, 255, 255], [10, 20, 30]], dtype=np.uint8)
+    weights = np.array([3.0, 1.0, 2.0])
+    fused, fused_colors, fused_weights = voxel_fuse(
+        points, colors, weights, voxel_size=1.0
+    )
+    order = np.argsort(fused[:, 0])
+    np.testing.assert_allclose(fused[order], [[0.15] * 3, [1.2, 0.2, 0.2]], rtol=1e-6)
+    np.testing.assert_array_equal(fused_colors[order], [[64] * 3, [10, 20, 30]])
+    np.testing.assert_allclose(fused_weights[order], [4.0, 2.0])
+    assert fused.dtype == points.dtype and fused_colors.dtype == colors.dtype
+
+
+def test_voxel_fuse_fits_point_budget():
+    rng = np.random.default_rng(0)
+    points = rng.random((5000, 3)).astype(np.float32)
+    colors = rng.random((5000, 3)).astype(np.float32)
+    fused, fused_colors, _ = voxel_fuse(points, colors, max_points=500)
+    assert len(fused) == len(fused_colors) <= 500
+    assert len(fused) >= 400
+
+    fused, _, _ = voxel_fuse(points, colors, voxel_size=0.05, max_points=100)
+    assert len(fused) == 100
+    assert count_occupied_voxels(points, 0.05) > 100
+
+
+def test_voxel_fuse_is_off_by_default():
+    points = np.zeros((4, 3), dtype=np.float32)
+    colors = np.zeros((4, 3), dtype=np.uint8)
+    fused, fused_colors, weights = voxel_fuse(points, colors)
+    assert fused is points and fused_colors is colors and weights is None
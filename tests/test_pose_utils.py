@@ -0,0 +1,43 @@
+import torch
+
+from instant_splat.utils.pose_utils import (
+    get_camera_from_tensor,
+    quadmultiply,
+    quadmultiply_left,
+    transform_points,
+)
+
+
+def test_quadmultiply_left_matches_quadmultiply():
+    generator = torch.Generator().manual_seed(0)
+    q1 = torch.randn(4, generator=generator, dtype=torch.float64, requires_grad=True)
+    q2 = torch.randn(100, 4, generator=generator, dtype=torch.float64)
+    q2.requires_grad_(True)
+    weights = torch.randn(100, 4, generator=generator, dtype=torch.float64)
+
+    ours = quadmultiply_left(q1, q2)
+    reference = quadmultiply(q1, q2)
+    torch.testing.assert_close(ours, reference)
+    grads = torch.autograd.grad((ours * weights).sum(), (q1, q2))
+    expected = torch.autograd.grad((reference * weights).sum(), (q1, q2))
+    for grad, expected_grad in zip(grads, expected):
+        torch.testing.assert_close(grad, expected_grad)
+
+
+def test_transform_points_matches_homogeneous_product():
+    generator = torch.Generator().manual_seed(0)
+    pose = torch.randn(7, generator=generator, dtype=torch.float64)
+    pose[:4] /= pose[:4].norm()
+    pose.requires_grad_(True)
+    points = torch.randn(100, 3, generator=generator, dtype=torch.float64)
+    points.requires_grad_(True)
+
+    w2c = get_camera_from_tensor(pose).double()
+    ours = transform_points(w2c, points)
+    homogeneous = torch.cat([points, torch.ones(100, 1, dtype=torch.float64)], 1)
+    reference = (w2c @ homogeneous.T).T[:, :3]
+    torch.testing.assert_close(ours, reference)
+    grads = torch.autograd.grad(ours.square().sum(), (pose, points), retain_graph=True)
+    expected = torch.autograd.grad(reference.square().sum(), (pose, points))
+    for grad, expected_grad in zip(grads, expected):
+        torch.testing.assert_close(grad, expected_grad)
@@ -0,0 +1,100 @@
+import math
+
+import torch
+
+from instant_splat.utils.spatial_index import (
+    MortonIndex,
+    in_frustum,
+    morton_decode,
+    morton_encode,
+)
+
+
+def clustered_cloud(n=3000, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    centers = torch.rand(8, 3, generator=generator) * 10
+    points = centers[torch.randint(8, (n,), generator=generator)]
+    return points + 0.3 * torch.randn(n, 3, generator=generator)
+
+
+def brute_force_range(xyz, lo, hi):
+    inside = ((xyz >= torch.tensor(lo)) & (xyz <= torch.tensor(hi))).all(dim=1)
+    return torch.nonzero(inside).squeeze(1)
+
+
+def test_morton_round_trip():
+    coords = torch.randint(0, 1 << 21, (1000, 3))
+    assert torch.equal(morton_decode(morton_encode(coords)), coords)
+
+
+def test_range_matches_brute_force():
+    xyz = clustered_cloud()
+    index = MortonIndex(xyz)
+    lo, hi = [2.0, 1.0, 3.0], [6.0, 8.0, 5.5]
+    assert torch.equal(index.range(lo, hi, xyz), brute_force_range(xyz, lo, hi))
+
+
+def test_frustum_matches_brute_force():
+    xyz = clustered_cloud()
+    radii = torch.rand(len(xyz), generator=torch.Generator().manual_seed(1))
+    w2c = torch.eye(4)
+    angle = math.radians(30)
+    w2c[:3, :3] = torch.tensor(
+        [
+            [math.cos(angle), 0.0, math.sin(angle)],
+            [0.0, 1.0, 0.0],
+            [-math.sin(angle), 0.0, math.cos(angle)],
+        ]
+    )
+    w2c[:3, 3] = torch.tensor([-3.0, -4.0, 2.0])
+    index = MortonIndex(xyz)
+
+    ours = index.frustum(xyz, w2c, 0.5, 0.4, 0.2, radii)
+    camera_space = xyz @ w2c[:3, :3].T + w2c[:3, 3]
+    expected = torch.nonzero(in_frustum(camera_space, radii, 0.5, 0.4, 0.2))
+    assert 0 < len(ours) < len(xyz)
+    assert torch.equal(ours, expected.squeeze(1))
+
+
+def test_knn_matches_brute_force():
+    xyz = clustered_cloud().double()
+    queries = clustered_cloud(500, seed=2).double() * 1.2 - 1.0
+    dist2, index = MortonIndex(xyz).knn(queries, 8, xyz)
+
+    expected = torch.cdist(queries, xyz).square().topk(8, largest=False).values
+    torch.testing.assert_close(dist2, expected)
+    torch.testing.assert_close((queries[:, None] - xyz[index]).square().sum(-1), dist2)
+
+
+def test_knn_pads_small_clouds():
+    xyz = torch.rand(2, 3)
+    dist2, index = MortonIndex(xyz).knn(torch.rand(4, 3), 3, xyz)
+    assert (index[:, 2] == -1).all() and dist2[:, 2].isinf().all()
+    assert (index[:, :2] >= 0).all()
+
+
+def test_empty_cloud():
+    xyz = torch.zeros(0, 3)
+    index = MortonIndex(xyz)
+    assert len(index) == 0
+    assert len(index.range([0.0] * 3, [1.0] * 3, xyz)) == 0
+    assert len(index.frustum(xyz, torch.eye(4), 0.5, 0.5, 0.2)) == 0
+    dist2, nearest = index.knn(torch.rand(4, 3), 3, xyz)
+    assert (nearest == -1).all() and dist2.isinf().all()
+
+
+def test_incremental_updates_match_a_rebuild():
+    xyz = clustered_cloud()
+    index = MortonIndex(xyz)
+    xyz = torch.cat([xyz, clustered_cloud(500, seed=3)])
+    index.append(xyz)
+    mask = torch.rand(len(xyz), generator=torch.Generator().manual_seed(4)) > 0.3
+    xyz = xyz[mask]
+    index.keep(mask)
+    xyz = xyz + 0.2 * torch.randn(xyz.shape, generator=torch.Generator().manual_seed(5))
+    index.refresh(xyz)
+
+    assert len(index) == len(xyz)
+    assert torch.equal(torch.sort(index.order).values, torch.arange(len(xyz)))
+    lo, hi = [2.0, 1.0, 3.0], [6.0, 8.0, 5.5]
+    assert torch.equal(index.range(lo, hi, xyz), brute_force_range(xyz, lo, hi))
@@ -0,0 +1,74 @@
+import numpy as np
+
+from instant_splat.utils.graphics_utils import SplatAttributes
+from instant_splat.utils.point_cloud_utils import morton_codes
+from instant_splat.utils.splat_streaming import (
+    chunk_counts,
+    importance,
+    load_streamable_splat,
+    read_streamable_header,
+    save_streamable_splat,
+)
+
+
+def stream_order(attributes, first_chunk=4096):
+    """Decreasing importance across chunks, Morton order within each chunk."""
+    order = np.argsort(-importance(attributes), kind="stable")
+    start = 0
+    for count in chunk_counts(len(order), first_chunk):
+        chunk = order[start : start + count]
+        order[start : start + count] = chunk[
+            np.argsort(morton_codes(attributes.xyz[chunk]), kind="stable")
+        ]
+        start += count
+    return SplatAttributes(*(a[order] for a in attributes))
+
+
+def test_round_trip_in_importance_order(attributes, tmp_path):
+    path = tmp_path / "point_cloud.splatstream"
+    save_streamable_splat(path, attributes, first_chunk=256)
+    decoded = load_streamable_splat(path)
+    original = stream_order(attributes, first_chunk=256)
+
+    assert len(decoded.xyz) == len(original.xyz)
+    extent = original.xyz.max(0) - original.xyz.min(0)
+    assert (np.abs(decoded.xyz - original.xyz) <= extent / 2000).all()
+    cos = np.abs((decoded.rotation * original.rotation).sum(1))
+    assert cos.min() > 1 - 1e-4
+    np.testing.assert_allclose(decoded.f_rest, original.f_rest, rtol=0, atol=4.1 / 255)
+
+
+def test_prefixes_load_complete_chunks(attributes, tmp_path):
+    path = tmp_path / "point_cloud.splatstream"
+    save_streamable_splat(path, attributes, sh_degree=1, first_chunk=256)
+    with open(path, "rb") as f:
+        header = read_streamable_header(f.read())
+    chunks = header["chunks"]
+    assert [c["count"] for c in chunks] == [256, 512, 232]
+    full = load_streamable_splat(path, sh_degree=3)
+
+    for max_bytes, count in [
+        (chunks[0]["offset"], 0),
+        (chunks[1]["offset"], 256),
+        (chunks[2]["offset"] - 1, 256),
+        (chunks[2]["offset"], 768),
+        (None, 1000),
+    ]:
+        prefix = load_streamable_splat(path, max_bytes=max_bytes, sh_degree=3)
+        assert prefix.f_rest.shape == (count, 45)
+        for part, whole in zip(prefix, full):
+            np.testing.assert_array_equal(part, whole[:count])
+
+
+def test_model_round_trip(gaussians, tmp_path):
+    path = str(tmp_path / "point_cloud.splatstream")
+    gaussians.save_streamable_splat(path)
+    loaded = type(gaussians)(gaussians.max_sh_degree)
+    loaded.load_streamable_splat(path)
+
+    original = stream_order(gaussians.get_ply_attributes())
+    # In file order: re-exporting would sort by the quantized centers
+    decoded = loaded._ply_arrays()
+    extent = original.xyz.max(0) - original.xyz.min(0)
+    assert (np.abs(decoded.xyz - original.xyz) <= extent / 2000).all()
+    np.testing.assert_allclose(decoded.f_rest, original.f_rest, rtol=0, atol=4.1 / 255)
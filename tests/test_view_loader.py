@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import torch
+
+from instant_splat.scene.cameras import Camera
+from instant_splat.scene.view_loader import TrainViewLoader
+
+
+def make_cameras(n, device="cpu"):
+    return [
+        Camera(
+            uid,
+            np.eye(3),
+            np.zeros(3),
+            0.9,
+            0.7,
+            torch.full((3, 6, 8), uid / n),
+            None,
+            f"view_{uid}",
+            uid,
+            device=device,
+        )
+        for uid in range(n)
+    ]
+
+
+def test_each_camera_once_per_pass():
+    cameras = make_cameras(5)
+    loader = TrainViewLoader(cameras, "cpu")
+    for _ in range(3):
+        drawn = [next(loader) for _ in cameras]
+        assert sorted(cam.uid for cam, _ in drawn) == list(range(5))
+        for cam, image in drawn:
+            assert image is cam.original_image
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="needs CUDA")
+def test_host_images_are_prefetched_to_the_device():
+    cameras = make_cameras(3)
+    for cam in cameras:
+        cam.original_image = cam.original_image.cpu()
+    loader = TrainViewLoader(cameras, "cuda")
+    assert all(cam.original_image.is_pinned() for cam in cameras)
+    for _ in range(6):
+        cam, image = next(loader)
+        assert image.is_cuda
+        torch.testing.assert_close(image.cpu(), cam.original_image)
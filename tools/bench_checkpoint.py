@@ -0,0 +1,125 @@
+import os
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from instant_splat.arguments import OptimizationParams
+from instant_splat.scene.cameras import Camera
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.checkpoint_utils import CheckpointWriter, load_checkpoint
+from instant_splat.utils.graphics_utils import BasicPointCloud
+
+
+def synchronize(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+
+
+def make_model(n_gaussians, opt, device, generator):
+    """A model with populated Adam moments, as it is when a checkpoint is taken."""
+    pcd = BasicPointCloud(
+        points=generator.standard_normal((n_gaussians, 3)).astype(np.float32),
+        colors=generator.random((n_gaussians, 3)).astype(np.float32),
+        normals=np.zeros((n_gaussians, 3), dtype=np.float32),
+    )
+    camera = Camera(
+        0, np.eye(3), np.zeros(3), 1.0, 1.0, torch.zeros(3, 1, 1), None, "bench", 0
+    )
+    gaussians = GaussianModel(3, device=device)
+    gaussians.create_from_pcd(pcd, 1.0)
+    gaussians.init_RT_seq({1.0: [camera]})
+    gaussians.training_setup(opt)
+    for group in gaussians.optimizer.param_groups:
+        for param in group["params"]:
+            param.grad = torch.randn_like(param)
+    gaussians.optimizer.step()
+    gaussians.optimizer.zero_grad(set_to_none=True)
+    return gaussians
+
+
+def directory_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def resume(gaussians, model_params, opt):
+    """Restore and touch every parameter, so lazily mapped pages are really read."""
+    gaussians.restore(model_params, opt)
+    for group in gaussians.optimizer.param_groups:
+        for param in group["params"]:
+            param.sum().item()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Training checkpoint save/resume benchmark")
+    parser.add_argument("--n_gaussians", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--device", default="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    parser.add_argument("--out_dir", type=str, default=None)
+    op = OptimizationParams(parser)
+    args = parser.parse_args()
+    opt = op.extract(args)
+
+    device = torch.device(args.device)
+    gaussians = make_model(args.n_gaussians, opt, device, np.random.default_rng(0))
+    writer = CheckpointWriter()
+
+    def torch_save(path, state):
+        torch.save(state, path)
+
+    def torch_load(path):
+        return torch.load(path, weights_only=False)
+
+    formats = [
+        (
+            "torch.save",
+            ".pth",
+            torch_save,
+            SimpleNamespace(wait=lambda: None),
+            torch_load,
+        ),
+        (
+            "async",
+            ".ckpt",
+            writer.save,
+            writer,
+            lambda path: load_checkpoint(path, device),
+        ),
+    ]
+
+    with tempfile.TemporaryDirectory(dir=args.out_dir) as out_dir:
+        print(f"{args.n_gaussians:,d} Gaussians on {device}, {args.repeats} repeats")
+        for name, suffix, save, pending, load in formats:
+            path = os.path.join(out_dir, "chkpnt" + suffix)
+            stall, total, resume_time = [], [], []
+            for _ in range(args.repeats):
+                synchronize(device)
+                start = perf_counter()
+                save(path, (gaussians.capture(), 0))
+                synchronize(device)
+                stall.append(perf_counter() - start)
+                pending.wait()
+                total.append(perf_counter() - start)
+
+                # The checkpoint was just written, so it is in the page cache;
+                # this measures deserialization and transfer, not the disk
+                start = perf_counter()
+                model_params, _ = load(path)
+                resume(GaussianModel(3, device=device), model_params, opt)
+                synchronize(device)
+                resume_time.append(perf_counter() - start)
+                del model_params
+
+            print(
+                f"{name:>10}: training stall {np.median(stall):6.3f}s  "
+                f"write {np.median(total):6.3f}s  "
+                f"resume {np.median(resume_time):6.3f}s  "
+                f"size {directory_size(path) / 2**20:7.1f} MiB"
+            )
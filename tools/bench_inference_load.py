@@ -0,0 +1,126 @@
+import math
+import os
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+import torch
+
+from instant_splat.arguments import PipelineParams
+from instant_splat.gaussian_renderer import render
+from instant_splat.scene.cameras import Camera
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.pose_utils import get_tensor_from_camera
+from instant_splat.utils.ply_utils import write_vertex_ply
+
+
+def write_random_model(path, n_gaussians, generator):
+    """A trained-looking sh_degree=3 model in front of an identity camera."""
+    names = (
+        ["x", "y", "z", "nx", "ny", "nz"]
+        + [f"f_dc_{i}" for i in range(3)]
+        + [f"f_rest_{i}" for i in range(45)]
+        + ["opacity"]
+        + [f"scale_{i}" for i in range(3)]
+        + [f"rot_{i}" for i in range(4)]
+    )
+    xyz = generator.standard_normal((n_gaussians, 3)) * [1.0, 0.7, 0.3] + [0, 0, 3]
+    columns = np.concatenate(
+        [
+            xyz,
+            np.zeros((n_gaussians, 3)),
+            0.5 * generator.standard_normal((n_gaussians, 3)),
+            0.05 * generator.standard_normal((n_gaussians, 45)),
+            generator.standard_normal((n_gaussians, 1)),
+            np.log(0.005 + 0.02 * generator.random((n_gaussians, 3))),
+            generator.standard_normal((n_gaussians, 4)),
+        ],
+        axis=1,
+    ).astype(np.float32)
+    write_vertex_ply(path, [(names, columns, "f4")])
+
+
+def synchronize(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+
+
+def load(path, device, inference_dtype):
+    synchronize(device)
+    if device.type == "cuda":
+        torch.cuda.reset_peak_memory_stats()
+    start = perf_counter()
+    gaussians = GaussianModel(3, device=device, inference_dtype=inference_dtype)
+    gaussians.load_ply(path)
+    synchronize(device)
+    seconds = perf_counter() - start
+    nbytes = sum(
+        getattr(gaussians, name).nbytes
+        for name in ("_xyz", "_features_dc", "_features_rest")
+        + ("_opacity", "_scaling", "_rotation")
+    )
+    return gaussians, seconds, nbytes
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Inference-only model load benchmark")
+    parser.add_argument("--n_gaussians", type=int, default=1_000_000)
+    parser.add_argument("--width", type=int, default=320)
+    parser.add_argument("--height", type=int, default=240)
+    parser.add_argument(
+        "--device", default="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    pp = PipelineParams(parser)
+    args = parser.parse_args()
+    pipe = pp.extract(args)
+
+    device = torch.device(args.device)
+    fovx = 1.0
+    fovy = 2 * math.atan(math.tan(fovx / 2) * args.height / args.width)
+    camera = Camera(
+        0,
+        np.eye(3),
+        np.zeros(3),
+        fovx,
+        fovy,
+        torch.zeros(3, args.height, args.width),
+        None,
+        "bench",
+        0,
+        device=device,
+    )
+    pose = get_tensor_from_camera(camera.world_view_transform.transpose(0, 1))
+    background = torch.zeros(3, device=device)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, "point_cloud.ply")
+        write_random_model(path, args.n_gaussians, np.random.default_rng(0))
+        print(
+            f"{args.n_gaussians:,d} Gaussians, "
+            f"{os.path.getsize(path) / 2**20:.0f} MB PLY on {device}"
+        )
+
+        reference = None
+        for name, dtype in [
+            ("parameters", None),
+            ("float16", torch.float16),
+            ("bfloat16", torch.bfloat16),
+        ]:
+            load(path, device, dtype)  # warm the page cache and allocator
+            gaussians, seconds, nbytes = load(path, device, dtype)
+            line = f"{name:>10}: load {seconds:6.2f}s  attributes {nbytes / 2**20:7.1f} MiB"
+            if device.type == "cuda":
+                line += f"  peak {torch.cuda.max_memory_allocated() / 2**20:7.1f} MiB"
+
+            with torch.no_grad():
+                image = render(camera, gaussians, pipe, background, camera_pose=pose)[
+                    "render"
+                ]
+            if reference is None:
+                reference = image
+            else:
+                mse = (image - reference).square().mean().item()
+                line += f"  render PSNR {-10 * math.log10(max(mse, 1e-20)):5.1f} dB"
+            print(line)
+            del gaussians
@@ -0,0 +1,69 @@
+from argparse import ArgumentParser
+from time import perf_counter
+
+import torch
+
+from instant_splat.utils.knn_utils import mean_sq_dist_3nn, distCUDA2
+
+
+def brute_force_3nn(points, queries, max_pairs=2**25):
+    """Reference mean squared 3-NN distance of `queries` (indices into points)."""
+    chunk = max(max_pairs // len(points), 1)
+    out = []
+    for start in range(0, len(queries), chunk):
+        idx = queries[start : start + chunk]
+        d2 = torch.cdist(points[idx].double(), points.double()).square()
+        d2[torch.arange(len(idx)), idx] = float("inf")
+        out.append(d2.topk(3, largest=False).values.mean(dim=1))
+    return torch.cat(out).float()
+
+
+def timed(fn, *args, **kwargs):
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start = perf_counter()
+    result = fn(*args, **kwargs)
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    return result, perf_counter() - start
+
+
+def bench(n_points, n_check):
+    generator = torch.Generator().manual_seed(0)
+    # Clustered points, closer to a DUSt3R cloud than a uniform cube
+    centers = torch.rand((max(n_points // 1000, 1), 3), generator=generator)
+    points = centers[torch.randint(len(centers), (n_points,), generator=generator)]
+    points += 0.01 * torch.randn((n_points, 3), generator=generator)
+
+    dist_cpu, t_cpu = timed(mean_sq_dist_3nn, points, backend="kdtree")
+    line = f"{n_points:>10,d} points: kdtree {t_cpu:6.2f}s"
+
+    queries = torch.randperm(n_points, generator=generator)[:n_check]
+    reference = brute_force_3nn(points, queries)
+    error = ((dist_cpu[queries] - reference).abs() / reference).max().item()
+    line += f" (max rel err vs brute force {error:.1e})"
+
+    dist_morton, t_morton = timed(mean_sq_dist_3nn, points, backend="morton")
+    diff = ((dist_morton - dist_cpu).abs() / dist_cpu.clamp_min(1e-12)).max()
+    line += f"  morton {t_morton:6.2f}s (max rel diff {diff.item():.1e})"
+
+    if torch.cuda.is_available() and distCUDA2 is not None:
+        dist_gpu, t_gpu = timed(mean_sq_dist_3nn, points.cuda(), backend="cuda")
+        diff = ((dist_gpu.cpu() - dist_cpu).abs() / dist_cpu.clamp_min(1e-12)).max()
+        line += f"  cuda {t_gpu:6.2f}s (max rel diff {diff.item():.1e})"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="3-NN scale initialization benchmark")
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[1_000_000, 2_000_000, 5_000_000]
+    )
+    parser.add_argument(
+        "--n_check", type=int, default=2000, help="points verified by brute force"
+    )
+    args = parser.parse_args()
+
+    print(f"CPU threads: {torch.get_num_threads()}")
+    for n_points in args.sizes:
+        bench(n_points, args.n_check)
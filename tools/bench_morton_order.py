@@ -0,0 +1,149 @@
+import math
+import os
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+import torch
+
+from instant_splat.arguments import OptimizationParams, PipelineParams
+from instant_splat.gaussian_renderer import render
+from instant_splat.scene.cameras import Camera
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.graphics_utils import BasicPointCloud
+
+
+def pixel_order_cloud(n_views, width, height, generator):
+    """
+    A DUSt3R-like init: every view unprojects its pixels onto a wavy surface, so the
+    cloud is in per-view scanline order and neighbours in memory are rarely
+    neighbours in space.
+    """
+    points = []
+    for view in range(n_views):
+        v, u = np.meshgrid(
+            np.linspace(-1, 1, height), np.linspace(-1, 1, width), indexing="ij"
+        )
+        x = 2.0 * u + 0.5 * view
+        y = 1.5 * v
+        z = 3.0 + 0.3 * np.sin(3 * x) * np.cos(2 * y)
+        points.append(np.stack([x, y, z], axis=-1).reshape(-1, 3))
+    points = np.concatenate(points).astype(np.float32)
+    points += 0.002 * generator.standard_normal(points.shape, dtype=np.float32)
+    return BasicPointCloud(
+        points=points,
+        colors=generator.random(points.shape, dtype=np.float32),
+        normals=np.zeros_like(points),
+    )
+
+
+def synchronize(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+
+
+def timed(fn, device, repeats=1):
+    synchronize(device)
+    start = perf_counter()
+    for _ in range(repeats):
+        fn()
+    synchronize(device)
+    return (perf_counter() - start) / repeats
+
+
+def make_model(pcd, opt, cameras, device):
+    torch.manual_seed(0)
+    gaussians = GaussianModel(3, device=device)
+    gaussians.create_from_pcd(pcd, 1.0)
+    gaussians.init_RT_seq({1.0: cameras})
+    gaussians.training_setup(opt)
+    return gaussians
+
+
+def bench_model(gaussians, camera, pipe, out_dir, repeats):
+    device = gaussians.device
+    background = torch.zeros(3, device=device)
+    pose = gaussians.get_RT(camera.uid)
+
+    def render_step():
+        out = render(camera, gaussians, pipe, background, camera_pose=pose)
+        out["render"].mean().backward()
+        gaussians.optimizer.zero_grad(set_to_none=True)
+
+    def densify_step():
+        # Clone 5% of the Gaussians, then prune as many, like one densification round
+        grads = torch.zeros((len(gaussians.get_xyz), 1), device=device)
+        grads[::20] = 1.0
+        gaussians.densify_and_clone(grads, 0.5, 1e6)
+        prune = torch.zeros(len(gaussians.get_xyz), dtype=torch.bool, device=device)
+        prune[-len(prune) // 21 :] = True
+        gaussians.prune_points(prune)
+
+    render_step()
+    results = {
+        "render": timed(render_step, device, repeats),
+        "densify": timed(densify_step, device, repeats),
+        "export ply": timed(
+            lambda: gaussians.save_ply(os.path.join(out_dir, "point_cloud.ply")),
+            device,
+            repeats,
+        ),
+        "export compressed": timed(
+            lambda: gaussians.save_compressed_ply(os.path.join(out_dir, "c.ply")),
+            device,
+            repeats,
+        ),
+    }
+    return results
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Morton memory layout benchmark")
+    parser.add_argument("--n_views", type=int, default=4)
+    parser.add_argument("--view_width", type=int, default=512)
+    parser.add_argument("--view_height", type=int, default=384)
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--height", type=int, default=192)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--device", default="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    op = OptimizationParams(parser)
+    pp = PipelineParams(parser)
+    args = parser.parse_args()
+    opt, pipe = op.extract(args), pp.extract(args)
+
+    device = torch.device(args.device)
+    generator = np.random.default_rng(0)
+    pcd = pixel_order_cloud(args.n_views, args.view_width, args.view_height, generator)
+    fovx = 1.2
+    fovy = 2 * math.atan(math.tan(fovx / 2) * args.height / args.width)
+    camera = Camera(
+        0,
+        np.eye(3),
+        np.array([-1.0, 0.0, 0.5]),
+        fovx,
+        fovy,
+        torch.zeros(3, args.height, args.width),
+        None,
+        "bench",
+        0,
+    )
+
+    print(f"{len(pcd.points):,d} Gaussians on {device}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        gaussians = make_model(pcd, opt, [camera], device)
+        creation = bench_model(gaussians, camera, pipe, out_dir, args.repeats)
+
+        gaussians = make_model(pcd, opt, [camera], device)
+        reorder = timed(gaussians.reorder_by_morton, device)
+        morton = bench_model(gaussians, camera, pipe, out_dir, args.repeats)
+
+    print(f"{'':>18} {'creation':>10} {'morton':>10}")
+    for name in creation:
+        print(
+            f"{name:>18} {creation[name] * 1e3:8.1f}ms {morton[name] * 1e3:8.1f}ms "
+            f"({creation[name] / morton[name]:4.2f}x)"
+        )
+    print(f"{'reorder':>18} {'':>10} {reorder * 1e3:8.1f}ms")
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+from plyfile import PlyData, PlyElement
+
+from instant_splat.utils.ply_utils import (
+    write_vertex_ply,
+    read_vertex_ply,
+    vertex_columns,
+)
+
+# Same layout as GaussianModel.save_ply with sh_degree=3
+SPLAT_ATTRIBUTES = (
+    ["x", "y", "z", "nx", "ny", "nz"]
+    + [f"f_dc_{i}" for i in range(3)]
+    + [f"f_rest_{i}" for i in range(45)]
+    + ["opacity"]
+    + [f"scale_{i}" for i in range(3)]
+    + [f"rot_{i}" for i in range(4)]
+)
+
+
+def write_tuple_ply(path, names, attributes):
+    """The previous per-point tuple fill, kept as the benchmark baseline."""
+    elements = np.empty(attributes.shape[0], dtype=[(name, "f4") for name in names])
+    elements[:] = list(map(tuple, attributes))
+    PlyData([PlyElement.describe(elements, "vertex")]).write(path)
+
+
+def read_per_property(path, names):
+    """The previous load_ply pattern: one float64 copy per property via plyfile."""
+    vertex = PlyData.read(path).elements[0]
+    columns = np.zeros((vertex.count, len(names)))
+    for idx, name in enumerate(names):
+        columns[:, idx] = np.asarray(vertex[name])
+    return columns.astype(np.float32)
+
+
+def read_mapped(path, names):
+    return vertex_columns(read_vertex_ply(path), names)
+
+
+def timed(fn, *args):
+    start = perf_counter()
+    fn(*args)
+    return perf_counter() - start
+
+
+def bench_writers(n_points, out_dir, legacy_limit):
+    attributes = np.random.default_rng(0).standard_normal(
+        (n_points, len(SPLAT_ATTRIBUTES)), dtype=np.float32
+    )
+    path = os.path.join(out_dir, "bench.ply")
+
+    t_new = timed(write_vertex_ply, path, [(SPLAT_ATTRIBUTES, attributes, "f4")])
+    size_mb = os.path.getsize(path) / 2**20
+    if n_points <= legacy_limit:
+        t_old = timed(write_tuple_ply, path, SPLAT_ATTRIBUTES, attributes)
+        old = f"{t_old:8.2f}s  speedup {t_old / t_new:6.1f}x"
+    else:
+        old = "skipped (--legacy_limit)"
+    print(
+        f"write {n_points:>10,d} splats ({size_mb:8.1f} MB): "
+        f"vectorized {t_new:6.2f}s  tuple {old}"
+    )
+
+    names = [name for name in SPLAT_ATTRIBUTES if not name.startswith("n")]
+    t_old = timed(read_per_property, path, names)
+    t_new = timed(read_mapped, path, names)
+    print(
+        f"read  {n_points:>10,d} splats ({size_mb:8.1f} MB): "
+        f"mapped {t_new:6.2f}s  per-property {t_old:6.2f}s  "
+        f"speedup {t_old / t_new:6.1f}x"
+    )
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="PLY I/O benchmark")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000_000, 10_000_000])
+    parser.add_argument(
+        "--legacy_limit",
+        type=int,
+        default=10_000_000,
+        help="skip the slow tuple baseline above this many points",
+    )
+    parser.add_argument("--out_dir", type=str, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.out_dir) as out_dir:
+        for n_points in args.sizes:
+            bench_writers(n_points, out_dir, args.legacy_limit)
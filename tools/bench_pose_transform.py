@@ -0,0 +1,130 @@
+from argparse import ArgumentParser
+from time import perf_counter
+
+import torch
+from torch.utils._python_dispatch import TorchDispatchMode
+from torch.utils._pytree import tree_flatten
+
+from instant_splat.utils.pose_utils import (
+    get_camera_from_tensor,
+    quadmultiply,
+    quadmultiply_left,
+    transform_points,
+)
+
+
+class AllocationCounter(TorchDispatchMode):
+    """
+    Count the tensors (and bytes) that aten ops allocate, forward and backward;
+    `large` counts those of at least `min_bytes`, i.e. full-size per-Gaussian ones.
+    """
+
+    def __init__(self, min_bytes=0):
+        super().__init__()
+        self.min_bytes = min_bytes
+        self.count = 0
+        self.large = 0
+        self.nbytes = 0
+
+    def __torch_dispatch__(self, func, types, args=(), kwargs=None):
+        out = func(*args, **(kwargs or {}))
+        seen = {
+            t.untyped_storage().data_ptr()
+            for t in tree_flatten((args, kwargs))[0]
+            if isinstance(t, torch.Tensor)
+        }
+        for t in tree_flatten(out)[0]:
+            if (
+                isinstance(t, torch.Tensor)
+                and t.untyped_storage().data_ptr() not in seen
+            ):
+                seen.add(t.untyped_storage().data_ptr())
+                self.count += 1
+                self.large += t.untyped_storage().nbytes() >= self.min_bytes
+                self.nbytes += t.untyped_storage().nbytes()
+        return out
+
+
+def transform_homogeneous(camera_pose, xyz, rotation):
+    """The previous render() path: clones and a homogeneous (N, 4) copy."""
+    rel_w2c = get_camera_from_tensor(camera_pose)
+    gaussians_xyz = xyz.clone()
+    gaussians_rot = rotation.clone()
+    xyz_ones = torch.ones(gaussians_xyz.shape[0], 1, device=gaussians_xyz.device)
+    xyz_homo = torch.cat((gaussians_xyz, xyz_ones), dim=1)
+    return (rel_w2c @ xyz_homo.T).T[:, :3], quadmultiply(camera_pose[:4], gaussians_rot)
+
+
+def transform_fused(camera_pose, xyz, rotation):
+    rel_w2c = get_camera_from_tensor(camera_pose)
+    return transform_points(rel_w2c, xyz), quadmultiply_left(camera_pose[:4], rotation)
+
+
+def step(fn, camera_pose, xyz, rotation):
+    means3D, rotations = fn(camera_pose, xyz, rotation)
+    (means3D.sum() + rotations.sum()).backward()
+    return means3D, rotations
+
+
+def synchronize(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+
+
+def bench(fn, inputs, repeats):
+    with AllocationCounter(min_bytes=4 * len(inputs[1])) as counter:
+        step(fn, *inputs)
+    synchronize(inputs[1].device)
+    start = perf_counter()
+    for _ in range(repeats):
+        step(fn, *inputs)
+    synchronize(inputs[1].device)
+    return counter, (perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Per-render pose transform benchmark")
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[100_000, 1_000_000, 4_000_000]
+    )
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument(
+        "--device", default="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    args = parser.parse_args()
+
+    generator = torch.Generator().manual_seed(0)
+    for n in args.sizes:
+        pose = torch.cat(
+            [torch.nn.functional.normalize(torch.randn(4), dim=0), torch.randn(3)]
+        )
+        inputs = [
+            t.to(args.device).requires_grad_()
+            for t in (
+                pose,
+                torch.randn((n, 3), generator=generator),
+                torch.randn((n, 4), generator=generator),
+            )
+        ]
+        results = {}
+        for name, fn in [
+            ("homogeneous", transform_homogeneous),
+            ("fused", transform_fused),
+        ]:
+            counter, seconds = bench(fn, inputs, args.repeats)
+            for t in inputs:
+                t.grad = None
+            outputs = step(fn, *inputs)
+            results[name] = [o.detach() for o in outputs] + [
+                t.grad.clone() for t in inputs
+            ]
+            print(
+                f"{n:>10,d} {name:>12}: {counter.large:2d} per-Gaussian allocations "
+                f"of {counter.count:3d} ({counter.nbytes / 2**20:8.1f} MiB)  "
+                f"{seconds * 1e3:8.2f} ms/step"
+            )
+        diff = max(
+            ((a - b).abs().max() / b.abs().max().clamp_min(1e-12)).item()
+            for a, b in zip(results["fused"], results["homogeneous"])
+        )
+        print(f"{'':>10} max rel diff {diff:.1e}")
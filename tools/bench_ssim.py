@@ -0,0 +1,78 @@
+from argparse import ArgumentParser
+from time import perf_counter
+
+import torch
+
+from instant_splat.utils.loss_utils import _ssim, create_window, ssim
+
+
+def ssim_2d(img1, img2, window_size=11):
+    """The previous ssim(): a new 2D window per call and five 2D convolutions."""
+    channel = img1.size(-3)
+    window = create_window(window_size, channel).to(img1)
+    return _ssim(img1, img2, window, window_size, channel)
+
+
+def synchronize(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+
+
+def bench(fn, img1, img2, backward, repeats):
+    def step():
+        value = fn(img1, img2)
+        if backward:
+            img1.grad = None
+            value.backward()
+        return value
+
+    step()  # warm up and fill the window cache
+    synchronize(img1.device)
+    start = perf_counter()
+    for _ in range(repeats):
+        step()
+    synchronize(img1.device)
+    return (perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="SSIM loss benchmark")
+    parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        default=["512x384", "512x288", "1600x1200"],
+        help="WxH: DUSt3R-sized training views (4:3, 16:9) and full-size evaluation",
+    )
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument(
+        "--device", default="cuda" if torch.cuda.is_available() else "cpu"
+    )
+    args = parser.parse_args()
+
+    device = torch.device(args.device)
+    generator = torch.Generator().manual_seed(0)
+    print(f"ms per call on {device}")
+    for resolution in args.resolutions:
+        width, height = (int(v) for v in resolution.split("x"))
+        gt = torch.rand((3, height, width), generator=generator)
+        # A render close to the ground truth, as late in training
+        render = (gt + 0.05 * torch.randn(gt.shape, generator=generator)).clamp(0, 1)
+        img1 = render.to(device).requires_grad_()
+        img2 = gt.to(device)
+
+        values = {}
+        for name, fn in [("2d", ssim_2d), ("separable", ssim)]:
+            forward = bench(fn, img1, img2, False, args.repeats)
+            train = bench(fn, img1, img2, True, args.repeats)
+            img1.grad = None
+            fn(img1, img2).backward()
+            values[name] = (fn(img1, img2).item(), img1.grad.clone())
+            print(
+                f"{resolution:>10} {name:>10}: forward {forward * 1e3:8.2f}  "
+                f"forward+backward {train * 1e3:8.2f}"
+            )
+        grad_diff = (values["separable"][1] - values["2d"][1]).abs().max().item()
+        print(
+            f"{'':>10} ssim diff {abs(values['separable'][0] - values['2d'][0]):.1e}"
+            f"  grad diff {grad_diff:.1e}"
+        )
@@ -0,0 +1,99 @@
+import math
+from argparse import ArgumentParser
+from time import perf_counter
+
+import torch
+
+from instant_splat.gaussian_renderer.torch_rasterizer import (
+    GaussianRasterizationSettings,
+    GaussianRasterizer,
+)
+from instant_splat.utils.graphics_utils import getProjectionMatrix
+
+
+def random_scene(n_gaussians, sh_degree, generator):
+    """Gaussians in a slab in front of an identity camera, like a DUSt3R init."""
+    xyz = torch.randn((n_gaussians, 3), generator=generator)
+    xyz = xyz * torch.tensor([1.0, 0.7, 0.3]) + torch.tensor([0.0, 0.0, 3.0])
+    return {
+        "means3D": xyz,
+        "means2D": torch.zeros((n_gaussians, 3)),
+        "opacities": torch.rand((n_gaussians, 1), generator=generator),
+        "shs": 0.3
+        * torch.randn((n_gaussians, (sh_degree + 1) ** 2, 3), generator=generator),
+        "scales": 0.005 + 0.03 * torch.rand((n_gaussians, 3), generator=generator),
+        "rotations": torch.randn((n_gaussians, 4), generator=generator),
+    }
+
+
+def settings_for(width, height, sh_degree, fovx=1.0):
+    fovy = 2 * math.atan(math.tan(fovx / 2) * height / width)
+    viewmatrix = torch.eye(4)
+    projmatrix = getProjectionMatrix(0.01, 100.0, fovx, fovy).transpose(0, 1)
+    return GaussianRasterizationSettings(
+        image_height=height,
+        image_width=width,
+        tanfovx=math.tan(fovx / 2),
+        tanfovy=math.tan(fovy / 2),
+        bg=torch.zeros(3),
+        scale_modifier=1.0,
+        viewmatrix=viewmatrix,
+        projmatrix=viewmatrix @ projmatrix,
+        sh_degree=sh_degree,
+        campos=torch.zeros(3),
+        prefiltered=False,
+        debug=False,
+    )
+
+
+def bench(rasterizer, scene, repeats):
+    inputs = {k: v.clone().requires_grad_() for k, v in scene.items()}
+    forward = backward = 0.0
+    for _ in range(repeats):
+        start = perf_counter()
+        image, _ = rasterizer(**inputs)
+        forward += perf_counter() - start
+        start = perf_counter()
+        image.sum().backward()
+        backward += perf_counter() - start
+    return image.detach(), forward / repeats, backward / repeats
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Pure-PyTorch rasterizer strategy benchmark")
+    parser.add_argument("--width", type=int, default=256)
+    parser.add_argument("--height", type=int, default=256)
+    parser.add_argument("--n_gaussians", type=int, default=20_000)
+    parser.add_argument("--sh_degree", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--max_elements",
+        nargs="+",
+        type=int,
+        default=[2**20, 2**22, 2**24],
+        help="pixel-Gaussian pairs per pass for the batched strategy",
+    )
+    args = parser.parse_args()
+
+    generator = torch.Generator().manual_seed(0)
+    scene = random_scene(args.n_gaussians, args.sh_degree, generator)
+    settings = settings_for(args.width, args.height, args.sh_degree)
+    print(
+        f"{args.n_gaussians:,d} Gaussians at {args.width}x{args.height}, "
+        f"CPU threads: {torch.get_num_threads()}"
+    )
+
+    reference, t_fwd, t_bwd = bench(
+        GaussianRasterizer(settings, strategy="per_tile"), scene, args.repeats
+    )
+    print(f"{'per_tile':>24}: forward {t_fwd:6.2f}s  backward {t_bwd:6.2f}s")
+    for max_elements in args.max_elements:
+        rasterizer = GaussianRasterizer(
+            settings, strategy="batched", max_elements=max_elements
+        )
+        image, t_fwd, t_bwd = bench(rasterizer, scene, args.repeats)
+        diff = (image - reference).abs().max().item()
+        print(
+            f"{f'batched (2^{int(math.log2(max_elements))})':>24}: "
+            f"forward {t_fwd:6.2f}s  backward {t_bwd:6.2f}s  (max diff {diff:.1e})"
+        )
@@ -20,6 +20,30 @@ def get_args_parser():
     parser.add_argument("--lr", type=float, default=0.01)
     parser.add_argument("--niter", type=int, default=300)
     parser.add_argument("--focal_avg", action="store_true")
+    parser.add_argument(
+        "--window_size",
+        type=int,
+        default=0,
+        help="align long sequences in overlapping windows of this many views (0 disables)",
+    )
+    parser.add_argument(
+        "--window_overlap",
+        type=int,
+        default=4,
+        help="number of views shared by consecutive alignment windows",
+    )
+    parser.add_argument(
+        "--voxel_size",
+        type=float,
+        default=0.0,
+        help="fuse initial points per voxel of this size (0 picks it from --max_points)",
+    )
+    parser.add_argument(
+        "--max_points",
+        type=int,
+        default=0,
+        help="target number of initial points after voxel fusion (0 disables)",
+    )
 
     parser.add_argument("--llffhold", type=int, default=2)
     parser.add_argument("--n_views", type=int, default=12)
@@ -46,4 +70,8 @@ if __name__ == "__main__":
         n_views=args.n_views,
         img_base_path=args.img_base_path,
         focal_avg=args.focal_avg,
+        window_size=args.window_size,
+        window_overlap=args.window_overlap,
+        voxel_size=args.voxel_size,
+        max_points=args.max_points,
     )
@@ -0,0 +1,66 @@
+import os
+from argparse import ArgumentParser
+
+import numpy as np
+
+from instant_splat.utils.graphics_utils import SplatAttributes
+from instant_splat.utils.ply_utils import read_vertex_ply, vertex_columns
+from instant_splat.utils.splat_compression import (
+    save_compressed_ply,
+    load_compressed_ply,
+    compression_report,
+)
+
+
+def read_splat_ply(path) -> SplatAttributes:
+    vertices = read_vertex_ply(path)
+    n_rest = len([n for n in vertices.dtype.names if n.startswith("f_rest_")])
+
+    def columns(names):
+        return vertex_columns(vertices, names)
+
+    return SplatAttributes(
+        xyz=columns(["x", "y", "z"]),
+        f_dc=columns([f"f_dc_{i}" for i in range(3)]),
+        f_rest=columns([f"f_rest_{i}" for i in range(n_rest)]),
+        opacity=columns(["opacity"]),
+        scale=columns([f"scale_{i}" for i in range(3)]),
+        rotation=columns([f"rot_{i}" for i in range(4)]),
+    )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Export compressed splats and report fidelity against size"
+    )
+    parser.add_argument("ply", type=str, help="point_cloud.ply written by save_ply")
+    parser.add_argument("--sh_degrees", nargs="+", type=int, default=[0, 1, 2, 3])
+    parser.add_argument("--out_dir", type=str, default=None)
+    args = parser.parse_args()
+
+    out_dir = args.out_dir or os.path.dirname(os.path.abspath(args.ply))
+    os.makedirs(out_dir, exist_ok=True)
+    original = read_splat_ply(args.ply)
+    max_degree = round(np.sqrt(original.f_rest.shape[1] // 3 + 1)) - 1
+    original_size = os.path.getsize(args.ply)
+
+    print(f"{args.ply}: {len(original.xyz)} Gaussians, {original_size / 2**20:.1f} MB")
+    header = (
+        "SH | size MB | ratio | pos rmse (rel) | log-scale mae | rot deg "
+        "| opacity mae | color rmse | SH rmse"
+    )
+    print(header)
+    print("-" * len(header))
+    for sh_degree in args.sh_degrees:
+        if sh_degree > max_degree:
+            continue
+        path = os.path.join(out_dir, f"point_cloud.compressed_sh{sh_degree}.ply")
+        save_compressed_ply(path, original, sh_degree=sh_degree)
+        size = os.path.getsize(path)
+        report = compression_report(original, load_compressed_ply(path))
+        print(
+            f"{sh_degree:2d} | {size / 2**20:7.2f} | {original_size / size:5.1f} "
+            f"| {report['position_rmse_rel']:14.2e} | {report['log_scale_mae']:13.4f} "
+            f"| {report['rotation_mean_deg']:7.3f} | {report['opacity_mae']:11.4f} "
+            f"| {report['color_rmse']:10.4f} | {report['sh_rmse']:7.4f}"
+        )
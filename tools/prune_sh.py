@@ -0,0 +1,87 @@
+import math
+import os
+from argparse import ArgumentParser
+
+import torch
+
+from instant_splat.scene.gaussian_model import GaussianModel
+from instant_splat.utils.sh_utils import eval_sh
+
+
+def fibonacci_directions(n):
+    """`n` unit vectors spread evenly over the sphere."""
+    i = torch.arange(n, dtype=torch.float32) + 0.5
+    z = 1.0 - 2.0 * i / n
+    phi = math.pi * (3.0 - math.sqrt(5.0)) * i
+    r = (1.0 - z * z).sqrt()
+    return torch.stack([r * torch.cos(phi), r * torch.sin(phi), z], dim=1)
+
+
+@torch.no_grad()
+def color_psnr(gaussians, dense_rest, directions, chunk=2**12):
+    """PSNR of the adaptive colours against full-degree SH over `directions`."""
+    squared_error = 0.0
+    for start in range(0, len(dense_rest), chunk):
+        rows = slice(start, start + chunk)
+        dc = gaussians._features_dc[rows]
+        n = len(dc)
+        dirs = directions.to(dc.device).repeat(n, 1)
+        full = torch.cat((dc, dense_rest[rows]), dim=1)
+        reference = eval_sh(
+            gaussians.active_sh_degree,
+            full.repeat_interleave(len(directions), dim=0).transpose(1, 2),
+            dirs,
+        )
+        adaptive = gaussians.adaptive_sh[
+            torch.arange(start, start + n, device=dc.device).repeat_interleave(
+                len(directions)
+            )
+        ].colors(dc.repeat_interleave(len(directions), dim=0), dirs)
+        reference = torch.clamp_min(reference + 0.5, 0.0)
+        squared_error += (adaptive - reference).square().sum().item()
+    mse = squared_error / (len(dense_rest) * len(directions) * 3)
+    return -10.0 * math.log10(max(mse, 1e-20))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        description="Prune SH bands per Gaussian and report size against fidelity"
+    )
+    parser.add_argument("ply", type=str, help="point_cloud.ply written by save_ply")
+    parser.add_argument("--sh_degree", type=int, default=3)
+    parser.add_argument(
+        "--max_errors",
+        nargs="+",
+        type=float,
+        default=[0.5 / 255, 1.0 / 255, 2.0 / 255, 4.0 / 255],
+        help="RMS colour error allowed per Gaussian when dropping bands",
+    )
+    parser.add_argument("--n_directions", type=int, default=64)
+    parser.add_argument("--out_dir", type=str, default=None)
+    args = parser.parse_args()
+
+    out_dir = args.out_dir or os.path.dirname(os.path.abspath(args.ply))
+    os.makedirs(out_dir, exist_ok=True)
+    original_size = os.path.getsize(args.ply)
+    directions = fibonacci_directions(args.n_directions)
+
+    print(f"{args.ply}: {original_size / 2**20:.1f} MB")
+    header = "max err | Gaussians per degree | SH MB (dense) | size MB | ratio | PSNR"
+    print(header)
+    print("-" * len(header))
+    for max_error in args.max_errors:
+        gaussians = GaussianModel(args.sh_degree)
+        gaussians.load_ply(args.ply)
+        dense_rest = gaussians._features_rest.detach()
+        adaptive = gaussians.prune_sh_degrees(max_error)
+
+        path = os.path.join(out_dir, f"point_cloud.adaptive_sh_{max_error:.4f}.ply")
+        gaussians.save_ply(path)
+        size = os.path.getsize(path)
+        psnr = color_psnr(gaussians, dense_rest, directions)
+        counts = "/".join(str(c) for c in adaptive.degree_counts().tolist())
+        print(
+            f"{max_error * 255:5.2f}/255 | {counts:>20} "
+            f"| {adaptive.nbytes() / 2**20:5.1f} ({dense_rest.nbytes / 2**20:5.1f}) "
+            f"| {size / 2**20:7.2f} | {original_size / size:5.2f} | {psnr:5.1f}"
+        )
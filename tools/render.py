@@ -14,7 +14,7 @@ from instant_splat.scene import Scene
 import os
 from tqdm import tqdm
 from os import makedirs
-from instant_splat.gaussian_renderer import render
+from instant_splat.gaussian_renderer import render, render_batch
 import torchvision
 from instant_splat.utils.general_utils import safe_state
 from argparse import ArgumentParser
@@ -23,25 +23,32 @@ from instant_splat.gaussian_renderer import GaussianModel
 from instant_splat.utils.pose_utils import get_tensor_from_camera
 
 
-def render_set(model_path, name, iteration, views, gaussians, pipeline, background):
+def render_set(
+    model_path, name, iteration, views, gaussians, pipeline, background, batch_size=8
+):
     render_path = os.path.join(model_path, name, "ours_{}".format(iteration), "renders")
     gts_path = os.path.join(model_path, name, "ours_{}".format(iteration), "gt")
 
     makedirs(render_path, exist_ok=True)
     makedirs(gts_path, exist_ok=True)
 
-    for idx, view in enumerate(tqdm(views, desc="Rendering progress")):
-        camera_pose = get_tensor_from_camera(view.world_view_transform.transpose(0, 1))
-        rendering = render(
-            view, gaussians, pipeline, background, camera_pose=camera_pose
+    for start in tqdm(range(0, len(views), batch_size), desc="Rendering progress"):
+        batch = views[start : start + batch_size]
+        camera_poses = [
+            get_tensor_from_camera(view.world_view_transform.transpose(0, 1))
+            for view in batch
+        ]
+        renderings = render_batch(
+            batch, gaussians, pipeline, background, camera_poses=camera_poses
         )["render"]
-        gt = view.original_image[0:3, :, :]
-        torchvision.utils.save_image(
-            rendering, os.path.join(render_path, "{0:05d}".format(idx) + ".png")
-        )
-        torchvision.utils.save_image(
-            gt, os.path.join(gts_path, "{0:05d}".format(idx) + ".png")
-        )
+        for idx, (view, rendering) in enumerate(zip(batch, renderings), start):
+            gt = view.get_gt_image()[0:3, :, :]
+            torchvision.utils.save_image(
+                rendering, os.path.join(render_path, "{0:05d}".format(idx) + ".png")
+            )
+            torchvision.utils.save_image(
+                gt, os.path.join(gts_path, "{0:05d}".format(idx) + ".png")
+            )
 
 
 def render_set_optimize(
@@ -88,7 +95,7 @@ def render_set_optimize(
         candidate_q = camera_tensor_q.clone().detach()
         candidate_T = camera_tensor_T.clone().detach()
         current_min_loss = float(1e20)
-        gt = view.original_image[0:3, :, :]
+        gt = view.get_gt_image()[0:3, :, :]
         for iteration in range(num_iter):
             rendering = render(
                 view,
@@ -143,13 +150,17 @@ def render_sets(
     args,
 ):
     with torch.no_grad():
-        gaussians = GaussianModel(dataset.sh_degree)
+        gaussians = GaussianModel(
+            dataset.sh_degree, inference_dtype=getattr(torch, args.inference_dtype)
+        )
         scene = Scene(
             dataset, gaussians, load_iteration=iteration, opt=args, shuffle=False
         )
 
         bg_color = [1, 1, 1] if dataset.white_background else [0, 0, 0]
-        background = torch.tensor(bg_color, dtype=torch.float32, device="cuda")
+        background = torch.tensor(
+            bg_color, dtype=torch.float32, device=gaussians.device
+        )
 
     # if not skip_train:
     #     render_set(
@@ -187,6 +198,13 @@ if __name__ == "__main__":
     parser.add_argument("--get_video", action="store_true")
     parser.add_argument("--n_views", default=None, type=int)
     parser.add_argument("--scene", default=None, type=str)
+    parser.add_argument(
+        "--inference_dtype",
+        default="float32",
+        choices=["float32", "float16", "bfloat16"],
+        help="precision of the loaded Gaussian attributes; centers stay float32. "
+        "float16 and bfloat16 save memory at a small cost in image accuracy",
+    )
     parser.add_argument("--optim_test_pose_iter", default=500, type=int)
     args = get_combined_args(parser)
     print("Rendering " + args.model_path)
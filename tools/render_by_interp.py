@@ -14,7 +14,8 @@ from instant_splat.scene import Scene
 import os
 from tqdm import tqdm
 from os import makedirs
-from instant_splat.gaussian_renderer import render
+from instant_splat.gaussian_renderer import render_batch, render_lod
+from instant_splat.scene.gaussian_lod import GaussianLOD
 import torchvision
 from instant_splat.utils.general_utils import safe_state
 from argparse import ArgumentParser
@@ -76,19 +77,48 @@ def images_to_video(image_folder, output_video_path, fps=30):
     imageio.mimwrite(output_video_path, images, fps=fps)
 
 
-def render_set(model_path, name, iteration, views, gaussians, pipeline, background):
+def render_set(
+    model_path,
+    name,
+    iteration,
+    views,
+    gaussians,
+    pipeline,
+    background,
+    batch_size=8,
+    lod=None,
+    lod_pixel_error=1.0,
+):
     render_path = os.path.join(model_path, name, "ours_{}".format(iteration), "renders")
     makedirs(render_path, exist_ok=True)
 
-    for idx, view in enumerate(tqdm(views, desc="Rendering progress")):
-        camera_pose = get_tensor_from_camera(view.world_view_transform.transpose(0, 1))
-        rendering = render(
-            view, gaussians, pipeline, background, camera_pose=camera_pose
-        )["render"]
-        gt = view.original_image[0:3, :, :]
-        torchvision.utils.save_image(
-            rendering, os.path.join(render_path, "{0:05d}".format(idx) + ".png")
-        )
+    for start in tqdm(range(0, len(views), batch_size), desc="Rendering progress"):
+        batch = views[start : start + batch_size]
+        camera_poses = [
+            get_tensor_from_camera(view.world_view_transform.transpose(0, 1))
+            for view in batch
+        ]
+        if lod is None:
+            renderings = render_batch(
+                batch, gaussians, pipeline, background, camera_poses=camera_poses
+            )["render"]
+        else:
+            # Every view draws its own LOD cut
+            renderings = [
+                render_lod(
+                    view,
+                    lod,
+                    pipeline,
+                    background,
+                    camera_pose,
+                    pixel_error=lod_pixel_error,
+                )["render"]
+                for view, camera_pose in zip(batch, camera_poses)
+            ]
+        for idx, rendering in enumerate(renderings, start):
+            torchvision.utils.save_image(
+                rendering, os.path.join(render_path, "{0:05d}".format(idx) + ".png")
+            )
 
 
 def render_sets(
@@ -103,13 +133,22 @@ def render_sets(
     save_interpolate_pose(dataset.model_path, iteration, args.n_views)
 
     with torch.no_grad():
-        gaussians = GaussianModel(dataset.sh_degree)
+        gaussians = GaussianModel(
+            dataset.sh_degree, inference_dtype=getattr(torch, args.inference_dtype)
+        )
         scene = Scene(
             dataset, gaussians, load_iteration=iteration, opt=args, shuffle=False
         )
 
         bg_color = [1, 1, 1] if dataset.white_background else [0, 0, 0]
-        background = torch.tensor(bg_color, dtype=torch.float32, device="cuda")
+        background = torch.tensor(
+            bg_color, dtype=torch.float32, device=gaussians.device
+        )
+
+        lod = None
+        if args.lod_pixel_error > 0:
+            lod = GaussianLOD.build(gaussians)
+            print(f"LOD levels: {lod.level_sizes()}")
 
     # render interpolated views
     render_set(
@@ -120,6 +159,8 @@ def render_sets(
         gaussians,
         pipeline,
         background,
+        lod=lod,
+        lod_pixel_error=args.lod_pixel_error,
     )
 
     if args.get_video:
@@ -145,6 +186,19 @@ if __name__ == "__main__":
     parser.add_argument("--get_video", action="store_true")
     parser.add_argument("--n_views", default=None, type=int)
     parser.add_argument("--scene", default=None, type=str)
+    parser.add_argument(
+        "--inference_dtype",
+        default="float32",
+        choices=["float32", "float16", "bfloat16"],
+        help="precision of the loaded Gaussian attributes; centers stay float32. "
+        "float16 and bfloat16 save memory at a small cost in image accuracy",
+    )
+    parser.add_argument(
+        "--lod_pixel_error",
+        default=0.0,
+        type=float,
+        help="render an LOD cut with merged Gaussians up to this size in pixels (0: off)",
+    )
     args = get_combined_args(parser)
     print("Rendering " + args.model_path)
 
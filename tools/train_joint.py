@@ -14,11 +14,12 @@ import numpy as np
 import torch
 import rerun as rr
 import rerun.blueprint as rrb
-from random import randint
 from instant_splat.scene.cameras import Camera
+from instant_splat.scene.view_loader import TrainViewLoader
+from instant_splat.logging_utils import AsyncTrainingLogger
+from instant_splat.utils.checkpoint_utils import CheckpointWriter, load_checkpoint
 from instant_splat.utils.loss_utils import l1_loss, ssim
-from instant_splat.gaussian_renderer import render
-from instant_splat.utils.sh_utils import SH2RGB
+from instant_splat.gaussian_renderer import render, render_batch
 import sys
 from instant_splat.scene import Scene, GaussianModel
 import uuid
@@ -57,95 +58,6 @@ def save_pose(path, quat_pose, train_cams, llffhold=2):
     np.save(path, colmap_poses)
 
 
-def log_3d_splats(parent_log_path: Path, gaussians: GaussianModel) -> None:
-    initial_gaussians: Float32[Tensor, "num_gaussians 3"] = gaussians.get_xyz
-    colors: Float32[Tensor, "num_gaussians 3"] = SH2RGB(gaussians.get_features)[:, 0, :]
-
-    # get only the first 10 gaussians
-    rr.log(
-        f"{parent_log_path}/gaussian_points",
-        rr.Points3D(
-            positions=initial_gaussians.numpy(force=True),
-            colors=colors.numpy(force=True),
-        ),
-    )
-    # ic(scales.shape, scales.dtype)
-    # ic(rotations.shape, rotations.dtype)
-    # scales = gaussians.get_scaling
-    # rotations = gaussians.get_rotation
-    # rr.log(
-    #     f"{parent_log_path}/gaussian_ellipsoids",
-    #     rr.Ellipsoids3D(
-    #         centers=initial_gaussians.numpy(force=True),
-    #         quaternions=rotations.numpy(force=True),
-    #         half_sizes=scales.numpy(force=True),
-    #         colors=colors.numpy(force=True),
-    #         fill_mode=3,
-    #     ),
-    # )
-
-
-def log_cameras(
-    parent_log_path: Path,
-    cameras: list[Camera],
-    gaussians: GaussianModel,
-    pipe: PipelineParams,
-    bg: Float32[Tensor, "3"],
-) -> None:
-    cam: Camera
-    for idx, cam in enumerate(cameras):
-        quat_t: Float32[Tensor, "7"] = gaussians.get_RT(cam.uid)
-        w2c: Float32[Tensor, "4 4"] = get_camera_from_tensor(quat_t)
-        cam_T_world: Float32[Tensor, "3 4"] = w2c.numpy(force=True)
-        cam_log_path: Path = parent_log_path / f"camera_{cam.uid}"
-        FoVx = cam.FoVx
-        FoVy = cam.FoVy
-        # convert to principal point and focal length
-        fx = cam.image_width / (2 * np.tan(FoVx / 2))
-        fy = cam.image_height / (2 * np.tan(FoVy / 2))
-        principal_point = (cam.image_width / 2, cam.image_height / 2)
-
-        img_gt_viz: Float32[Tensor, "3 h w"] = cam.original_image * 255
-        img_gt_viz: Float32[np.ndarray, "h w 3"] = (
-            img_gt_viz.permute(1, 2, 0).numpy(force=True).astype(np.uint8)
-        )
-
-        render_pkg: dict[str, Any] = render(
-            cam, gaussians, pipe, bg, camera_pose=quat_t
-        )
-        img_pred_viz: Float32[Tensor, "3 h w"] = render_pkg["render"] * 255
-        img_pred_viz: Float32[np.ndarray, "h w 3"] = (
-            img_pred_viz.permute(1, 2, 0).numpy(force=True).astype(np.uint8)
-        )
-
-        rr.log(
-            f"{cam_log_path}",
-            rr.Transform3D(
-                translation=cam_T_world[:3, 3],
-                mat3x3=cam_T_world[:3, :3],
-                from_parent=True,
-                axis_length=0.01,
-            ),
-        )
-        rr.log(
-            f"{cam_log_path}/pinhole",
-            rr.Pinhole(
-                width=cam.image_width,
-                height=cam.image_height,
-                focal_length=(fx, fy),
-                principal_point=principal_point,
-                camera_xyz=rr.ViewCoordinates.RDF,
-                image_plane_distance=0.01,
-            ),
-        )
-        # only log the first three cameras images for efficiency
-        if idx > 2:
-            continue
-        rr.log(f"{cam_log_path}/pinhole/image", rr.Image(img_pred_viz))
-        # log outside of camera to avoid cluttering the view
-        rr.log(f"{parent_log_path}/gt_image_{cam.uid}", rr.Image(img_gt_viz))
-
-
 def create_blueprint(parent_log_path: Path) -> rrb.Blueprint:
     blueprint = rrb.Blueprint(
         rrb.Horizontal(
@@ -227,21 +139,22 @@ def training(
     scene = Scene(dataset, gaussians, opt=args, shuffle=True)
     gaussians.training_setup(opt)
     if checkpoint:
-        (model_params, first_iter) = torch.load(checkpoint)
+        if checkpoint.endswith(".pth"):
+            (model_params, first_iter) = torch.load(checkpoint)
+        else:
+            model_params, first_iter = load_checkpoint(checkpoint, gaussians.device)
         gaussians.restore(model_params, opt)
     train_cams_init = scene.getTrainCameras().copy()
     os.makedirs(scene.model_path + "pose", exist_ok=True)
     save_pose(scene.model_path + "pose" + "/pose_org.npy", gaussians.P, train_cams_init)
     bg_color: list[int] = [1, 1, 1] if dataset.white_background else [0, 0, 0]
     background: Float32[Tensor, "3 "] = torch.tensor(
-        bg_color, dtype=torch.float32, device="cuda"
+        bg_color, dtype=torch.float32, device=gaussians.device
     )
 
-    iter_start = torch.cuda.Event(enable_timing=True)
-    iter_end = torch.cuda.Event(enable_timing=True)
-
-    viewpoint_stack = None
+    train_views = TrainViewLoader(scene.getTrainCameras(), gaussians.device)
     ema_loss_for_log = 0.0
+    checkpoint_writer = CheckpointWriter()
     progress_bar = tqdm(range(first_iter, opt.iterations), desc="Training progress")
     first_iter += 1
 
@@ -256,9 +169,16 @@ def training(
         rr.SeriesLine(color=[255, 0, 0], name="Loss", width=2),
         static=True,
     )
+    logger = AsyncTrainingLogger(
+        parent_log_path,
+        train_cams_init,
+        pipe,
+        background,
+        image_cameras=args.log_image_cameras,
+        budget=args.log_budget,
+    )
 
     for iteration in range(first_iter, opt.iterations + 1):
-        iter_start.record()
         rr.set_time_sequence("iteration", iteration)
 
         gaussians.update_learning_rate(iteration)
@@ -270,13 +190,10 @@ def training(
         if iteration % 1000 == 0:
             gaussians.oneupSHdegree()
 
-        # Pick a random Camera
-        if not viewpoint_stack:
-            viewpoint_stack: list[Camera] = scene.getTrainCameras().copy()
-
-        viewpoint_cam: Camera = viewpoint_stack.pop(
-            randint(0, len(viewpoint_stack) - 1)
-        )
+        # Pick a random Camera; its ground truth is already on the way to the GPU
+        viewpoint_cam: Camera
+        gt_image: Float32[Tensor, "c h w"]
+        viewpoint_cam, gt_image = next(train_views)
         pose: Float32[Tensor, "7"] = gaussians.get_RT(viewpoint_cam.uid)
 
         # Render
@@ -284,7 +201,9 @@ def training(
             pipe.debug = True
 
         bg: Float32[Tensor, "3"] = (
-            torch.rand((3), device="cuda") if opt.random_background else background
+            torch.rand((3), device=gaussians.device)
+            if opt.random_background
+            else background
         )
 
         render_pkg: dict[str, Any] = render(
@@ -292,7 +211,6 @@ def training(
         )
         image: Float32[Tensor, "c h w"] = render_pkg["render"]
         # Loss
-        gt_image: Float32[Tensor, "c h w"] = viewpoint_cam.original_image.cuda()
 
         Ll1 = l1_loss(image, gt_image)
         loss = (1.0 - opt.lambda_dssim) * Ll1 + opt.lambda_dssim * (
@@ -300,17 +218,20 @@ def training(
         )
         loss.backward()
 
-        iter_end.record()
-
         with torch.no_grad():
             # Progress bar
             ema_loss_for_log = 0.4 * loss.item() + 0.6 * ema_loss_for_log
+            if args.log_interval and iteration % args.log_interval == 0:
+                logger.log_cameras(iteration, gaussians)
             if iteration % 10 == 0:
-                log_cameras(
-                    parent_log_path, train_cams_init, gaussians, pipe, background
-                )
                 rr.log(f"{parent_log_path}/loss_plot", rr.Scalar(ema_loss_for_log))
-                progress_bar.set_postfix({"Loss": f"{ema_loss_for_log:.{7}f}"})
+                logging_share = logger.main_thread_seconds / (perf_counter() - start)
+                progress_bar.set_postfix(
+                    {
+                        "Loss": f"{ema_loss_for_log:.{7}f}",
+                        "Logging": f"{logging_share:.1%}",
+                    }
+                )
                 progress_bar.update(10)
             if iteration == opt.iterations:
                 progress_bar.close()
@@ -321,35 +242,55 @@ def training(
                 l1_loss,
                 testing_iterations,
                 scene,
-                render,
+                render_batch,
                 (pipe, background),
             )
             if iteration in saving_iterations:
                 print(f"\n[ITER {iteration}] Saving Gaussians")
-                scene.save(iteration)
+                scene.save(
+                    iteration,
+                    compressed=args.save_compressed,
+                    streamable=args.save_streamable,
+                )
                 save_pose(
                     scene.model_path + "pose" + f"/pose_{iteration}.npy",
                     gaussians.P,
                     train_cams_init,
                 )
 
-            if iteration % 100 == 0 or iteration == 1:
-                log_3d_splats(parent_log_path, gaussians)
+            if args.log_splats_interval and (
+                iteration % args.log_splats_interval == 0 or iteration == 1
+            ):
+                logger.log_3d_splats(iteration, gaussians)
 
             # Optimizer step
             if iteration < opt.iterations:
                 gaussians.optimizer.step()
                 gaussians.optimizer.zero_grad(set_to_none=True)
 
+            if (
+                opt.morton_reorder_interval
+                and iteration % opt.morton_reorder_interval == 0
+            ):
+                gaussians.reorder_by_morton()
+
             if iteration in checkpoint_iterations:
                 print("\n[ITER {}] Saving Checkpoint".format(iteration))
-                torch.save(
+                checkpoint_writer.save(
+                    scene.model_path + "/chkpnt" + str(iteration) + ".ckpt",
                     (gaussians.capture(), iteration),
-                    scene.model_path + "/chkpnt" + str(iteration) + ".pth",
                 )
 
-        end = perf_counter()
-        train_time: float = end - start
+    checkpoint_writer.wait()
+    end = perf_counter()
+    train_time: float = end - start
+    logger.close()
+    print(
+        f"Logging: {logger.main_thread_seconds:.2f}s on the training thread "
+        f"({logger.main_thread_seconds / train_time:.1%} of {train_time:.1f}s), "
+        f"{logger.worker_seconds:.2f}s in the background, "
+        f"{logger.dropped} of {logger.submitted} jobs dropped"
+    )
 
 
 def training_report(
@@ -378,20 +319,24 @@ def training_report(
             if config["cameras"] and len(config["cameras"]) > 0:
                 l1_test = 0.0
                 psnr_test = 0.0
-                for idx, viewpoint in enumerate(config["cameras"]):
-                    if config["name"] == "train":
-                        pose = scene.gaussians.get_RT(viewpoint.uid)
-                    else:
-                        pose = scene.gaussians.get_RT_test(viewpoint.uid)
-                    image = torch.clamp(
-                        renderFunc(
-                            viewpoint, scene.gaussians, *renderArgs, camera_pose=pose
-                        )["render"],
-                        0.0,
-                        1.0,
-                    )
+                if config["name"] == "train":
+                    get_pose = scene.gaussians.get_RT
+                else:
+                    get_pose = scene.gaussians.get_RT_test
+                poses = [get_pose(viewpoint.uid) for viewpoint in config["cameras"]]
+                images = torch.clamp(
+                    renderFunc(
+                        config["cameras"],
+                        scene.gaussians,
+                        *renderArgs,
+                        camera_poses=poses,
+                    )["render"],
+                    0.0,
+                    1.0,
+                )
+                for viewpoint, image in zip(config["cameras"], images):
                     gt_image = torch.clamp(
-                        viewpoint.original_image.to("cuda"), 0.0, 1.0
+                        viewpoint.get_gt_image(image.device), 0.0, 1.0
                     )
                     l1_test += l1_loss(image, gt_image).mean().double()
                     psnr_test += psnr(image, gt_image).mean().double()
@@ -436,10 +381,35 @@ if __name__ == "__main__":
     parser.add_argument("--quiet", action="store_true")
     parser.add_argument("--checkpoint_iterations", nargs="+", type=int, default=[])
     parser.add_argument("--start_checkpoint", type=str, default=None)
+    parser.add_argument("--log_interval", type=int, default=10)
+    parser.add_argument("--log_splats_interval", type=int, default=100)
+    parser.add_argument(
+        "--log_image_cameras",
+        nargs="+",
+        type=int,
+        default=[0, 1, 2],
+        help="Indices of the training cameras whose renders are logged",
+    )
+    parser.add_argument(
+        "--log_budget",
+        type=float,
+        default=0.1,
+        help="Seconds a logging job may spend rendering (at least one view)",
+    )
     parser.add_argument("--scene", type=str, default=None)
     parser.add_argument("--n_views", type=int, default=None)
     parser.add_argument("--get_video", action="store_true")
     parser.add_argument("--optim_pose", action="store_true")
+    parser.add_argument(
+        "--save_compressed",
+        action="store_true",
+        help="also write a quantized point_cloud_compressed.ply next to each save",
+    )
+    parser.add_argument(
+        "--save_streamable",
+        action="store_true",
+        help="also write an importance-ordered point_cloud.splatstream for streaming",
+    )
     rr.script_add_args(parser)
     args = parser.parse_args(sys.argv[1:])
     args.save_iterations.append(args.iterations)